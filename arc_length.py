@@ -0,0 +1,230 @@
+from functools import lru_cache
+from typing import NamedTuple, Tuple
+import numpy as np
+from bezier_sampling import get_power_basis_matrix
+
+
+# Nodes per table segment, the speed of a curve of degree n is the root of a polynomial
+# of degree 2(n - 1), which this integrates very precisely on short segments
+GAUSS_LEGENDRE_ORDER: int = 8
+
+# Segments of the length-to-t lookup table (equally long in t) per degree of the curve,
+# as higher degree curves bend more
+LENGTH_TABLE_SEGMENTS_PER_DEGREE: int = 12
+
+# Curves whose tables are calculated at once, so that the intermediate arrays stay small
+LENGTH_TABLE_CHUNK_SIZE: int = 1024
+
+# Hermite slopes are clamped to this multiple of the segment's secant, which keeps the
+# interpolation monotone (& bounded where the curve stops, e.g. at a cusp)
+MAX_HERMITE_SLOPE_RATIO: float = 3.0
+
+
+# Cumulative lengths of N curves of the same degree at the same parameters
+class ArcLengthTable(NamedTuple):
+    t: np.ndarray  # Shape (K + 1,), from 0 to 1
+    lengths: np.ndarray  # Shape (N, K + 1), from 0 to the curve's length
+    speeds: np.ndarray  # Shape (N, K + 1), |B'(t)|, i.e. the slopes of the lengths
+
+    @property
+    def total_lengths(self) -> np.ndarray:
+        return self.lengths[:, -1]
+
+
+# Nodes & weights of the rule, mapped from [-1, 1] to [0, 1]
+@lru_cache(maxsize=8)
+def get_gauss_legendre_rule(order: int) -> Tuple[np.ndarray, np.ndarray]:
+    nodes, weights = np.polynomial.legendre.leggauss(order)
+
+    nodes = (nodes + 1) / 2
+    weights = weights / 2
+
+    nodes.setflags(write=False)
+    weights.setflags(write=False)
+
+    return nodes, weights
+
+
+# Power basis coefficients (lowest power first) of N curves, shape (N, degree + 1, 2)
+def get_coefficients(control_points: np.ndarray) -> np.ndarray:
+    return get_power_basis_matrix(control_points.shape[1] - 1) @ control_points
+
+
+# The derivative of a Bézier curve is a Bézier curve of one degree lower
+def get_derivative_coefficients(control_points: np.ndarray) -> np.ndarray:
+    return get_coefficients(
+        (control_points.shape[1] - 1) * np.diff(control_points, axis=1)
+    )
+
+
+# Evaluates every curve at its own parameters t of shape (N, K), giving (N, K, 2).
+# Horner's scheme works on whole arrays at once, which is much faster than
+# multiplying by a table of basis polynomials for every curve.
+def batch_evaluate_coefficients(coefficients: np.ndarray, t: np.ndarray) -> np.ndarray:
+    values = np.zeros((*t.shape, 2))
+
+    for j in reversed(range(coefficients.shape[1])):
+        values *= t[..., None]
+        values += coefficients[:, None, j]
+
+    return values
+
+
+# Speed |B'(t)| of every curve at its own parameters t of shape (N, K)
+def batch_speeds(derivative_coefficients: np.ndarray, t: np.ndarray) -> np.ndarray:
+    velocities = batch_evaluate_coefficients(derivative_coefficients, t)
+
+    return np.hypot(velocities[..., 0], velocities[..., 1])
+
+
+# Evaluates every curve at the same parameters t of shape (K,), giving (K, N, 2).
+# As t is shared, all curves are evaluated by a single matrix multiplication.
+def batch_evaluate_coefficients_at(
+    coefficients: np.ndarray, t: np.ndarray
+) -> np.ndarray:
+    curve_count, coefficient_count, _ = coefficients.shape
+
+    powers = t[:, None] ** np.arange(coefficient_count)
+
+    return (
+        powers @ coefficients.transpose(1, 0, 2).reshape(coefficient_count, -1)
+    ).reshape(len(t), curve_count, 2)
+
+
+# Speeds of every curve at the same parameters t of shape (K,), giving (N, K)
+def batch_speeds_at(derivative_coefficients: np.ndarray, t: np.ndarray) -> np.ndarray:
+    velocities = batch_evaluate_coefficients_at(derivative_coefficients, t)
+
+    return np.hypot(velocities[..., 0], velocities[..., 1]).T
+
+
+def batch_arc_length_tables(
+    control_points: np.ndarray, segment_count: int | None = None
+) -> ArcLengthTable:
+    control_points = np.asarray(control_points, dtype=float)
+
+    curve_count = control_points.shape[0]
+
+    if segment_count is None:
+        segment_count = LENGTH_TABLE_SEGMENTS_PER_DEGREE * (control_points.shape[1] - 1)
+
+    t = np.linspace(0.0, 1.0, segment_count + 1)
+
+    # Every segment is integrated with Gauss–Legendre quadrature
+    nodes, weights = get_gauss_legendre_rule(GAUSS_LEGENDRE_ORDER)
+
+    node_t = (t[:-1, None] + (t[1:] - t[:-1])[:, None] * nodes).ravel()
+
+    lengths = np.zeros((curve_count, segment_count + 1))
+    speeds = np.zeros((curve_count, segment_count + 1))
+
+    for start in range(0, curve_count, LENGTH_TABLE_CHUNK_SIZE):
+        end = min(start + LENGTH_TABLE_CHUNK_SIZE, curve_count)
+
+        derivative_coefficients = get_derivative_coefficients(control_points[start:end])
+
+        node_speeds = batch_speeds_at(derivative_coefficients, node_t).reshape(
+            end - start, segment_count, len(nodes)
+        )
+
+        # Sums of non-negative lengths, so the table is monotone
+        np.cumsum(
+            (node_speeds @ weights) * (t[1:] - t[:-1]),
+            axis=1,
+            out=lengths[start:end, 1:],
+        )
+
+        speeds[start:end] = batch_speeds_at(derivative_coefficients, t)
+
+    return ArcLengthTable(t, lengths, speeds)
+
+
+def batch_arc_lengths(control_points: np.ndarray) -> np.ndarray:
+    return batch_arc_length_tables(control_points).total_lengths
+
+
+# Parameters t at which every curve is s long, s has shape (N, M) & is clamped to the
+# curves' lengths. Within its segment, t(s) is interpolated by a cubic Hermite spline,
+# whose slopes dt/ds = 1 / speed are known from the table, so no further evaluation
+# of the curves is needed.
+def batch_t_at_lengths(table: ArcLengthTable, s: np.ndarray) -> np.ndarray:
+    curve_count, segment_count = table.lengths.shape[0], len(table.t) - 1
+
+    total_lengths = table.total_lengths[:, None]
+
+    s = np.clip(np.asarray(s, dtype=float), 0.0, total_lengths)
+
+    # Curves whose points all coincide have no length, any t would do
+    safe_total_lengths = np.where(total_lengths > 0, total_lengths, 1.0)
+
+    # The segment of every s is found by one search over all tables, which are made
+    # consecutive by normalizing them & shifting every row past the previous one
+    row_shifts = 2.0 * np.arange(curve_count)[:, None]
+
+    keys = (table.lengths / safe_total_lengths + row_shifts).ravel()
+    queries = s / safe_total_lengths + row_shifts
+
+    segments = np.searchsorted(keys, queries.ravel(), side="right").reshape(s.shape)
+    segments -= 1 + (segment_count + 1) * np.arange(curve_count)[:, None]
+    segments = np.clip(segments, 0, segment_count - 1)
+
+    start_t = table.t[segments]
+    t_spans = table.t[segments + 1] - start_t
+
+    start_lengths = np.take_along_axis(table.lengths, segments, axis=1)
+    length_spans = np.take_along_axis(table.lengths, segments + 1, axis=1)
+    length_spans -= start_lengths
+
+    has_length = length_spans > 0
+
+    u = np.divide(
+        s - start_lengths, length_spans, out=np.zeros_like(s), where=has_length
+    )
+
+    # Slopes relative to the segment's secant, the secant itself has slope 1
+    secant_speeds = length_spans / t_spans
+
+    start_slopes, end_slopes = [
+        get_relative_slopes(
+            secant_speeds, np.take_along_axis(table.speeds, indices, axis=1)
+        )
+        for indices in (segments, segments + 1)
+    ]
+
+    u_squared = u * u
+    u_cubed = u_squared * u
+
+    fractions = (
+        (u_cubed - 2 * u_squared + u) * start_slopes
+        + (-2 * u_cubed + 3 * u_squared)
+        + (u_cubed - u_squared) * end_slopes
+    )
+
+    return start_t + t_spans * fractions
+
+
+def get_relative_slopes(secant_speeds: np.ndarray, speeds: np.ndarray) -> np.ndarray:
+    slopes = np.divide(
+        secant_speeds,
+        speeds,
+        out=np.full_like(speeds, MAX_HERMITE_SLOPE_RATIO),
+        where=speeds > 0,
+    )
+
+    return np.clip(slopes, 0.0, MAX_HERMITE_SLOPE_RATIO, out=slopes)
+
+
+# M points on every curve, equally spaced along it, shape (N, M, 2)
+def batch_equally_spaced_points(
+    control_points: np.ndarray, point_count: int, table: ArcLengthTable | None = None
+) -> np.ndarray:
+    control_points = np.asarray(control_points, dtype=float)
+
+    if table is None:
+        table = batch_arc_length_tables(control_points)
+
+    s = table.total_lengths[:, None] * np.linspace(0.0, 1.0, point_count)
+
+    return batch_evaluate_coefficients(
+        get_coefficients(control_points), batch_t_at_lengths(table, s)
+    )
@@ -0,0 +1,174 @@
+from concurrent.futures import ThreadPoolExecutor
+from logging import getLogger
+from queue import Empty, Queue
+from threading import Event
+from tkinter import Misc
+from typing import Any, Callable, Dict
+
+
+# File reading, parsing & image decoding mostly release the GIL, so a few workers help
+WORKER_COUNT: int = 4
+
+# How often the Tk thread checks for finished tasks while any are running
+POLL_INTERVAL_MS: int = 20
+
+# Groups of tasks, only the last task submitted to a group is kept
+SAVE_TASK_GROUP = "save"
+LOAD_TASK_GROUP = "load"
+IMAGE_TASK_GROUP = "image"
+INTERSECTION_TASK_GROUP = "intersections"
+EXPORT_TASK_GROUP = "export"
+
+TaskCancelledError: RuntimeError = RuntimeError("Task Cancelled")
+
+logger = getLogger(__name__)
+
+
+class Task:
+    def __init__(self, group: str) -> None:
+        self.group = group
+
+        self.cancel_event = Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def cancel(self) -> None:
+        self.cancel_event.set()
+
+    # Work functions call this between their stages, so that a cancelled task stops early
+    def raise_if_cancelled(self) -> None:
+        if self.cancelled:
+            raise TaskCancelledError
+
+
+# Runs work in a pool of worker threads & hands the results back to the Tk thread
+# through a queue, which is polled with after(), as Tkinter may only be used from
+# the thread running the main loop. Callbacks of cancelled tasks are never called.
+# If on_done raises, the error is passed to on_error, so that it's reported in the UI.
+class TaskRunner:
+    def __init__(
+        self,
+        widget: Misc,
+        max_workers: int = WORKER_COUNT,
+        poll_interval_ms: int = POLL_INTERVAL_MS,
+    ) -> None:
+        self.widget = widget
+        self.poll_interval_ms = poll_interval_ms
+
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="background_task"
+        )
+
+        self.results: Queue = Queue()
+
+        # Running task of every group
+        self.tasks: Dict[str, Task] = {}
+
+        self.poll_job: str | None = None
+
+    # Work is called with the task in a worker thread, then on_done with its result
+    # (or on_error with the raised exception) in the Tk thread. A task still running
+    # in the same group is cancelled.
+    def submit(
+        self,
+        group: str,
+        work: Callable[[Task], Any],
+        on_done: Callable[[Any], None],
+        on_error: Callable[[Exception], None],
+    ) -> Task:
+        self.cancel(group)
+
+        task = Task(group)
+
+        self.tasks[group] = task
+
+        self.executor.submit(self.run_task, task, work, on_done, on_error)
+
+        self.schedule_poll()
+
+        return task
+
+    # Runs in a worker thread
+    def run_task(
+        self,
+        task: Task,
+        work: Callable[[Task], Any],
+        on_done: Callable[[Any], None],
+        on_error: Callable[[Exception], None],
+    ) -> None:
+        try:
+            result = work(task)
+        except Exception as error:
+            self.results.put((task, on_error, on_error, error))
+        else:
+            self.results.put((task, on_done, on_error, result))
+
+    def schedule_poll(self) -> None:
+        if self.poll_job is None:
+            self.poll_job = self.widget.after(self.poll_interval_ms, self.poll)
+
+    # A failing callback never stops the polling, the results after it are still handled
+    def poll(self) -> None:
+        self.poll_job = None
+
+        try:
+            while True:
+                try:
+                    task, callback, on_error, value = self.results.get_nowait()
+                except Empty:
+                    break
+
+                if self.tasks.get(task.group) is task:
+                    del self.tasks[task.group]
+
+                if not task.cancelled and value is not TaskCancelledError:
+                    self.run_callback(callback, on_error, value)
+        finally:
+            if len(self.tasks) > 0 or not self.results.empty():
+                self.schedule_poll()
+
+    def run_callback(
+        self,
+        callback: Callable[[Any], None],
+        on_error: Callable[[Exception], None],
+        value: Any,
+    ) -> None:
+        try:
+            callback(value)
+        except Exception as error:
+            logger.exception("Callback of a background task failed")
+
+            if callback is not on_error:
+                try:
+                    on_error(error)
+                except Exception:
+                    logger.exception("Error callback of a background task failed")
+
+    def is_running(self, group: str) -> bool:
+        return group in self.tasks
+
+    # Returns whether there was a task to cancel
+    def cancel(self, group: str) -> bool:
+        task = self.tasks.pop(group, None)
+
+        if task is None:
+            return False
+
+        task.cancel()
+
+        return True
+
+    def cancel_all(self) -> bool:
+        cancelled = False
+
+        for group in list(self.tasks):
+            cancelled = self.cancel(group) or cancelled
+
+        return cancelled
+
+    def shutdown(self) -> None:
+        self.cancel_all()
+
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,317 @@
+from ROOT_PATH import root_path
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from csv import writer as csv_writer
+from json import dumps
+from os import cpu_count, listdir, path as os_path
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Sequence, TextIO, Tuple
+import sys
+from bezier_batch import (
+    batch_bounding_boxes,
+    batch_coefficients,
+    batch_extrema,
+    group_curves_by_point_amount,
+)
+from project_format import (
+    PROJECT_EXTENSION,
+    LEGACY_PROJECT_EXTENSION,
+    ProjectData,
+    get_curves_points_coords,
+    read_any_project,
+)
+
+
+# Run with `python batch_processor.py [files or directories]`, by default every project
+# in saves/ is processed
+
+saves_path = str(Path(root_path, "./saves/").resolve())
+
+# Fewer projects than this are processed in this process, as starting the workers would
+# take longer than the work itself
+PROCESS_POOL_MIN_PROJECTS: int = 8
+
+# Projects sent to a worker at once
+PROCESS_POOL_CHUNK_SIZE: int = 4
+
+# Extrema are rounded the same way as in BezierGeometry
+EXTREMUM_DECIMALS: int = 3
+
+RESULTS_FORMAT_VERSION: int = 1
+
+OUTPUT_FORMATS = ("json", "csv")
+
+CSV_HEADER = (
+    "project",
+    "filename",
+    "curve",
+    "point_amount",
+    "points",
+    "x_coefficients",
+    "y_coefficients",
+    "x_extrema",
+    "y_extrema",
+    "min_x",
+    "min_y",
+    "max_x",
+    "max_y",
+)
+
+
+class CurveResult(NamedTuple):
+    points_coords: List[Tuple[int, int]]
+    coefficients: Tuple[List[float], List[float]]  # Power basis, lowest power first
+    x_extrema: List[float]
+    y_extrema: List[float]
+    bounding_box: Tuple[float, float, float, float]  # (min_x, min_y, max_x, max_y)
+
+
+class ProjectResult(NamedTuple):
+    filename: str
+    name: str | None
+    image_filename: str | None
+    curves: List[CurveResult]
+    error: str | None
+
+
+# Project files directly in the directory, sorted by name. If a project was saved in
+# both formats, only the binary one is used, the same as in ProjectCatalog.
+def find_project_files(directory: str) -> List[str]:
+    filenames = sorted(listdir(directory))
+
+    names = {
+        os_path.splitext(filename)[0]
+        for filename in filenames
+        if filename.endswith(PROJECT_EXTENSION)
+    }
+
+    return [
+        os_path.join(directory, filename)
+        for filename in filenames
+        if filename.endswith(PROJECT_EXTENSION)
+        or (
+            filename.endswith(LEGACY_PROJECT_EXTENSION)
+            and os_path.splitext(filename)[0] not in names
+        )
+    ]
+
+
+def collect_project_files(paths: Sequence[str]) -> List[str]:
+    filenames: List[str] = []
+
+    for path in paths:
+        if os_path.isdir(path):
+            filenames.extend(find_project_files(path))
+        else:
+            filenames.append(path)
+
+    return filenames
+
+
+# Extrema in t come padded with NaN & roots of the derivative can repeat
+def get_extrema_list(extrema: List[float]) -> List[float]:
+    result: List[float] = []
+
+    for extremum in extrema:
+        if extremum != extremum:
+            continue
+
+        extremum = round(extremum, EXTREMUM_DECIMALS)
+
+        if extremum not in result:
+            result.append(extremum)
+
+    return result
+
+
+# All curves with the same amount of points are processed in one batch. If canvas_height
+# is given, y of the coefficients is flipped the same way as in the application.
+def analyze_project(
+    project: ProjectData, canvas_height: float | None = None
+) -> List[CurveResult]:
+    curves_points_coords = get_curves_points_coords(project)
+
+    curves: List[CurveResult | None] = [None] * len(curves_points_coords)
+
+    for indices, control_points in group_curves_by_point_amount(
+        curves_points_coords
+    ).values():
+        coefficients = batch_coefficients(control_points, canvas_height)
+        extrema = batch_extrema(control_points).tolist()
+        bounding_boxes = batch_bounding_boxes(control_points).tolist()
+
+        x_coefficients = coefficients[:, :, 0].tolist()
+        y_coefficients = coefficients[:, :, 1].tolist()
+
+        for i, curve_index in enumerate(indices.tolist()):
+            curves[curve_index] = CurveResult(
+                curves_points_coords[curve_index],
+                (x_coefficients[i], y_coefficients[i]),
+                get_extrema_list(extrema[i][0]),
+                get_extrema_list(extrema[i][1]),
+                tuple(bounding_boxes[i]),
+            )
+
+    return curves  # type: ignore
+
+
+# Runs in the worker processes, so a project that can't be read is reported instead of
+# stopping the whole run
+def process_project_file(filename: str, canvas_height: float | None) -> ProjectResult:
+    try:
+        project = read_any_project(filename)
+
+        curves = analyze_project(project, canvas_height)
+    except Exception as error:
+        return ProjectResult(filename, None, None, [], str(error) or repr(error))
+
+    return ProjectResult(filename, project.name, project.image_filename, curves, None)
+
+
+# Results come in the order of the files, the pool is used only for many projects
+def process_project_files(
+    filenames: Sequence[str], canvas_height: float | None, workers: int
+) -> Iterator[ProjectResult]:
+    if workers <= 1 or len(filenames) < PROCESS_POOL_MIN_PROJECTS:
+        for filename in filenames:
+            yield process_project_file(filename, canvas_height)
+
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(
+            process_project_file,
+            filenames,
+            [canvas_height] * len(filenames),
+            chunksize=PROCESS_POOL_CHUNK_SIZE,
+        )
+
+
+def project_result_to_dict(result: ProjectResult) -> Dict[str, Any]:
+    if result.error is not None:
+        return {"filename": result.filename, "error": result.error}
+
+    return {
+        "filename": result.filename,
+        "name": result.name,
+        "image_filename": result.image_filename,
+        "curves": [
+            {
+                "points": [list(point_coords) for point_coords in curve.points_coords],
+                "coefficients": {
+                    "x": curve.coefficients[0],
+                    "y": curve.coefficients[1],
+                },
+                "x_extrema": curve.x_extrema,
+                "y_extrema": curve.y_extrema,
+                "bounding_box": list(curve.bounding_box),
+            }
+            for curve in result.curves
+        ],
+    }
+
+
+# Every project is written as soon as it's processed, so the output is never held in
+# memory as a whole. Returns the amount of projects that couldn't be processed.
+def write_json(results: Iterator[ProjectResult], f: TextIO) -> int:
+    error_count = 0
+
+    f.write(f'{{"version": {RESULTS_FORMAT_VERSION}, "projects": [')
+
+    for i, result in enumerate(results):
+        if result.error is not None:
+            error_count += 1
+
+        f.write(("\n" if i == 0 else ",\n") + dumps(project_result_to_dict(result)))
+
+    f.write("\n]}\n")
+
+    return error_count
+
+
+def format_numbers(values: Sequence[float]) -> str:
+    return " ".join(str(value) for value in values)
+
+
+# One row per curve, lists of numbers are separated by spaces. Projects that couldn't be
+# processed are only reported on stderr.
+def write_csv(results: Iterator[ProjectResult], f: TextIO) -> int:
+    error_count = 0
+
+    writer = csv_writer(f)
+
+    writer.writerow(CSV_HEADER)
+
+    for result in results:
+        if result.error is not None:
+            error_count += 1
+
+            continue
+
+        for curve_index, curve in enumerate(result.curves):
+            writer.writerow(
+                (
+                    result.name,
+                    result.filename,
+                    curve_index,
+                    len(curve.points_coords),
+                    " ".join(f"{x},{y}" for x, y in curve.points_coords),
+                    format_numbers(curve.coefficients[0]),
+                    format_numbers(curve.coefficients[1]),
+                    format_numbers(curve.x_extrema),
+                    format_numbers(curve.y_extrema),
+                    *curve.bounding_box,
+                )
+            )
+
+    return error_count
+
+
+def report_errors(results: Iterator[ProjectResult]) -> Iterator[ProjectResult]:
+    for result in results:
+        if result.error is not None:
+            print(f"{result.filename}: {result.error}", file=sys.stderr)
+
+        yield result
+
+
+def main() -> int:
+    parser = ArgumentParser(
+        description="Coefficients, extrema & bounding boxes of the curves of saved projects"
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        default=[saves_path],
+        help="project files or directories of them (default: the saves directory)",
+    )
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="json")
+    parser.add_argument("--output", help="file to write to (default: stdout)")
+    parser.add_argument("--workers", type=int, default=cpu_count() or 1)
+    parser.add_argument(
+        "--canvas-height",
+        type=float,
+        help="flip y of the coefficients like the application does for this height",
+    )
+
+    arguments = parser.parse_args()
+
+    filenames = collect_project_files(arguments.paths)
+
+    results = report_errors(
+        process_project_files(filenames, arguments.canvas_height, arguments.workers)
+    )
+
+    write = write_json if arguments.format == "json" else write_csv
+
+    if arguments.output is None:
+        error_count = write(results, sys.stdout)
+    else:
+        with open(arguments.output, "w", newline="") as f:
+            error_count = write(results, f)
+
+    return 1 if error_count > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+from itertools import count
+from typing import Any, Callable, Dict, Tuple
+from main import MainFrame, MAX_DRAG_FPS, MAX_DRAG_LABELS_FPS
+from viewport import Viewport
+from benchmarks.recording_widgets import (
+    RecordingCanvas,
+    RecordingListbox,
+    RecordingWidget,
+    SynchronousTaskRunner,
+)
+
+
+# Widgets of MainFrame whose calls are only recorded
+RECORDED_WIDGET_NAMES = (
+    "x_equation_text",
+    "y_equation_text",
+    "x_extrema_label",
+    "y_extrema_label",
+    "show_dashed_line_checkbutton",
+    "show_extremum_points_checkbutton",
+    "show_bounding_box_checkbutton",
+    "show_dashed_line_var",
+    "show_extremum_points_var",
+    "show_bounding_box_var",
+    "curve_color_changer",
+    "save_info_label",
+    "save_as_entry",
+    "hover_info_label",
+    "image_manager",
+    "edit_journal",
+)
+
+
+# A MainFrame that is never mapped, with a recording canvas & recording widgets instead
+# of Tk ones, so that its event handlers run without a display. Callbacks scheduled
+# with after() are kept until run_pending_jobs is called.
+class HeadlessMainFrame(MainFrame):
+    def __init__(self, canvas_size: Tuple[int, int] = (1200, 800)) -> None:
+        self.canvas = RecordingCanvas(*canvas_size)
+        self.viewport = Viewport()
+
+        self.curves = []
+        self.curves_listbox = RecordingListbox()
+        self.projects_listbox = RecordingListbox()
+
+        for name in RECORDED_WIDGET_NAMES:
+            setattr(self, name, RecordingWidget())
+
+        self.task_runner = SynchronousTaskRunner()
+
+        self.not_found_x_extrema_label_text = "No Extremum in X"
+        self.not_found_y_extrema_label_text = "No Extremum in Y"
+        self.found_x_extrema_label_text = "Extremum in X at t = "
+        self.found_y_extrema_label_text = "Extremum in Y at t = "
+
+        self.selected_curve = None
+        self.selected_point = None
+        self.selected_point_offset = (0, 0)
+
+        self.journal_paused = False
+        self.project_name = ""
+
+        self.auto_fit_mode = False
+        self.auto_fit_stroke = []
+        self.auto_fit_stroke_line = None
+
+        self.pan_anchor = None
+        self.view_redraw_job = None
+
+        self.max_drag_fps = MAX_DRAG_FPS
+        self.max_drag_labels_fps = MAX_DRAG_LABELS_FPS
+        self.pending_drag_position = None
+        self.pending_drag_snap = False
+        self.drag_redraw_job = None
+        self.drag_labels_job = None
+        self.last_drag_redraw_time = 0.0
+        self.last_drag_labels_update_time = 0.0
+        self.dragged_point = None
+
+        self.hover_position = None
+        self.hover_job = None
+        self.curves_bounding_boxes = None
+
+        self.intersections = []
+
+        self.pending_jobs: Dict[str, Tuple[Callable[..., Any], Tuple[Any, ...]]] = {}
+        self.job_ids = count(1)
+
+    def after(self, ms: int, func: Callable[..., Any], *args: Any) -> str:
+        job = f"job{next(self.job_ids)}"
+
+        self.pending_jobs[job] = (func, args)
+
+        return job
+
+    def after_idle(self, func: Callable[..., Any], *args: Any) -> str:
+        return self.after(0, func, *args)
+
+    def after_cancel(self, job: str) -> None:
+        self.pending_jobs.pop(job, None)
+
+    # Runs the scheduled callbacks, including those they schedule
+    def run_pending_jobs(self) -> None:
+        while len(self.pending_jobs) > 0:
+            func, args = self.pending_jobs.pop(next(iter(self.pending_jobs)))
+
+            func(*args)
@@ -0,0 +1,212 @@
+from collections import Counter
+from itertools import count
+from typing import Any, Callable, Dict, List, Set, Tuple
+from background_tasks import Task
+
+
+# Stand-in for tk.Canvas, which keeps only the items' tags & counts the calls, so that
+# the drawing code can be measured without a display & without Tk's own rendering
+class RecordingCanvas:
+    def __init__(self, width: int = 1200, height: int = 800) -> None:
+        self.width = width
+        self.height = height
+
+        self.items: Dict[int, Tuple[str, ...]] = {}
+        self.tagged_items: Dict[str, Set[int]] = {}
+        self.item_ids = count(1)
+
+        self.calls: Counter = Counter()
+
+    def create_item(self, kind: str, tags: str | Tuple[str, ...]) -> int:
+        self.calls[f"create_{kind}"] += 1
+
+        item = next(self.item_ids)
+
+        item_tags = (tags,) if isinstance(tags, str) else tuple(tags)
+
+        self.items[item] = item_tags
+
+        for tag in item_tags:
+            self.tagged_items.setdefault(tag, set()).add(item)
+
+        return item
+
+    def create_line(self, *args, tags: str | Tuple[str, ...] = (), **kwargs) -> int:
+        return self.create_item("line", tags)
+
+    def create_oval(self, *args, tags: str | Tuple[str, ...] = (), **kwargs) -> int:
+        return self.create_item("oval", tags)
+
+    def create_rectangle(
+        self, *args, tags: str | Tuple[str, ...] = (), **kwargs
+    ) -> int:
+        return self.create_item("rectangle", tags)
+
+    def create_text(self, *args, tags: str | Tuple[str, ...] = (), **kwargs) -> int:
+        return self.create_item("text", tags)
+
+    def create_image(self, *args, tags: str | Tuple[str, ...] = (), **kwargs) -> int:
+        return self.create_item("image", tags)
+
+    def find_items(self, tag_or_id: str | int) -> List[int]:
+        if isinstance(tag_or_id, int):
+            return [tag_or_id] if tag_or_id in self.items else []
+
+        # Tags combined by "&&" match the items having all of them
+        tags = tag_or_id.split("&&")
+
+        items = self.tagged_items.get(tags[0], set())
+
+        for tag in tags[1:]:
+            items = items & self.tagged_items.get(tag, set())
+
+        return list(items)
+
+    def delete(self, *tags_or_ids: str | int) -> None:
+        self.calls["delete"] += 1
+
+        for tag_or_id in tags_or_ids:
+            for item in self.find_items(tag_or_id):
+                for tag in self.items.pop(item):
+                    self.tagged_items[tag].discard(item)
+
+    def coords(self, tag_or_id: str | int, *args) -> None:
+        self.calls["coords"] += 1
+
+    def itemconfig(self, tag_or_id: str | int, **kwargs) -> None:
+        self.calls["itemconfig"] += 1
+
+    itemconfigure = itemconfig
+
+    def tag_raise(self, *args) -> None:
+        self.calls["tag_raise"] += 1
+
+    def tag_lower(self, *args) -> None:
+        self.calls["tag_lower"] += 1
+
+    def gettags(self, item: int) -> Tuple[str, ...]:
+        return self.items.get(item, ())
+
+    def find_withtag(self, tag_or_id: str | int) -> Tuple[int, ...]:
+        return tuple(self.find_items(tag_or_id))
+
+    def winfo_width(self) -> int:
+        return self.width
+
+    def winfo_height(self) -> int:
+        return self.height
+
+    def update_idletasks(self) -> None:
+        pass
+
+    def bind(self, *args, **kwargs) -> None:
+        pass
+
+
+# Stand-in for labels, texts, buttons & variables, any method call is only counted,
+# get & set work like those of a variable or an entry
+class RecordingWidget:
+    def __init__(self, value: Any = "") -> None:
+        self.value = value
+
+        self.calls: Counter = Counter()
+
+    def __getattr__(self, name: str) -> Callable[..., Any]:
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        def record(*args, **kwargs) -> None:
+            self.calls[name] += 1
+
+        return record
+
+    def get(self, *args) -> Any:
+        return self.value
+
+    def set(self, value: Any) -> None:
+        self.value = value
+
+
+class RecordingListbox:
+    def __init__(self) -> None:
+        self.entries: List[str] = []
+        self.selection: Tuple[int, ...] = ()
+
+    def get_index(self, index: int | str) -> int:
+        return len(self.entries) - 1 if index == "end" else int(index)
+
+    def insert(self, index: int | str, *entries: str) -> None:
+        if index == "end":
+            self.entries.extend(entries)
+        else:
+            self.entries[int(index) : int(index)] = list(entries)
+
+    def delete(
+        self, first: int | str | Tuple[int, ...], last: int | str | None = None
+    ) -> None:
+        if isinstance(first, tuple):
+            first = first[0]
+
+        first = self.get_index(first)
+
+        if last is None:
+            del self.entries[first]
+        else:
+            del self.entries[first : self.get_index(last) + 1]
+
+        self.selection = ()
+
+    def get(self, index: int | str) -> str:
+        return self.entries[self.get_index(index)]
+
+    def size(self) -> int:
+        return len(self.entries)
+
+    def curselection(self) -> Tuple[int, ...]:
+        return self.selection
+
+    def selection_set(self, index: int | str) -> None:
+        self.selection = (self.get_index(index),)
+
+    def selection_clear(self, *args) -> None:
+        self.selection = ()
+
+    def see(self, *args) -> None:
+        pass
+
+    def activate(self, *args) -> None:
+        pass
+
+
+# Runs the work right away in the calling thread, so that saving & loading are measured
+# from start to finish
+class SynchronousTaskRunner:
+    def submit(
+        self,
+        group: str,
+        work: Callable[[Task], Any],
+        on_done: Callable[[Any], None],
+        on_error: Callable[[Exception], None],
+    ) -> Task:
+        task = Task(group)
+
+        try:
+            result = work(task)
+        except Exception as error:
+            on_error(error)
+        else:
+            on_done(result)
+
+        return task
+
+    def is_running(self, group: str) -> bool:
+        return False
+
+    def cancel(self, group: str) -> bool:
+        return False
+
+    def cancel_all(self) -> bool:
+        return False
+
+    def shutdown(self) -> None:
+        pass
@@ -0,0 +1,400 @@
+from argparse import ArgumentParser
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from itertools import count
+from json import dump, load
+from pathlib import Path
+from platform import platform, python_version
+from statistics import median
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Callable, Dict, Iterator, List, NamedTuple, Sequence
+import sys
+import numpy as np
+from bezier_curve import BezierCurve
+from bezier_geometry import BezierGeometry
+from project_format import CurveData, create_project_data, write_project
+from viewport import Viewport
+import projects_manager
+from benchmarks.headless_main_frame import HeadlessMainFrame
+from benchmarks.recording_widgets import (
+    RecordingCanvas,
+    RecordingWidget,
+    SynchronousTaskRunner,
+)
+from benchmarks.synthetic_projects import create_synthetic_curves
+
+
+# Run with `python -m benchmarks.run_benchmarks` from the repository's root
+
+BENCHMARK_SIZES: Sequence[int] = (10, 1000, 100000)
+
+DEFAULT_REPEATS: int = 5
+
+# Projects at least this large take seconds per run, so they are measured fewer times
+LARGE_PROJECT_CURVES: int = 10000
+LARGE_PROJECT_REPEATS: int = 1
+
+# A benchmark regresses when it's this many times slower than its baseline
+DEFAULT_THRESHOLD: float = 1.5
+
+# Timings shorter than this (in seconds) are mostly noise, so they are never compared
+MIN_COMPARED_SECONDS: float = 0.005
+
+# t at which every curve is evaluated by the curve point benchmark
+CURVE_POINT_SAMPLES: int = 8
+
+# Curves selected one after another by the selection benchmark
+SELECTED_CURVE_COUNT: int = 20
+
+BENCHMARKS_PATH = Path(__file__).parent
+
+BASELINE_FILENAME = str(BENCHMARKS_PATH / "baseline.json")
+RESULTS_FILENAME = str(BENCHMARKS_PATH / "results.json")
+
+RESULTS_FORMAT_VERSION: int = 1
+
+# A benchmark prepares everything that isn't measured & returns the measured run, which
+# returns the canvas calls it made (if it draws)
+Benchmark = Callable[[List[CurveData]], Callable[[], Dict[str, int] | None]]
+
+
+class BenchmarkResult(NamedTuple):
+    name: str
+    curve_count: int
+    repeats: int
+    min_seconds: float
+    median_seconds: float
+    canvas_calls: Dict[str, int] | None
+
+
+saved_project_numbers = count(1)
+
+
+@contextmanager
+def temporary_saves_directory() -> Iterator[str]:
+    original_root_path = projects_manager.root_path
+    original_catalog = projects_manager.project_catalog
+
+    with TemporaryDirectory() as directory:
+        Path(directory, "saves").mkdir()
+
+        projects_manager.root_path = Path(directory)
+        projects_manager.project_catalog = None
+
+        try:
+            yield directory
+        finally:
+            projects_manager.root_path = original_root_path
+            projects_manager.project_catalog = original_catalog
+
+
+def create_geometries(curves_data: List[CurveData]) -> List[BezierGeometry]:
+    return [
+        BezierGeometry(curve_data.points_coords, RecordingCanvas().height)
+        for curve_data in curves_data
+    ]
+
+
+def create_loaded_frame(curves_data: List[CurveData]) -> HeadlessMainFrame:
+    frame = HeadlessMainFrame()
+
+    frame.add_curves(curves_data)
+    frame.run_pending_jobs()
+
+    return frame
+
+
+def benchmark_calculate_curve_point(curves_data: List[CurveData]):
+    geometries = create_geometries(curves_data)
+
+    t_values = [i / (CURVE_POINT_SAMPLES - 1) for i in range(CURVE_POINT_SAMPLES)]
+
+    def run() -> None:
+        for geometry in geometries:
+            for t in t_values:
+                geometry.calculate_curve_point(t)
+
+    return run
+
+
+# The equations are created by BezierGeometry.calculate_parametric_equations, on a fresh
+# geometry, so nothing is cached
+def benchmark_parametric_equations(curves_data: List[CurveData]):
+    geometries = create_geometries(curves_data)
+
+    def run() -> None:
+        for geometry in geometries:
+            geometry.calculate_parametric_equations()
+
+    return run
+
+
+# Every curve drawn for the first time, the same way add_curves draws them
+def benchmark_draw(curves_data: List[CurveData]):
+    canvas = RecordingCanvas()
+    viewport = Viewport()
+
+    curves = [
+        BezierCurve(
+            name=f"Curve #{i}",
+            points_coords=curve_data.points_coords,
+            canvas_height=canvas.height,
+            viewport=viewport,
+        )
+        for i, curve_data in enumerate(curves_data)
+    ]
+
+    def run() -> Dict[str, int]:
+        for curve in curves:
+            curve.draw(canvas, raise_new_items=False)
+
+        return dict(canvas.calls)
+
+    return run
+
+
+# Every curve drawn again after panning, which reuses the canvas items
+def benchmark_redraw(curves_data: List[CurveData]):
+    frame = create_loaded_frame(curves_data)
+
+    frame.viewport.pan(10, 10)
+
+    frame.canvas.calls.clear()
+
+    def run() -> Dict[str, int]:
+        for curve in frame.curves:
+            curve.draw(frame.canvas)
+
+        return dict(frame.canvas.calls)
+
+    return run
+
+
+def benchmark_handle_curve_select(curves_data: List[CurveData]):
+    frame = create_loaded_frame(curves_data)
+
+    frame.canvas.calls.clear()
+
+    selected_indices = np.linspace(
+        0, len(curves_data) - 1, SELECTED_CURVE_COUNT, dtype=int
+    ).tolist()
+
+    def run() -> Dict[str, int]:
+        for index in selected_indices:
+            frame.select_curve(index)
+
+        return dict(frame.canvas.calls)
+
+    return run
+
+
+def benchmark_save_project(curves_data: List[CurveData]):
+    frame = create_loaded_frame(curves_data)
+
+    save_as_entry = RecordingWidget(f"benchmark_{next(saved_project_numbers)}")
+    save_info_label = RecordingWidget()
+
+    def run() -> None:
+        projects_manager.save_project(
+            frame.projects_listbox,
+            save_as_entry,
+            save_info_label,
+            lambda: None,
+            frame.get_list_of_curves,
+            SynchronousTaskRunner(),
+        )
+
+    return run
+
+
+# Reading the project & creating & drawing its curves
+def benchmark_load_project(curves_data: List[CurveData]):
+    project_name = f"benchmark_{next(saved_project_numbers)}"
+
+    project_filename = projects_manager.get_project_filename(project_name)
+
+    write_project(
+        project_filename, create_project_data(project_name, None, curves_data)
+    )
+
+    projects_manager.get_project_catalog().add_project(project_name, project_filename)
+
+    frame = HeadlessMainFrame()
+
+    frame.projects_listbox.insert("end", project_name)
+    frame.projects_listbox.selection_set(0)
+
+    def run() -> Dict[str, int]:
+        projects_manager.load_project(
+            frame.projects_listbox,
+            frame.save_as_entry,
+            frame.save_info_label,
+            frame.open_project,
+            frame.task_runner,
+        )
+
+        frame.run_pending_jobs()
+
+        return dict(frame.canvas.calls)
+
+    return run
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    "calculate_curve_point": benchmark_calculate_curve_point,
+    "parametric_equations": benchmark_parametric_equations,
+    "draw": benchmark_draw,
+    "redraw": benchmark_redraw,
+    "handle_curve_select": benchmark_handle_curve_select,
+    "save_project": benchmark_save_project,
+    "load_project": benchmark_load_project,
+}
+
+
+def get_result_key(name: str, curve_count: int) -> str:
+    return f"{name}[{curve_count}]"
+
+
+def run_benchmark(
+    name: str, curves_data: List[CurveData], repeats: int
+) -> BenchmarkResult:
+    timings: List[float] = []
+    canvas_calls: Dict[str, int] | None = None
+
+    for _ in range(repeats):
+        run = BENCHMARKS[name](curves_data)
+
+        start = perf_counter()
+        canvas_calls = run()
+        timings.append(perf_counter() - start)
+
+    return BenchmarkResult(
+        name, len(curves_data), repeats, min(timings), median(timings), canvas_calls
+    )
+
+
+def run_benchmarks(
+    sizes: Sequence[int], names: Sequence[str], repeats: int
+) -> List[BenchmarkResult]:
+    results: List[BenchmarkResult] = []
+
+    with temporary_saves_directory():
+        for curve_count in sizes:
+            curves_data = create_synthetic_curves(curve_count)
+
+            for name in names:
+                result = run_benchmark(
+                    name,
+                    curves_data,
+                    repeats
+                    if curve_count < LARGE_PROJECT_CURVES
+                    else LARGE_PROJECT_REPEATS,
+                )
+
+                print(
+                    f"{get_result_key(name, curve_count):<32}"
+                    f"{result.min_seconds * 1000:>12.2f} ms"
+                    f"{result.median_seconds * 1000:>12.2f} ms (median)"
+                )
+
+                results.append(result)
+
+    return results
+
+
+def write_results(filename: str, results: List[BenchmarkResult]) -> None:
+    with open(filename, "w") as f:
+        dump(
+            {
+                "version": RESULTS_FORMAT_VERSION,
+                "created": datetime.now(timezone.utc).isoformat(),
+                "python": python_version(),
+                "numpy": np.__version__,
+                "platform": platform(),
+                "results": {
+                    get_result_key(result.name, result.curve_count): result._asdict()
+                    for result in results
+                },
+            },
+            f,
+            indent=2,
+        )
+
+
+# Returns the keys of the benchmarks that got slower than threshold times the baseline
+def compare_with_baseline(
+    results: List[BenchmarkResult], baseline_filename: str, threshold: float
+) -> List[str]:
+    with open(baseline_filename) as f:
+        baseline = load(f)["results"]
+
+    regressions: List[str] = []
+
+    for result in results:
+        key = get_result_key(result.name, result.curve_count)
+
+        if key not in baseline:
+            print(f"{key:<32}{'no baseline':>15}")
+            continue
+
+        baseline_seconds = baseline[key]["min_seconds"]
+
+        ratio = result.min_seconds / max(baseline_seconds, 10 ** (-9))
+
+        if max(result.min_seconds, baseline_seconds) < MIN_COMPARED_SECONDS:
+            status = "too fast to compare"
+        elif ratio > threshold:
+            status = "REGRESSION"
+            regressions.append(key)
+        else:
+            status = "ok"
+
+        print(f"{key:<32}{ratio:>12.2f} x  {status}")
+
+    return regressions
+
+
+def main() -> int:
+    parser = ArgumentParser(
+        description="Benchmarks of the geometry, rendering & persistence hot paths"
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(BENCHMARK_SIZES))
+    parser.add_argument(
+        "--benchmarks", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS)
+    )
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS)
+    parser.add_argument("--output", default=RESULTS_FILENAME)
+    parser.add_argument("--baseline", default=BASELINE_FILENAME)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="store the results as the new baseline instead of comparing with it",
+    )
+
+    arguments = parser.parse_args()
+
+    results = run_benchmarks(arguments.sizes, arguments.benchmarks, arguments.repeats)
+
+    write_results(arguments.output, results)
+
+    if arguments.update_baseline:
+        write_results(arguments.baseline, results)
+
+        return 0
+
+    if not Path(arguments.baseline).exists():
+        print("No baseline to compare with, store one with --update-baseline")
+
+        return 0
+
+    regressions = compare_with_baseline(
+        results, arguments.baseline, arguments.threshold
+    )
+
+    return 1 if len(regressions) > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+from typing import Dict, List, Tuple
+import numpy as np
+from bezier_curve import (
+    DEFAULT_CURVE_WIDTH,
+    DEFAULT_ENDPOINT_COLOR,
+    DEFAULT_CONTROL_POINT_COLOR,
+    DEFAULT_X_EXTREMUM_COLOR,
+    DEFAULT_Y_EXTREMUM_COLOR,
+)
+from project_format import CurveAttributes, CurveData, ProjectData, create_project_data
+
+
+# Share of the curves with every amount of points, drawings are mostly cubic curves
+POINT_AMOUNT_WEIGHTS: Dict[int, float] = {
+    2: 0.2,
+    3: 0.25,
+    4: 0.4,
+    5: 0.06,
+    6: 0.04,
+    8: 0.03,
+    11: 0.02,
+}
+
+# Curves are spread over the default canvas, each within a square of this size
+SYNTHETIC_WORLD_SIZE: Tuple[int, int] = (1200, 800)
+SYNTHETIC_CURVE_SPAN: int = 160
+
+# Every this many curves have non-default attributes
+CUSTOM_ATTRIBUTES_INTERVAL: int = 10
+
+CUSTOM_ATTRIBUTES = CurveAttributes(
+    width=DEFAULT_CURVE_WIDTH + 1,
+    color="#3366ff",
+    endpoints_color=DEFAULT_ENDPOINT_COLOR,
+    control_points_color=DEFAULT_CONTROL_POINT_COLOR,
+    x_extremum_points_color=DEFAULT_X_EXTREMUM_COLOR,
+    y_extremum_points_color=DEFAULT_Y_EXTREMUM_COLOR,
+    dashed_line_visible=True,
+    extremum_points_visible=True,
+    bounding_box_visible=True,
+)
+
+
+# The same seed always gives the same curves, so that runs can be compared
+def create_synthetic_curves(curve_count: int, seed: int = 0) -> List[CurveData]:
+    rng = np.random.default_rng(seed)
+
+    point_amounts = list(POINT_AMOUNT_WEIGHTS)
+    weights = np.array(list(POINT_AMOUNT_WEIGHTS.values()))
+
+    amounts = rng.choice(point_amounts, size=curve_count, p=weights / weights.sum())
+
+    corners = rng.uniform(
+        (0, 0),
+        (
+            SYNTHETIC_WORLD_SIZE[0] - SYNTHETIC_CURVE_SPAN,
+            SYNTHETIC_WORLD_SIZE[1] - SYNTHETIC_CURVE_SPAN,
+        ),
+        size=(curve_count, 2),
+    )
+
+    curves: List[CurveData] = []
+
+    for i in range(curve_count):
+        points = corners[i] + rng.uniform(0, SYNTHETIC_CURVE_SPAN, size=(amounts[i], 2))
+
+        curves.append(
+            CurveData(
+                [(x, y) for x, y in np.rint(points).astype(int).tolist()],
+                CUSTOM_ATTRIBUTES if i % CUSTOM_ATTRIBUTES_INTERVAL == 0 else None,
+            )
+        )
+
+    return curves
+
+
+def create_synthetic_project(curve_count: int, seed: int = 0) -> ProjectData:
+    return create_project_data(
+        f"synthetic_{curve_count}", None, create_synthetic_curves(curve_count, seed)
+    )
@@ -0,0 +1,298 @@
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+from bezier_geometry import EPS
+from bezier_sampling import get_bernstein_basis, get_power_basis_matrix
+from arc_length import batch_arc_lengths, batch_equally_spaced_points
+from curve_projection import Projections, batch_project_points
+
+
+# Cap on the line segments of a single flattened curve
+MAX_FLATTENED_SEGMENTS: int = 2**16
+
+# Roots whose imaginary part is smaller than this are treated as real (double roots
+# come out of the eigenvalue solver as pairs with a tiny imaginary part)
+IMAGINARY_EPS = 10 ** (-7)
+
+
+# control_points has shape (N, degree + 1, 2), the result has the same shape.
+# If canvas_height is given, y is flipped the same way as in BezierGeometry's equations.
+def batch_coefficients(
+    control_points: np.ndarray, canvas_height: float | None = None
+) -> np.ndarray:
+    control_points = np.array(control_points, dtype=float)
+
+    if canvas_height is not None:
+        control_points[:, :, 1] = canvas_height - control_points[:, :, 1]
+
+    return get_power_basis_matrix(control_points.shape[1] - 1) @ control_points
+
+
+# Real roots in [0, 1] of K polynomials of the same degree (coefficients of shape (K, m + 1),
+# lowest power first). Returns shape (K, m), sorted & padded with NaN.
+def batch_polynomial_roots(coefficients: np.ndarray) -> np.ndarray:
+    polynomial_count, coefficient_count = coefficients.shape
+
+    roots = np.full((polynomial_count, max(coefficient_count - 1, 0)), np.nan)
+
+    scale = np.maximum(np.abs(coefficients).max(axis=1, initial=0.0), 1.0)
+
+    # Effective degree of every polynomial, ignoring (numerically) zero leading coefficients
+    nonzero = np.abs(coefficients) >= EPS * scale[:, None]
+    degrees = np.where(
+        nonzero.any(axis=1),
+        coefficient_count - 1 - np.argmax(nonzero[:, ::-1], axis=1),
+        0,
+    )
+
+    # Polynomials of the same effective degree are solved together through the
+    # eigenvalues of their companion matrices
+    for degree in range(1, coefficient_count):
+        indices = np.flatnonzero(degrees == degree)
+
+        if len(indices) == 0:
+            continue
+
+        monic = coefficients[indices, :degree] / coefficients[indices, degree][:, None]
+
+        if degree == 1:
+            group_roots = -monic
+        else:
+            companion = np.zeros((len(indices), degree, degree))
+            companion[:, 1:, :-1] = np.eye(degree - 1)
+            companion[:, :, -1] = -monic
+
+            group_roots = np.linalg.eigvals(companion)
+
+        valid = (
+            (np.abs(np.imag(group_roots)) < IMAGINARY_EPS)
+            & (np.real(group_roots) >= -EPS)
+            & (np.real(group_roots) <= 1 + EPS)
+        )
+
+        group_roots = np.where(valid, np.clip(np.real(group_roots), 0.0, 1.0), np.nan)
+
+        roots[indices, :degree] = np.sort(group_roots, axis=1)
+
+    return roots
+
+
+# Returns the extrema in t of shape (N, 2, degree - 1), where [:, 0] are the extrema in X
+# & [:, 1] in Y, padded with NaN
+def batch_extrema(control_points: np.ndarray) -> np.ndarray:
+    control_points = np.asarray(control_points, dtype=float)
+
+    curve_count, point_count, _ = control_points.shape
+
+    if point_count < 3:
+        return np.full((curve_count, 2, 0), np.nan)
+
+    coefficients = batch_coefficients(control_points)
+
+    # Derivative of the power basis polynomial, still lowest power first
+    powers = np.arange(1, point_count)[None, :, None]
+    derivative = coefficients[:, 1:, :] * powers
+
+    # (N, degree, 2) -> (N * 2, degree), so that both axes are solved in one pass
+    roots = batch_polynomial_roots(
+        derivative.transpose(0, 2, 1).reshape(curve_count * 2, point_count - 1)
+    )
+
+    return roots.reshape(curve_count, 2, point_count - 2)
+
+
+# Evaluate N curves, each at its own parameters t of shape (N, K), giving (N, K, 2)
+def batch_evaluate(control_points: np.ndarray, t: np.ndarray) -> np.ndarray:
+    control_points = np.asarray(control_points, dtype=float)
+
+    basis = get_bernstein_basis(t, control_points.shape[1] - 1)
+
+    return basis @ control_points
+
+
+# Tight axis-aligned bounding boxes (min_x, min_y, max_x, max_y) of shape (N, 4)
+def batch_bounding_boxes(control_points: np.ndarray) -> np.ndarray:
+    control_points = np.asarray(control_points, dtype=float)
+
+    curve_count = control_points.shape[0]
+
+    # The endpoints & every extremum are the only candidates for the box's sides,
+    # missing extrema are replaced by an endpoint
+    extrema = batch_extrema(control_points).reshape(curve_count, -1)
+
+    t = np.concatenate(
+        [
+            np.zeros((curve_count, 1)),
+            np.ones((curve_count, 1)),
+            np.nan_to_num(extrema, nan=0.0),
+        ],
+        axis=1,
+    )
+
+    candidates = batch_evaluate(control_points, t)
+
+    return np.concatenate([candidates.min(axis=1), candidates.max(axis=1)], axis=1)
+
+
+# Polylines at most tolerance away from the curves, one array of shape (K, 2) per curve.
+# Splitting a curve of degree d into n equal steps of t keeps it within
+# d * (d - 1) * max |P[i] - 2 * P[i + 1] + P[i + 2]| / (8 * n^2) of the polyline, which
+# gives every curve its amount of segments, so that all of them are evaluated at once.
+def batch_flatten(control_points: np.ndarray, tolerance: float) -> List[np.ndarray]:
+    control_points = np.asarray(control_points, dtype=float)
+
+    curve_count, point_count, _ = control_points.shape
+
+    degree = point_count - 1
+
+    if point_count < 3:
+        segment_counts = np.ones(curve_count, dtype=np.int64)
+    else:
+        second_differences = (
+            control_points[:, :-2] - 2 * control_points[:, 1:-1] + control_points[:, 2:]
+        )
+
+        bound = np.hypot(second_differences[..., 0], second_differences[..., 1]).max(
+            axis=1
+        ) * (degree * (degree - 1) / (8 * tolerance))
+
+        segment_counts = np.clip(
+            np.ceil(np.sqrt(bound)), 1, MAX_FLATTENED_SEGMENTS
+        ).astype(np.int64)
+
+    sample_counts = segment_counts + 1
+
+    ends = np.cumsum(sample_counts)
+
+    curve_indices = np.repeat(np.arange(curve_count), sample_counts)
+
+    t = (np.arange(ends[-1]) - (ends - sample_counts)[curve_indices]) / segment_counts[
+        curve_indices
+    ]
+
+    # (K, degree + 1) basis rows, each combined with the points of its own curve
+    points = np.einsum(
+        "kj,kjc->kc",
+        get_bernstein_basis(t, degree),
+        control_points[curve_indices],
+    )
+
+    return np.split(points, ends[:-1])
+
+
+# Curves of a project can have different degrees, so they are processed in one batch
+# per amount of points. Returns {amount of points: (indices of curves, control points)}.
+def group_curves_by_point_amount(
+    curves_points_coords: Sequence[Sequence[Tuple[float, float]]]
+) -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+    indices_by_amount: Dict[int, List[int]] = {}
+
+    for i in range(len(curves_points_coords)):
+        indices_by_amount.setdefault(len(curves_points_coords[i]), []).append(i)
+
+    groups: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+
+    for amount, indices in indices_by_amount.items():
+        groups[amount] = (
+            np.array(indices),
+            np.array([curves_points_coords[i] for i in indices], dtype=float).reshape(
+                len(indices), amount, 2
+            ),
+        )
+
+    return groups
+
+
+def get_bounding_boxes(
+    curves_points_coords: Sequence[Sequence[Tuple[float, float]]]
+) -> np.ndarray:
+    bounding_boxes = np.zeros((len(curves_points_coords), 4))
+
+    for indices, control_points in group_curves_by_point_amount(
+        curves_points_coords
+    ).values():
+        bounding_boxes[indices] = batch_bounding_boxes(control_points)
+
+    return bounding_boxes
+
+
+# Extent (min_x, min_y, max_x, max_y) of all curves together, None if there are none
+def get_curves_extent(
+    curves_points_coords: Sequence[Sequence[Tuple[float, float]]]
+) -> Tuple[float, float, float, float] | None:
+    if len(curves_points_coords) == 0:
+        return None
+
+    bounding_boxes = get_bounding_boxes(curves_points_coords)
+
+    return (
+        float(bounding_boxes[:, 0].min()),
+        float(bounding_boxes[:, 1].min()),
+        float(bounding_boxes[:, 2].max()),
+        float(bounding_boxes[:, 3].max()),
+    )
+
+
+def get_arc_lengths(
+    curves_points_coords: Sequence[Sequence[Tuple[float, float]]]
+) -> np.ndarray:
+    arc_lengths = np.zeros(len(curves_points_coords))
+
+    for indices, control_points in group_curves_by_point_amount(
+        curves_points_coords
+    ).values():
+        arc_lengths[indices] = batch_arc_lengths(control_points)
+
+    return arc_lengths
+
+
+# point_count points along every curve with equal distances between them,
+# shape (N, point_count, 2)
+def get_equally_spaced_points(
+    curves_points_coords: Sequence[Sequence[Tuple[float, float]]], point_count: int
+) -> np.ndarray:
+    points = np.zeros((len(curves_points_coords), point_count, 2))
+
+    for indices, control_points in group_curves_by_point_amount(
+        curves_points_coords
+    ).values():
+        points[indices] = batch_equally_spaced_points(control_points, point_count)
+
+    return points
+
+
+# Nearest points of every curve to every query point of shape (M, 2), shape (N, M)
+def get_nearest_points(
+    curves_points_coords: Sequence[Sequence[Tuple[float, float]]],
+    queries: Sequence[Tuple[float, float]],
+) -> Projections:
+    query_count = len(queries)
+
+    t = np.zeros((len(curves_points_coords), query_count))
+    points = np.zeros((len(curves_points_coords), query_count, 2))
+    distances = np.zeros((len(curves_points_coords), query_count))
+
+    for indices, control_points in group_curves_by_point_amount(
+        curves_points_coords
+    ).values():
+        projections = batch_project_points(control_points, queries)
+
+        t[indices] = projections.t
+        points[indices] = projections.points
+        distances[indices] = projections.distances
+
+    return Projections(t, points, distances)
+
+
+# Indices of the curves whose bounding boxes (shape (N, 4)) are at most max_distance
+# away from the point, only their curves can have a point that close
+def get_curves_near_point(
+    bounding_boxes: np.ndarray, point: Tuple[float, float], max_distance: float
+) -> List[int]:
+    near = (
+        (bounding_boxes[:, 0] - max_distance <= point[0])
+        & (bounding_boxes[:, 1] - max_distance <= point[1])
+        & (bounding_boxes[:, 2] + max_distance >= point[0])
+        & (bounding_boxes[:, 3] + max_distance >= point[1])
+    )
+
+    return np.flatnonzero(near).tolist()
@@ -1,11 +1,15 @@
-from typing import List, Tuple, Dict
-from canvas_point import P, CanvasPoint, DEFAULT_POINT_SMALLER_DIAMETER
-from tkinter import Canvas
-from math import sqrt
+from typing import List, Sequence, Tuple
+from itertools import count
+from canvas_point import CanvasPoint, DEFAULT_POINT_SMALLER_DIAMETER
+from tkinter import Canvas, NORMAL, HIDDEN
+from bezier_geometry import P, BezierGeometry
+from curve_flattening import DEFAULT_FLATTENING_TOLERANCE
+from viewport import Viewport
+from project_format import CurveAttributes
+from curve_projection import CurveProjection
+from instrumentation import instrumentation
 
 
-EPS = 10 ** (-6)
-
 DEFAULT_CURVE_WIDTH: int = 3
 
 DEFAULT_CURVE_COLOR: str = "#050505"
@@ -18,81 +22,62 @@ DEFAULT_X_EXTREMUM_COLOR = "#00cc00"
 
 DEFAULT_Y_EXTREMUM_COLOR = "#cc00cc"
 
-BEZIER_CURVE_DETAIL: int = 100
 
-InvalidPointAmoundError: ValueError = ValueError("Invalid Amount of Points")
+# Every canvas item of a curve is tagged with the curve's tag, its role tag & the
+# combination of both, so that whole groups can be configured with a single call
+CURVE_LINE_TAG = "curve_line"
 
-curve_names: Dict[int, str] = {
-    2: "Linear",
-    3: "Quadratic",
-    4: "Cubic",
-}
+DASHED_LINE_TAG = "dashed_line"
 
+BOUNDING_BOX_TAG = "bounding_box"
 
-def get_points_default_pos(
-    amount_of_points: int, canvas_width: int, canvas_height: int
-) -> List[P]:
-    half_canvas_width = round(canvas_width / 2)
+HANDLE_TAG = "handle"
 
-    half_canvas_height = round(canvas_height / 2)
-    quarter_canvas_height = round(canvas_height / 4)
-    twelfth_canvas_height = round(canvas_height / 12)
+EXTREMUM_POINT_TAG = "extremum_point"
 
-    points: List[P] = []
+curve_tag_counter = count(1)
 
-    if amount_of_points == 2:
-        points.extend(
-            [
-                (half_canvas_width, quarter_canvas_height),
-                (half_canvas_width, quarter_canvas_height * 3),
-            ]
-        )
 
-    elif amount_of_points == 3:
-        points.extend(
-            [
-                (half_canvas_width, quarter_canvas_height),
-                (half_canvas_width, half_canvas_height),
-                (half_canvas_width, quarter_canvas_height * 3),
-            ]
-        )
+def get_new_curve_tag() -> str:
+    return f"curve{next(curve_tag_counter)}"
 
-    elif amount_of_points == 4:
-        points.extend(
-            [
-                (half_canvas_width, quarter_canvas_height),
-                (half_canvas_width, twelfth_canvas_height * 5),
-                (half_canvas_width, twelfth_canvas_height * 7),
-                (half_canvas_width, quarter_canvas_height * 3),
-            ]
-        )
 
-    else:
-        raise InvalidPointAmoundError
+def get_item_tags(curve_tag: str, role_tag: str) -> Tuple[str, str, str]:
+    return (curve_tag, role_tag, f"{curve_tag}.{role_tag}")
+
 
-    return points
+# Tkinter's coords() expects a flat sequence of numbers
+def flatten_coords(points_coords: List[Tuple[float, float]]) -> List[float]:
+    return [coord for point_coords in points_coords for coord in point_coords]
 
 
 class BezierCurve:
     def __init__(
         self,
         name: str,
-        points: List[CanvasPoint],
+        points_coords: List[P],
         canvas_height: int,
         width: int = DEFAULT_CURVE_WIDTH,
         color: str = DEFAULT_CURVE_COLOR,
+        tag: str | None = None,
+        viewport: Viewport | None = None,
     ) -> None:
         self.name: str = name
-        self.points: List[CanvasPoint] = points
+        self.tag: str = tag if tag is not None else get_new_curve_tag()
+        # Points are stored in world coordinates, the viewport maps them onto the canvas
+        self.viewport: Viewport = viewport if viewport is not None else Viewport()
+        self.geometry = BezierGeometry(points_coords, canvas_height)
+        # Draggable handles only exist while the curve is being edited
+        self.handles: List[CanvasPoint] = []
         self.curve = None
-        self.equations: Tuple[str, str] = ("", "")
+        # Pool of extremum points, only the first len(self.all_extrema) of them are in use
         self.extremum_points: List[CanvasPoint] = []
         self.x_extremum_points_color: str = DEFAULT_X_EXTREMUM_COLOR
         self.y_extremum_points_color: str = DEFAULT_Y_EXTREMUM_COLOR
-        self.all_extrema: List[float] = []
-        self.x_extrema: List[float] = []
-        self.y_extrema: List[float] = []
         self.width: int = width
+        self.flattening_tolerance: float = DEFAULT_FLATTENING_TOLERANCE
+        # Amount of line segments the curve was last drawn with
+        self.segment_count: int = 0
         self.dashed_line = None
         self.dashed_line_visible: bool = True
         self.extremum_points_visible: bool = True
@@ -104,364 +89,296 @@ class BezierCurve:
         self.bounding_box_visible: bool = False
         self.bounding_box_canvas_line: int | None = None
 
-        self.canvas_height = canvas_height
+    # The equations & extrema are kept up to date by the geometry whenever a point moves
+    @property
+    def equations(self) -> Tuple[str, str]:
+        return self.geometry.equations
+
+    @property
+    def all_extrema(self) -> List[float]:
+        return self.geometry.all_extrema
+
+    @property
+    def x_extrema(self) -> List[float]:
+        return self.geometry.x_extrema
+
+    @property
+    def y_extrema(self) -> List[float]:
+        return self.geometry.y_extrema
+
+    @property
+    def points_coords(self) -> List[P]:
+        return self.geometry.points_coords
+
+    @property
+    def length(self) -> float:
+        return self.geometry.length
+
+    # Only the edited curve has handles, its dashed line & extremum points are shown
+    @property
+    def editing(self) -> bool:
+        return len(self.handles) > 0
+
+    # Everything that is saved with the curve apart from its points
+    def get_attributes(self) -> CurveAttributes:
+        return CurveAttributes(
+            width=self.width,
+            color=self.color,
+            endpoints_color=self.endpoints_color,
+            control_points_color=self.control_points_color,
+            x_extremum_points_color=self.x_extremum_points_color,
+            y_extremum_points_color=self.y_extremum_points_color,
+            dashed_line_visible=self.dashed_line_visible,
+            extremum_points_visible=self.extremum_points_visible,
+            bounding_box_visible=self.bounding_box_visible,
+        )
 
-    def raise_curve_widgets(self, canvas: Canvas) -> None:
-        if self.curve is not None:
-            canvas.tag_raise(self.curve)
+    # Takes effect when the curve is drawn next time
+    def apply_attributes(self, attributes: CurveAttributes) -> None:
+        self.width = attributes.width
+        self.color = attributes.color
+        self.endpoints_color = attributes.endpoints_color
+        self.control_points_color = attributes.control_points_color
+        self.x_extremum_points_color = attributes.x_extremum_points_color
+        self.y_extremum_points_color = attributes.y_extremum_points_color
+        self.dashed_line_visible = attributes.dashed_line_visible
+        self.extremum_points_visible = attributes.extremum_points_visible
+        self.bounding_box_visible = attributes.bounding_box_visible
+
+    def set_point_coords(self, index: int, new_coords: P) -> None:
+        self.geometry.set_point_coords(index, new_coords)
+
+        if len(self.handles) > 0:
+            self.handles[index].move_to(self.viewport.world_to_screen(new_coords))
+
+    def get_handle_color(self, index: int) -> str:
+        if index == 0 or index == len(self.points_coords) - 1:
+            return self.endpoints_color
+        return self.control_points_color
+
+    def create_handles(self, canvas: Canvas) -> None:
+        if len(self.handles) == 0:
+            self.handles = [
+                CanvasPoint(
+                    self.viewport.world_to_screen(self.points_coords[i]),
+                    canvas,
+                    self.get_handle_color(i),
+                    tags=get_item_tags(self.tag, HANDLE_TAG),
+                )
+                for i in range(len(self.points_coords))
+            ]
 
-            for point in self.extremum_points:
-                canvas.tag_raise(point.point)
+    def release_handles(self, canvas: Canvas) -> None:
+        if len(self.handles) > 0:
+            canvas.delete(self.get_role_tag(HANDLE_TAG))
+            self.handles = []
 
-            for point in self.points:
-                canvas.tag_raise(point.point)
+    def get_role_tag(self, role_tag: str) -> str:
+        return f"{self.tag}.{role_tag}"
 
-    def draw(self, canvas: Canvas) -> None:
+    def raise_curve_widgets(self, canvas: Canvas) -> None:
         if self.curve is not None:
-            canvas.delete(self.curve)
-            self.curve = None
-        if self.dashed_line is not None:
-            canvas.delete(self.dashed_line)
-            self.dashed_line = None
-        if self.bounding_box_canvas_line is not None:
-            canvas.delete(self.bounding_box_canvas_line)
-            self.bounding_box_canvas_line = None
-
-        for point in self.extremum_points:
-            canvas.delete(point.point)
-        self.extremum_points = []
-
-        curve_points: List[Tuple[float, float]] = []
-
-        # For linear Bézier curves
-        if len(self.points) == 2:
-            # Because linear Bézier curves are just straight lines, we do not have to calculate anything
-            curve_points = [point.point_coords for point in self.points]
-        # For quadratic & cubic Bézier curves
-        else:
-            for i in range(BEZIER_CURVE_DETAIL):
-                t = i / (BEZIER_CURVE_DETAIL - 1)
+            canvas.tag_raise(self.tag)
+            canvas.tag_raise(self.get_role_tag(EXTREMUM_POINT_TAG))
+            canvas.tag_raise(self.get_role_tag(HANDLE_TAG))
 
-                point_x, point_y = self.calculate_curve_point(t)
-
-                curve_points.append((point_x, point_y))
-
-        self.curve = canvas.create_line(
-            *curve_points, width=self.width, fill=self.color
-        )
+    # Show the handles & dashed line used for editing the curve, the extremum points are
+    # handled by update_extremum_points_visibility
+    def show_editing_widgets(self, canvas: Canvas) -> None:
+        self.create_handles(canvas)
 
         if self.dashed_line_visible:
-            self.dashed_line = canvas.create_line(
-                [point.point_coords for point in self.points],
-                dash=(5, 1),
-                fill=self.color,
+            canvas.itemconfig(self.get_role_tag(DASHED_LINE_TAG), state=NORMAL)
+
+    def hide_editing_widgets(self, canvas: Canvas) -> None:
+        self.release_handles(canvas)
+        canvas.itemconfig(self.get_role_tag(DASHED_LINE_TAG), state=HIDDEN)
+        canvas.itemconfig(self.get_role_tag(EXTREMUM_POINT_TAG), state=HIDDEN)
+
+    # Existing canvas items are updated in place, so their IDs & stacking order stay the same.
+    # When many curves are drawn at once, raising can be left to the caller.
+    @instrumentation.timed("BezierCurve.draw")
+    def draw(self, canvas: Canvas, raise_new_items: bool = True) -> None:
+        created_new_items = False
+
+        # The tolerance is in screen pixels, so zoomed in curves get more segments
+        curve_points = self.viewport.points_to_screen(
+            self.geometry.flatten_curve_points(
+                self.flattening_tolerance / self.viewport.zoom
             )
-
-        self.create_parametric_equations()
-
-        if self.extremum_points_visible:
-            for x_extremum in self.x_extrema:
-                self.create_extremum_point(
-                    canvas, x_extremum, self.x_extremum_points_color
-                )
-            for y_extremum in self.y_extrema:
-                self.create_extremum_point(
-                    canvas, y_extremum, self.y_extremum_points_color
-                )
-
-        if self.bounding_box_visible:
-            self.draw_bounding_box(canvas)
-
-        self.raise_curve_widgets(canvas)
-
-    def create_extremum_point(self, canvas, extremum: float, color: str):
-        extremum_coords = self.calculate_curve_point(extremum)
-
-        point = CanvasPoint(
-            extremum_coords,
-            canvas,
-            color,
-            point_diameter=DEFAULT_POINT_SMALLER_DIAMETER,
         )
 
-        self.extremum_points.append(point)
-
-    def calculate_curve_point(self, t: float) -> P:
-        point_x = 0.0
-        point_y = 0.0
-
-        if len(self.points) == 2:
-            point_x = (1 - t) * self.points[0].point_coords[0] + t * self.points[
-                1
-            ].point_coords[0]
-            point_y = (1 - t) * self.points[0].point_coords[1] + t * self.points[
-                1
-            ].point_coords[1]
-
-        elif len(self.points) == 3:
-            point_x = (1 - t) * (
-                (1 - t) * self.points[0].point_coords[0]
-                + t * self.points[1].point_coords[0]
-            ) + t * (
-                (1 - t) * self.points[1].point_coords[0]
-                + t * self.points[2].point_coords[0]
-            )
+        self.segment_count = len(curve_points) - 1
 
-            point_y = (1 - t) * (
-                (1 - t) * self.points[0].point_coords[1]
-                + t * self.points[1].point_coords[1]
-            ) + t * (
-                (1 - t) * self.points[1].point_coords[1]
-                + t * self.points[2].point_coords[1]
-            )
-
-        elif len(self.points) == 4:
-            point_x = (
-                (1 - t) ** 3 * self.points[0].point_coords[0]
-                + 3 * (1 - t) ** 2 * t * self.points[1].point_coords[0]
-                + 3 * (1 - t) * t**2 * self.points[2].point_coords[0]
-                + t**3 * self.points[3].point_coords[0]
-            )
-
-            point_y = (
-                (1 - t) ** 3 * self.points[0].point_coords[1]
-                + 3 * (1 - t) ** 2 * t * self.points[1].point_coords[1]
-                + 3 * (1 - t) * t**2 * self.points[2].point_coords[1]
-                + t**3 * self.points[3].point_coords[1]
+        if self.curve is None:
+            self.curve = canvas.create_line(
+                *curve_points,
+                width=self.width,
+                fill=self.color,
+                tags=get_item_tags(self.tag, CURVE_LINE_TAG),
             )
-
+            created_new_items = True
         else:
-            raise InvalidPointAmoundError
-
-        return (round(point_x), round(point_y))
-
-    def create_parametric_equations(self) -> None:
-        # Calculate new y coords because of the tkinter / math positive y axis inversion
-        new_points_coords: List[P] = []
-
-        for point in self.points:
-            new_points_coords.append(
-                (point.point_coords[0], self.canvas_height - point.point_coords[1])
-            )
-
-        self.all_extrema = []
-        self.x_extrema = []
-        self.y_extrema = []
-
-        if len(self.points) == 2:
-            X = [
-                new_points_coords[1][0] - new_points_coords[0][0],
-                new_points_coords[0][0],
-            ]
-
-            for i in X:
-                i = round(i, 4)
-
-            Y = [
-                new_points_coords[1][1] - new_points_coords[0][1],
-                new_points_coords[0][1],
-            ]
-
-            for i in Y:
-                i = round(i, 4)
-
-            self.equations = (f"x = {X[0]}*t + {X[1]}", f"y = {Y[0]}*t + {Y[1]}")
+            canvas.coords(self.curve, flatten_coords(curve_points))
+            canvas.itemconfig(self.curve, width=self.width, fill=self.color)
 
-            # # Find extrema
-            self.x_extrema = [X[0]]
-            self.y_extrema = [Y[0]]
+        points_coords = self.viewport.points_to_screen(self.points_coords)
 
-        elif len(self.points) == 3:
-            X = [
-                new_points_coords[0][0]
-                - 2 * new_points_coords[1][0]
-                + new_points_coords[2][0],
-                -2 * new_points_coords[0][0] + 2 * new_points_coords[1][0],
-                new_points_coords[0][0],
-            ]
-
-            for i in X:
-                i = round(i, 4)
-
-            Y = [
-                new_points_coords[0][1]
-                - 2 * new_points_coords[1][1]
-                + new_points_coords[2][1],
-                -2 * new_points_coords[0][1] + 2 * new_points_coords[1][1],
-                new_points_coords[0][1],
-            ]
-
-            for i in Y:
-                i = round(i, 4)
+        for i in range(len(self.handles)):
+            self.handles[i].move_to(points_coords[i])
 
-            self.equations = (
-                f"x = {X[0]}*t^2 + {X[1]}*t + {X[2]}",
-                f"y = {Y[0]}*t^2 + {Y[1]}*t + {Y[2]}",
-            )
-
-            # Find extrema
-            extrema = self.find_extrema_quadratic(X, Y)
-
-            self.x_extrema.append(extrema[0])
-            self.y_extrema.append(extrema[1])
-
-        elif len(self.points) == 4:
-            X = [
-                -new_points_coords[0][0]
-                + 3 * new_points_coords[1][0]
-                - 3 * new_points_coords[2][0]
-                + new_points_coords[3][0],
-                3 * new_points_coords[0][0]
-                - 6 * new_points_coords[1][0]
-                + 3 * new_points_coords[2][0],
-                -3 * new_points_coords[0][0] + 3 * new_points_coords[1][0],
-                new_points_coords[0][0],
-            ]
-
-            for i in X:
-                i = round(i, 4)
-
-            Y = [
-                -new_points_coords[0][1]
-                + 3 * new_points_coords[1][1]
-                - 3 * new_points_coords[2][1]
-                + new_points_coords[3][1],
-                3 * new_points_coords[0][1]
-                - 6 * new_points_coords[1][1]
-                + 3 * new_points_coords[2][1],
-                -3 * new_points_coords[0][1] + 3 * new_points_coords[1][1],
-                new_points_coords[0][1],
-            ]
-
-            for i in Y:
-                i = round(i, 4)
-
-            self.equations = (
-                f"x = {X[0]}*t^3 + {X[1]}*t^2 + {X[2]}*t + {X[3]}",
-                f"y = {Y[0]}*t^3 + {Y[1]}*t^2 + {Y[2]}*t + {Y[3]}",
-            )
-
-            # Find extrema
-            # In X axis
-            a = 3 * X[0]
-            b = 2 * X[1]
-            c = X[2]
-
-            D = b**2 - 4 * a * c
-
-            if not (D > 0 or abs(D) < EPS):
-                pass
-            elif abs(a) < EPS:
-                self.x_extrema.append(
-                    self.find_extrema_quadratic([X[1], X[2], X[3]], [Y[1], Y[2], Y[3]])[
-                        0
-                    ]
+        if self.dashed_line_visible:
+            dashed_line_state = NORMAL if self.editing else HIDDEN
+
+            if self.dashed_line is None:
+                self.dashed_line = canvas.create_line(
+                    points_coords,
+                    dash=(5, 1),
+                    fill=self.color,
+                    state=dashed_line_state,
+                    tags=get_item_tags(self.tag, DASHED_LINE_TAG),
                 )
+                created_new_items = True
             else:
-                self.x_extrema.append((-b + sqrt(D)) / (2 * a))
-                self.x_extrema.append((-b - sqrt(D)) / (2 * a))
-
-            # Calculate for Y
-            a = 3 * Y[0]
-            b = 2 * Y[1]
-            c = Y[2]
-
-            D = b**2 - 4 * a * c
-
-            if not (D > 0 or abs(D) < EPS):
-                pass
-            elif abs(a) < EPS:
-                self.y_extrema.append(
-                    self.find_extrema_quadratic([X[1], X[2], X[3]], [Y[1], Y[2], Y[3]])[
-                        1
-                    ]
+                canvas.coords(self.dashed_line, flatten_coords(points_coords))
+                canvas.itemconfig(
+                    self.dashed_line, fill=self.color, state=dashed_line_state
                 )
-            else:
-                self.y_extrema.append((-b + sqrt(D)) / (2 * a))
-                self.y_extrema.append((-b - sqrt(D)) / (2 * a))
+        elif self.dashed_line is not None:
+            canvas.itemconfig(self.dashed_line, state=HIDDEN)
 
-        else:
-            raise InvalidPointAmoundError
-
-        # Delete untrue extrema and round the true ones
-        def check_extremum_truthfulness(extremum: float) -> bool:
-            if len(self.points) == 2:
-                return extremum > 0 and extremum <= 1
-            if len(self.points) == 3 or len(self.points) == 4:
-                return extremum >= 0 and extremum < 1
-            else:
-                raise InvalidPointAmoundError
+        if self.update_extremum_points(canvas):
+            created_new_items = True
 
-        for i in reversed(range(len(self.x_extrema))):
-            extremum = self.x_extrema[i]
+        if self.bounding_box_visible:
+            if self.draw_bounding_box(canvas):
+                created_new_items = True
+        elif self.bounding_box_canvas_line is not None:
+            canvas.itemconfig(self.bounding_box_canvas_line, state=HIDDEN)
+
+        # Only newly created items end up on top of the others
+        if created_new_items and raise_new_items:
+            self.raise_curve_widgets(canvas)
+
+    # Move the extremum points from the pool to the current extrema, returns whether
+    # new points had to be created
+    def update_extremum_points(self, canvas: Canvas) -> bool:
+        created_new_points = False
+
+        for i in range(len(self.all_extrema)):
+            extremum_coords = self.viewport.world_to_screen(
+                self.calculate_curve_point(self.all_extrema[i])
+            )
 
-            if check_extremum_truthfulness(extremum):
-                self.x_extrema[i] = round(extremum, 3)
-            else:
-                self.x_extrema.pop(i)
+            color = self.y_extremum_points_color
 
-        for i in reversed(range(len(self.y_extrema))):
-            extremum = self.y_extrema[i]
+            if i < len(self.x_extrema):
+                color = self.x_extremum_points_color
 
-            if extremum > 0 and extremum < 1:
-                self.y_extrema[i] = round(extremum, 3)
+            if i < len(self.extremum_points):
+                self.extremum_points[i].move_to(extremum_coords)
+                self.extremum_points[i].change_color(color)
             else:
-                self.y_extrema.pop(i)
+                self.extremum_points.append(
+                    CanvasPoint(
+                        extremum_coords,
+                        canvas,
+                        color,
+                        point_diameter=DEFAULT_POINT_SMALLER_DIAMETER,
+                        tags=get_item_tags(self.tag, EXTREMUM_POINT_TAG),
+                    )
+                )
+                created_new_points = True
+
+        self.update_extremum_points_visibility(canvas)
 
-        self.all_extrema = self.x_extrema + self.y_extrema
+        return created_new_points
 
-    def find_extrema_quadratic(self, X: List[int], Y: List[int]) -> List[float]:
-        x_extremum = -1
+    def update_extremum_points_visibility(self, canvas: Canvas) -> None:
+        for i in range(len(self.extremum_points)):
+            visible = (
+                self.editing
+                and self.extremum_points_visible
+                and i < len(self.all_extrema)
+                and (
+                    self.substituted_extremum is None or self.substituted_extremum == i
+                )
+            )
 
-        if X[0] != 0:
-            x_extremum = X[1] / (-2 * X[0])
+            canvas.itemconfig(
+                self.extremum_points[i].point, state=NORMAL if visible else HIDDEN
+            )
 
-        y_extremum = -1
+    def calculate_curve_point(self, t: float) -> P:
+        return self.geometry.calculate_curve_point(t)
 
-        if Y[0] != 0:
-            y_extremum = Y[1] / (-2 * Y[0])
+    # Points along the curve by distance instead of by t
+    def get_point_at_length(self, s: float) -> Tuple[float, float]:
+        return self.geometry.get_point_at_length(s)
 
-        return [x_extremum, y_extremum]
+    def get_equally_spaced_points(self, point_count: int) -> List[Tuple[float, float]]:
+        return self.geometry.get_equally_spaced_points(point_count)
 
-    def draw_bounding_box(self, canvas: Canvas) -> None:
-        list_of_all_points = [self.points[0], self.points[-1], *self.extremum_points]
+    # Nearest point of the curve to the point, e.g. to the pointer
+    def project_point(self, point: Tuple[float, float]) -> CurveProjection:
+        return self.geometry.project_point(point)
 
-        all_points_x = [point.point_coords[0] for point in list_of_all_points]
-        all_points_y = [point.point_coords[1] for point in list_of_all_points]
+    def project_points(
+        self, points: Sequence[Tuple[float, float]]
+    ) -> List[CurveProjection]:
+        return self.geometry.project_points(points)
 
-        min_x = min(all_points_x)
-        max_x = max(all_points_x)
-        min_y = min(all_points_y)
-        max_y = max(all_points_y)
+    # Returns whether the bounding box line had to be created
+    def draw_bounding_box(self, canvas: Canvas) -> bool:
+        # The bounding box doesn't depend on whether the extremum points are visible
+        min_x, min_y, max_x, max_y = self.geometry.get_bounding_box()
 
         left_top = (min_x, min_y)
         right_top = (max_x, min_y)
         left_bottom = (min_x, max_y)
         right_bottom = (max_x, max_y)
 
-        bbox_corners = [left_top, right_top, right_bottom, left_bottom, left_top]
-
-        self.bounding_box_canvas_line = canvas.create_line(
-            bbox_corners, fill=self.color, dash=(4, 4, 1, 4)
+        bbox_corners = self.viewport.points_to_screen(
+            [left_top, right_top, right_bottom, left_bottom, left_top]
         )
 
+        if self.bounding_box_canvas_line is None:
+            self.bounding_box_canvas_line = canvas.create_line(
+                bbox_corners,
+                fill=self.color,
+                dash=(4, 4, 1, 4),
+                tags=get_item_tags(self.tag, BOUNDING_BOX_TAG),
+            )
+
+            return True
+
+        canvas.coords(self.bounding_box_canvas_line, flatten_coords(bbox_corners))
+        canvas.itemconfig(self.bounding_box_canvas_line, fill=self.color, state=NORMAL)
+
+        return False
+
+    def delete(self, canvas: Canvas) -> None:
+        canvas.delete(self.tag)
+
+        self.extremum_points = []
+        self.handles = []
+        self.curve = None
+        self.dashed_line = None
+        self.bounding_box_canvas_line = None
+
     def change_curve_color(self, canvas: Canvas, new_color_code: str) -> None:
         self.color = new_color_code
         self.draw(canvas)
 
     def change_endpoints_color(self, canvas: Canvas, new_color_code: str) -> None:
-        for point in [self.points[0], self.points[-1]]:
-            canvas.itemconfig(point.point, fill=new_color_code)
         self.endpoints_color = new_color_code
+        for handle in self.handles[:1] + self.handles[-1:]:
+            handle.change_color(new_color_code)
 
     def change_control_points_color(self, canvas: Canvas, new_color_code: str) -> None:
-        for point in [
-            point
-            for point in self.points
-            if self.points[0] != point and self.points[-1] != point
-        ]:
-            canvas.itemconfig(point.point, fill=new_color_code)
         self.control_points_color = new_color_code
+        for handle in self.handles[1:-1]:
+            handle.change_color(new_color_code)
 
     def substitute_extremum_for_t(self, canvas: Canvas) -> None:
         if self.substituted_extremum is not None and len(self.all_extrema) > 0:
@@ -474,11 +391,7 @@ class BezierCurve:
                 ),
             )
 
-            for point in self.extremum_points:
-                canvas.delete(point.point)
-
-            self.extremum_points[self.substituted_extremum].create_canvas_point()
+            self.update_extremum_points_visibility(canvas)
 
         elif self.substituted_extremum is None and len(self.all_extrema) > 0:
-            for point in self.extremum_points:
-                point.reset_canvas_point()
+            self.update_extremum_points_visibility(canvas)
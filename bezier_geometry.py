@@ -0,0 +1,447 @@
+from typing import (
+    List,
+    Tuple,
+    Dict,
+    TypeAlias,
+    NamedTuple,
+    Hashable,
+    Callable,
+    Any,
+    Sequence,
+)
+from math import comb
+from bezier_sampling import sample_curve_points
+from curve_flattening import DEFAULT_FLATTENING_TOLERANCE, flatten_curve
+from arc_length import (
+    ArcLengthTable,
+    batch_arc_length_tables,
+    batch_t_at_lengths,
+    batch_equally_spaced_points,
+)
+from curve_projection import (
+    CurveProjection,
+    ProjectionTable,
+    batch_projection_tables,
+    batch_project_points,
+)
+from instrumentation import instrumentation
+
+
+P: TypeAlias = Tuple[int, int]
+
+EPS = 10 ** (-6)
+
+BEZIER_CURVE_DETAIL: int = 100
+
+# Highest degree that can be created from the UI, the geometry itself has no limit
+MAX_CURVE_DEGREE: int = 10
+
+# Amount of bisection steps when refining a polynomial root (2^-60 is below float precision)
+ROOT_BISECTION_STEPS: int = 60
+
+# Relative to the largest coefficient, values this small are considered to be zero
+ROOT_VALUE_EPS = 10 ** (-10)
+
+InvalidPointAmoundError: ValueError = ValueError("Invalid Amount of Points")
+
+curve_names: Dict[int, str] = {
+    2: "Linear",
+    3: "Quadratic",
+    4: "Cubic",
+    5: "Quartic",
+    6: "Quintic",
+    7: "Sextic",
+    8: "Septic",
+}
+
+
+def get_curve_name(amount_of_points: int) -> str:
+    if amount_of_points < 2:
+        raise InvalidPointAmoundError
+
+    return curve_names.get(amount_of_points, f"Degree {amount_of_points - 1}")
+
+
+def get_points_default_pos(
+    amount_of_points: int, canvas_width: int, canvas_height: int
+) -> List[P]:
+    if amount_of_points < 2:
+        raise InvalidPointAmoundError
+
+    half_canvas_width = round(canvas_width / 2)
+
+    # Spread the points evenly between a quarter & three quarters of the canvas height
+    top = canvas_height / 4
+    bottom = canvas_height * 3 / 4
+
+    points: List[P] = []
+
+    for i in range(amount_of_points):
+        points.append(
+            (
+                half_canvas_width,
+                round(top + (bottom - top) * i / (amount_of_points - 1)),
+            )
+        )
+
+    return points
+
+
+# Coefficients of the curve in power basis (lowest power first) for one axis
+def get_power_basis_coefficients(values: List[float]) -> List[float]:
+    degree = len(values) - 1
+
+    coefficients: List[float] = []
+
+    for j in range(degree + 1):
+        coefficient = sum(
+            (-1) ** (j - i) * comb(j, i) * values[i] for i in range(j + 1)
+        )
+
+        coefficients.append(comb(degree, j) * coefficient)
+
+    return coefficients
+
+
+# Coefficients are ordered from the lowest power
+def evaluate_polynomial(coefficients: List[float], t: float) -> float:
+    value = 0.0
+
+    for coefficient in reversed(coefficients):
+        value = value * t + coefficient
+
+    return value
+
+
+def differentiate_polynomial(coefficients: List[float]) -> List[float]:
+    return [i * coefficients[i] for i in range(1, len(coefficients))]
+
+
+# Finds real roots in [lower, upper]. The polynomial is monotone between the roots of its
+# derivative, so every such interval holds at most one root, which is found by bisection.
+def find_polynomial_roots(
+    coefficients: List[float], lower: float = 0.0, upper: float = 1.0
+) -> List[float]:
+    coefficients = list(coefficients)
+
+    # Get rid of (numerically) zero leading coefficients
+    scale = max([abs(coefficient) for coefficient in coefficients] + [1.0])
+
+    while len(coefficients) > 0 and abs(coefficients[-1]) < EPS * scale:
+        coefficients.pop()
+
+    # Constant polynomials have either no roots or infinitely many, neither of which is useful
+    if len(coefficients) < 2:
+        return []
+
+    if len(coefficients) == 2:
+        root = -coefficients[0] / coefficients[1]
+
+        return [root] if lower <= root <= upper else []
+
+    critical_points = find_polynomial_roots(
+        differentiate_polynomial(coefficients), lower, upper
+    )
+
+    bounds = [lower, *critical_points, upper]
+
+    roots: List[float] = []
+
+    for start, end in zip(bounds, bounds[1:]):
+        start_value = evaluate_polynomial(coefficients, start)
+        end_value = evaluate_polynomial(coefficients, end)
+
+        # Roots at the bounds (this also catches double roots at critical points)
+        if abs(start_value) < ROOT_VALUE_EPS * scale:
+            root = start
+        elif abs(end_value) < ROOT_VALUE_EPS * scale:
+            root = end
+        elif (start_value < 0) == (end_value < 0):
+            continue
+        else:
+            for _ in range(ROOT_BISECTION_STEPS):
+                middle = (start + end) / 2
+                middle_value = evaluate_polynomial(coefficients, middle)
+
+                if (middle_value < 0) == (start_value < 0):
+                    start, start_value = middle, middle_value
+                else:
+                    end = middle
+
+            root = (start + end) / 2
+
+        if len(roots) == 0 or abs(roots[-1] - root) > EPS:
+            roots.append(root)
+
+    return roots
+
+
+def format_polynomial(axis: str, coefficients: List[float]) -> str:
+    terms: List[str] = []
+
+    for power in reversed(range(len(coefficients))):
+        if power > 1:
+            terms.append(f"{coefficients[power]}*t^{power}")
+        elif power == 1:
+            terms.append(f"{coefficients[power]}*t")
+        else:
+            terms.append(f"{coefficients[power]}")
+
+    return f"{axis} = " + " + ".join(terms)
+
+
+class ParametricEquations(NamedTuple):
+    coefficients: Tuple[List[float], List[float]]  # Power basis, lowest power first
+    equations: Tuple[str, str]
+    x_extrema: List[float]
+    y_extrema: List[float]
+
+
+# Pure geometry of a Bézier curve, independent of Tkinter, so it can also be used
+# without any canvas (e.g. when processing saved projects).
+# Everything derived from the points is cached until a point moves, so cosmetic changes
+# (colors, visibility) don't cost any geometry work.
+class BezierGeometry:
+    def __init__(self, points_coords: List[P], canvas_height: int) -> None:
+        self.points_coords: List[P] = list(points_coords)
+        self.canvas_height = canvas_height
+
+        if len(self.points_coords) < 2:
+            raise InvalidPointAmoundError
+
+        self.cache: Dict[Hashable, Any] = {}
+        self.cache_key: Tuple[P, ...] = tuple(self.points_coords)
+        self.cache_hits: int = 0
+        self.cache_misses: int = 0
+
+    def set_point_coords(self, index: int, new_coords: P) -> None:
+        self.points_coords[index] = new_coords
+
+    def set_points_coords(self, new_points_coords: List[P]) -> None:
+        if len(new_points_coords) != len(self.points_coords):
+            raise InvalidPointAmoundError
+
+        self.points_coords = list(new_points_coords)
+
+    # The cache is keyed on the points themselves, so it gets invalidated no matter how
+    # the points were changed. Cached values are shared, so they mustn't be modified.
+    def get_cached(self, name: Hashable, calculate: Callable[[], Any]) -> Any:
+        key = tuple(self.points_coords)
+
+        if key != self.cache_key:
+            self.cache = {}
+            self.cache_key = key
+
+        if name in self.cache:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+            self.cache[name] = calculate()
+
+        return self.cache[name]
+
+    @property
+    def parametric_equations(self) -> ParametricEquations:
+        return self.get_cached(
+            "parametric_equations", self.calculate_parametric_equations
+        )
+
+    @property
+    def coefficients(self) -> Tuple[List[float], List[float]]:
+        return self.parametric_equations.coefficients
+
+    @property
+    def equations(self) -> Tuple[str, str]:
+        return self.parametric_equations.equations
+
+    @property
+    def x_extrema(self) -> List[float]:
+        return self.parametric_equations.x_extrema
+
+    @property
+    def y_extrema(self) -> List[float]:
+        return self.parametric_equations.y_extrema
+
+    @property
+    def all_extrema(self) -> List[float]:
+        return self.get_cached("all_extrema", lambda: self.x_extrema + self.y_extrema)
+
+    def sample_curve_points(self, sample_count: int = BEZIER_CURVE_DETAIL) -> List[P]:
+        return self.get_cached(
+            ("sampled", sample_count),
+            lambda: self.calculate_sampled_points(sample_count),
+        )
+
+    # Approximate the curve with as few line segments as the tolerance (in pixels) allows
+    def flatten_curve_points(
+        self, tolerance: float = DEFAULT_FLATTENING_TOLERANCE
+    ) -> List[Tuple[float, float]]:
+        return self.get_cached(
+            ("flattened", tolerance),
+            lambda: flatten_curve(self.points_coords, tolerance),
+        )
+
+    def get_extremum_points_coords(self) -> List[P]:
+        return self.get_cached(
+            "extremum_points_coords",
+            lambda: [
+                self.calculate_curve_point(extremum) for extremum in self.all_extrema
+            ],
+        )
+
+    # Returns (min_x, min_y, max_x, max_y) in canvas coordinates
+    def get_bounding_box(self) -> Tuple[int, int, int, int]:
+        return self.get_cached("bounding_box", self.calculate_bounding_box)
+
+    # Length-to-t lookup table, recalculated only after a point moves
+    def get_arc_length_table(self) -> ArcLengthTable:
+        return self.get_cached(
+            "arc_length_table", lambda: batch_arc_length_tables([self.points_coords])
+        )
+
+    @property
+    def length(self) -> float:
+        return float(self.get_arc_length_table().total_lengths[0])
+
+    # Parameter t of the point that is s away from the start along the curve
+    def get_t_at_length(self, s: float) -> float:
+        return float(batch_t_at_lengths(self.get_arc_length_table(), [[s]])[0, 0])
+
+    def get_point_at_length(self, s: float) -> Tuple[float, float]:
+        return self.calculate_exact_curve_point(self.get_t_at_length(s))
+
+    # Points along the curve with equal distances between them, both ends included
+    def get_equally_spaced_points(self, point_count: int) -> List[Tuple[float, float]]:
+        return self.get_cached(
+            ("equally_spaced", point_count),
+            lambda: [
+                (x, y)
+                for x, y in batch_equally_spaced_points(
+                    [self.points_coords], point_count, self.get_arc_length_table()
+                )[0].tolist()
+            ],
+        )
+
+    # Coarse table of points that seeds the nearest point queries
+    def get_projection_table(self) -> ProjectionTable:
+        return self.get_cached(
+            "projection_table", lambda: batch_projection_tables([self.points_coords])
+        )
+
+    # Nearest point of the curve (& its t) to every one of the points
+    def project_points(
+        self, points: Sequence[Tuple[float, float]]
+    ) -> List[CurveProjection]:
+        projections = batch_project_points(
+            [self.points_coords], points, self.get_projection_table()
+        )
+
+        return [
+            CurveProjection(t, (x, y), distance)
+            for t, (x, y), distance in zip(
+                projections.t[0].tolist(),
+                projections.points[0].tolist(),
+                projections.distances[0].tolist(),
+            )
+        ]
+
+    def project_point(self, point: Tuple[float, float]) -> CurveProjection:
+        return self.project_points([point])[0]
+
+    def calculate_sampled_points(self, sample_count: int) -> List[P]:
+        curve_points: List[P] = []
+
+        # For linear Bézier curves
+        if len(self.points_coords) == 2:
+            # Because linear Bézier curves are just straight lines, we do not have to calculate anything
+            curve_points = list(self.points_coords)
+        # For higher degree Bézier curves, sample the whole t-grid at once
+        else:
+            curve_points = sample_curve_points(self.points_coords, sample_count)
+
+        return curve_points
+
+    def calculate_curve_point(self, t: float) -> P:
+        point_x, point_y = self.calculate_exact_curve_point(t)
+
+        return (round(point_x), round(point_y))
+
+    # Horner-like scheme for the Bernstein form, which is O(n) & stable for t in [0, 1]
+    def calculate_exact_curve_point(self, t: float) -> Tuple[float, float]:
+        points_coords = self.points_coords
+
+        degree = len(points_coords) - 1
+
+        if degree < 1:
+            raise InvalidPointAmoundError
+
+        s = 1 - t
+
+        t_power = 1.0
+        binomial = 1
+
+        point_x = points_coords[0][0] * s
+        point_y = points_coords[0][1] * s
+
+        for i in range(1, degree):
+            t_power *= t
+            binomial = binomial * (degree - i + 1) // i
+
+            point_x = (point_x + t_power * binomial * points_coords[i][0]) * s
+            point_y = (point_y + t_power * binomial * points_coords[i][1]) * s
+
+        t_power *= t
+
+        point_x += t_power * points_coords[degree][0]
+        point_y += t_power * points_coords[degree][1]
+
+        return (point_x, point_y)
+
+    @instrumentation.timed("BezierGeometry.calculate_parametric_equations")
+    def calculate_parametric_equations(self) -> ParametricEquations:
+        X = get_power_basis_coefficients(
+            [point_coords[0] for point_coords in self.points_coords]
+        )
+        # Calculate new y coords because of the tkinter / math positive y axis inversion
+        Y = get_power_basis_coefficients(
+            [
+                self.canvas_height - point_coords[1]
+                for point_coords in self.points_coords
+            ]
+        )
+
+        return ParametricEquations(
+            coefficients=(X, Y),
+            equations=(format_polynomial("x", X), format_polynomial("y", Y)),
+            # Extrema are where the derivative of the axis equals zero
+            x_extrema=self.find_extrema(X),
+            y_extrema=self.find_extrema(Y),
+        )
+
+    def find_extrema(self, coefficients: List[float]) -> List[float]:
+        extrema: List[float] = []
+
+        for root in find_polynomial_roots(differentiate_polynomial(coefficients)):
+            extremum = round(root, 3)
+
+            if extremum not in extrema:
+                extrema.append(extremum)
+
+        return extrema
+
+    def calculate_bounding_box(self) -> Tuple[int, int, int, int]:
+        list_of_all_points = [
+            self.points_coords[0],
+            self.points_coords[-1],
+            *self.get_extremum_points_coords(),
+        ]
+
+        all_points_x = [point_coords[0] for point_coords in list_of_all_points]
+        all_points_y = [point_coords[1] for point_coords in list_of_all_points]
+
+        return (
+            min(all_points_x),
+            min(all_points_y),
+            max(all_points_x),
+            max(all_points_y),
+        )
@@ -0,0 +1,71 @@
+from functools import lru_cache
+from math import comb
+from typing import List, Sequence, Tuple
+import numpy as np
+
+
+BERNSTEIN_TABLE_CACHE_SIZE: int = 64
+
+
+# Every Bernstein basis polynomial of the given degree evaluated at each t,
+# the result has shape (len(t), degree + 1)
+def get_bernstein_basis(t: np.ndarray, degree: int) -> np.ndarray:
+    t = np.asarray(t, dtype=float)[..., None]
+    k = np.arange(degree + 1)
+
+    binomials = np.array([comb(degree, i) for i in range(degree + 1)], dtype=float)
+
+    return binomials * t**k * (1 - t) ** (degree - k)
+
+
+# Matrix M, for which M @ points gives the power basis coefficients (lowest power first)
+@lru_cache(maxsize=32)
+def get_power_basis_matrix(degree: int) -> np.ndarray:
+    matrix = np.zeros((degree + 1, degree + 1))
+
+    for j in range(degree + 1):
+        for i in range(j + 1):
+            matrix[j, i] = comb(degree, j) * (-1) ** (j - i) * comb(j, i)
+
+    matrix.setflags(write=False)
+
+    return matrix
+
+
+# Table of shape (sample_count, degree + 1) where row i holds every Bernstein basis
+# polynomial of the given degree evaluated at t = i / (sample_count - 1)
+@lru_cache(maxsize=BERNSTEIN_TABLE_CACHE_SIZE)
+def get_bernstein_table(degree: int, sample_count: int) -> np.ndarray:
+    table = get_bernstein_basis(np.linspace(0.0, 1.0, sample_count), degree)
+
+    # The table is shared between all callers, so nobody may modify it
+    table.setflags(write=False)
+
+    return table
+
+
+def sample_curve(
+    points_coords: Sequence[Tuple[float, float]], sample_count: int
+) -> np.ndarray:
+    table = get_bernstein_table(len(points_coords) - 1, sample_count)
+
+    return table @ np.asarray(points_coords, dtype=float)
+
+
+# Evaluate N curves of the same degree at once, control_points has shape (N, degree + 1, 2)
+def sample_curves(control_points: np.ndarray, sample_count: int) -> np.ndarray:
+    control_points = np.asarray(control_points, dtype=float)
+
+    table = get_bernstein_table(control_points.shape[1] - 1, sample_count)
+
+    # (sample_count, degree + 1) @ (N, degree + 1, 2) -> (N, sample_count, 2)
+    return table @ control_points
+
+
+# Rounded to whole pixels, same as BezierGeometry.calculate_curve_point
+def sample_curve_points(
+    points_coords: Sequence[Tuple[float, float]], sample_count: int
+) -> List[Tuple[int, int]]:
+    samples = np.rint(sample_curve(points_coords, sample_count)).astype(int)
+
+    return [(x, y) for x, y in samples.tolist()]
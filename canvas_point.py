@@ -1,9 +1,8 @@
-from typing import Tuple, TypeAlias
+from typing import Tuple
 from tkinter import Canvas
+from bezier_geometry import P
 
 
-P: TypeAlias = Tuple[int, int]
-
 DEFAULT_POINT_DIAMETER = 10
 
 DEFAULT_POINT_SMALLER_DIAMETER = 8
@@ -16,8 +15,10 @@ class CanvasPoint:
         canvas: Canvas,
         color: str,
         point_diameter: int = DEFAULT_POINT_DIAMETER,
+        tags: Tuple[str, ...] = (),
     ) -> None:
         self.point_diameter: int = point_diameter
+        self.tags: Tuple[str, ...] = tags
         self.point_coords: P = point_coords
         self.canvas = canvas
         self.color = color
@@ -30,6 +31,7 @@ class CanvasPoint:
             self.point_coords[0] + self.point_diameter / 2,
             self.point_coords[1] + self.point_diameter / 2,
             fill=self.color,
+            tags=self.tags,
         )
 
         return point
@@ -37,3 +39,18 @@ class CanvasPoint:
     def reset_canvas_point(self) -> None:
         self.canvas.delete(self.point)
         self.point = self.create_canvas_point()
+
+    def move_to(self, new_coords: P) -> None:
+        self.point_coords = new_coords
+        self.canvas.coords(
+            self.point,
+            self.point_coords[0] - self.point_diameter / 2,
+            self.point_coords[1] - self.point_diameter / 2,
+            self.point_coords[0] + self.point_diameter / 2,
+            self.point_coords[1] + self.point_diameter / 2,
+        )
+
+    def change_color(self, new_color: str) -> None:
+        if new_color != self.color:
+            self.color = new_color
+            self.canvas.itemconfig(self.point, fill=new_color)
@@ -0,0 +1,251 @@
+from typing import List, NamedTuple, Sequence, Tuple
+import numpy as np
+from PIL import Image
+from bezier_sampling import get_bernstein_basis
+
+
+# Pixels with a gradient magnitude below this ratio of the strongest one aren't edges
+EDGE_THRESHOLD_RATIO: float = 0.25
+
+# Gradient magnitude (of 0-255 grayscale) that any edge has to reach
+MIN_EDGE_MAGNITUDE: float = 40.0
+
+# How far (in pixels) from the user's stroke edge points are still taken into account
+STROKE_BAND_WIDTH: float = 12.0
+
+# Limits to keep the fitting fast regardless of how large the selection is
+MAX_STROKE_POINTS: int = 64
+MAX_FIT_POINTS: int = 2000
+
+FIT_MAX_ITERATIONS: int = 30
+
+# Stop the parameter correction once the RMS error improves by less than this (in pixels)
+FIT_TOLERANCE: float = 10 ** (-3)
+
+# A quadratic curve is preferred if it fits (almost) as well as a cubic one
+QUADRATIC_FIT_ERROR_RATIO: float = 1.1
+
+
+class FitResult(NamedTuple):
+    control_points: np.ndarray  # Shape (degree + 1, 2)
+    rms_error: float
+    iterations: int
+
+
+# Returns the (x, y) positions of edge pixels inside region = (x0, y0, x1, y1) of the image
+def extract_edge_points(
+    image: Image.Image, region: Tuple[float, float, float, float]
+) -> np.ndarray:
+    x0 = max(int(region[0]), 0)
+    y0 = max(int(region[1]), 0)
+    x1 = min(int(np.ceil(region[2])), image.width)
+    y1 = min(int(np.ceil(region[3])), image.height)
+
+    if x1 - x0 < 3 or y1 - y0 < 3:
+        return np.zeros((0, 2))
+
+    gray = np.asarray(image.crop((x0, y0, x1, y1)).convert("L"), dtype=float)
+
+    # Sobel operator, written with slices so that it runs on the whole region at once
+    gradient_x = (gray[:-2, 2:] + 2 * gray[1:-1, 2:] + gray[2:, 2:]) - (
+        gray[:-2, :-2] + 2 * gray[1:-1, :-2] + gray[2:, :-2]
+    )
+    gradient_y = (gray[2:, :-2] + 2 * gray[2:, 1:-1] + gray[2:, 2:]) - (
+        gray[:-2, :-2] + 2 * gray[:-2, 1:-1] + gray[:-2, 2:]
+    )
+
+    magnitude = np.hypot(gradient_x, gradient_y)
+
+    threshold = max(magnitude.max() * EDGE_THRESHOLD_RATIO, MIN_EDGE_MAGNITUDE)
+
+    ys, xs = np.nonzero(magnitude >= threshold)
+
+    # + 1 because the Sobel output is one pixel smaller on each side
+    return np.column_stack([xs + x0 + 1, ys + y0 + 1]).astype(float)
+
+
+def resample_polyline(points: np.ndarray, amount: int) -> np.ndarray:
+    lengths = np.concatenate([[0.0], np.cumsum(np.hypot(*np.diff(points, axis=0).T))])
+
+    if lengths[-1] == 0:
+        return points[:1]
+
+    positions = np.linspace(0.0, lengths[-1], amount)
+
+    return np.column_stack(
+        [
+            np.interp(positions, lengths, points[:, 0]),
+            np.interp(positions, lengths, points[:, 1]),
+        ]
+    )
+
+
+# Keeps the points within band_width of the stroke & orders them along it.
+# Returns the points and their relative position along the stroke (0 to 1).
+def project_points_on_stroke(
+    points: np.ndarray, stroke: np.ndarray, band_width: float = STROKE_BAND_WIDTH
+) -> Tuple[np.ndarray, np.ndarray]:
+    starts = stroke[:-1]
+    directions = stroke[1:] - starts
+
+    lengths_squared = (directions**2).sum(axis=1)
+    lengths_squared[lengths_squared == 0] = 1.0
+
+    # (points, segments) matrices of projections on every stroke segment
+    relative = points[:, None, :] - starts[None, :, :]
+    s = np.clip((relative * directions).sum(axis=2) / lengths_squared, 0.0, 1.0)
+    distances = np.hypot(
+        *(relative - s[:, :, None] * directions[None, :, :]).transpose(2, 0, 1)
+    )
+
+    nearest_segment = distances.argmin(axis=1)
+    nearest_distance = distances[np.arange(len(points)), nearest_segment]
+
+    segment_lengths = np.hypot(*directions.T)
+    segment_starts = np.concatenate([[0.0], np.cumsum(segment_lengths)[:-1]])
+    total_length = max(segment_lengths.sum(), 1.0)
+
+    positions = (
+        segment_starts[nearest_segment]
+        + s[np.arange(len(points)), nearest_segment] * segment_lengths[nearest_segment]
+    ) / total_length
+
+    inside = nearest_distance <= band_width
+
+    order = np.argsort(positions[inside], kind="stable")
+
+    return points[inside][order], positions[inside][order]
+
+
+def get_chord_length_parameters(points: np.ndarray) -> np.ndarray:
+    lengths = np.concatenate([[0.0], np.cumsum(np.hypot(*np.diff(points, axis=0).T))])
+
+    if lengths[-1] == 0:
+        return np.linspace(0.0, 1.0, len(points))
+
+    return lengths / lengths[-1]
+
+
+# Least squares fit of a Bézier curve to ordered points, alternating between solving for
+# the control points & correcting the points' parameters t with a Newton step
+def fit_bezier_curve(
+    points: np.ndarray,
+    degree: int,
+    initial_t: np.ndarray | None = None,
+    max_iterations: int = FIT_MAX_ITERATIONS,
+) -> FitResult:
+    points = np.asarray(points, dtype=float)
+
+    t = initial_t if initial_t is not None else get_chord_length_parameters(points)
+    t = np.clip(np.asarray(t, dtype=float), 0.0, 1.0)
+
+    control_points = np.zeros((degree + 1, 2))
+    rms_error = np.inf
+    iterations = 0
+
+    for iterations in range(1, max_iterations + 1):
+        basis = get_bernstein_basis(t, degree)
+
+        control_points = np.linalg.lstsq(basis, points, rcond=None)[0]
+
+        residuals = basis @ control_points - points
+
+        previous_rms_error = rms_error
+        rms_error = float(np.sqrt((residuals**2).sum(axis=1).mean()))
+
+        if previous_rms_error - rms_error < FIT_TOLERANCE:
+            break
+
+        # Newton-Raphson on the distance between every point & the curve at its t
+        first_derivative = get_bernstein_basis(t, degree - 1) @ (
+            degree * np.diff(control_points, axis=0)
+        )
+
+        if degree > 1:
+            second_derivative = get_bernstein_basis(t, degree - 2) @ (
+                degree * (degree - 1) * np.diff(control_points, n=2, axis=0)
+            )
+        else:
+            second_derivative = np.zeros_like(first_derivative)
+
+        numerator = (residuals * first_derivative).sum(axis=1)
+        denominator = (first_derivative**2).sum(axis=1) + (
+            residuals * second_derivative
+        ).sum(axis=1)
+
+        safe_denominator = np.where(np.abs(denominator) > 10 ** (-12), denominator, 1.0)
+
+        t = np.clip(
+            t
+            - np.where(
+                np.abs(denominator) > 10 ** (-12), numerator / safe_denominator, 0.0
+            ),
+            0.0,
+            1.0,
+        )
+
+    return FitResult(control_points, rms_error, iterations)
+
+
+# Fits a quadratic or cubic Bézier curve to the edges of the image along a rough stroke
+# drawn by the user (all in image pixel coordinates). Returns None if there is nothing to fit.
+def fit_curve_to_stroke(
+    image: Image.Image,
+    stroke_points: Sequence[Tuple[float, float]],
+    degree: int | None = None,
+) -> FitResult | None:
+    stroke = np.asarray(stroke_points, dtype=float)
+
+    if len(stroke) < 2:
+        return None
+
+    stroke = resample_polyline(stroke, MAX_STROKE_POINTS)
+
+    if len(stroke) < 2:
+        return None
+
+    region = (
+        stroke[:, 0].min() - STROKE_BAND_WIDTH,
+        stroke[:, 1].min() - STROKE_BAND_WIDTH,
+        stroke[:, 0].max() + STROKE_BAND_WIDTH,
+        stroke[:, 1].max() + STROKE_BAND_WIDTH,
+    )
+
+    edge_points = extract_edge_points(image, region)
+
+    if len(edge_points) == 0:
+        return None
+
+    points, positions = project_points_on_stroke(edge_points, stroke)
+
+    if len(points) < 4:
+        return None
+
+    if len(points) > MAX_FIT_POINTS:
+        indices = np.linspace(0, len(points) - 1, MAX_FIT_POINTS).round().astype(int)
+        points = points[indices]
+        positions = positions[indices]
+
+    # The position along the stroke is a better first guess for t than the chord
+    # length, because edge points on both sides of a thick line are interleaved
+    initial_t = (positions - positions[0]) / max(positions[-1] - positions[0], 1e-9)
+
+    if degree is not None:
+        return fit_bezier_curve(points, degree, initial_t)
+
+    quadratic = fit_bezier_curve(points, 2, initial_t)
+    cubic = fit_bezier_curve(points, 3, initial_t)
+
+    if quadratic.rms_error <= cubic.rms_error * QUADRATIC_FIT_ERROR_RATIO:
+        return quadratic
+
+    return cubic
+
+
+def get_fitted_points_coords(
+    fit_result: FitResult, offset: Tuple[float, float] = (0, 0)
+) -> List[Tuple[int, int]]:
+    return [
+        (round(x + offset[0]), round(y + offset[1]))
+        for x, y in fit_result.control_points.tolist()
+    ]
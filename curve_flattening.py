@@ -0,0 +1,91 @@
+from typing import List, Sequence, Tuple
+from math import hypot
+
+
+# Maximum distance (in pixels) between the curve and the polyline that approximates it
+DEFAULT_FLATTENING_TOLERANCE: float = 0.25
+
+# Safeguard against endless subdivision (e.g. for huge curves with tiny tolerance)
+MAX_SUBDIVISION_DEPTH: int = 16
+
+Coords = Tuple[float, float]
+
+
+def split_curve(
+    points_coords: Sequence[Coords], t: float = 0.5
+) -> Tuple[List[Coords], List[Coords]]:
+    # de Casteljau's algorithm, the left & right halves are collected from the sides
+    # of the triangle of intermediate points
+    left: List[Coords] = [points_coords[0]]
+    right: List[Coords] = [points_coords[-1]]
+
+    current = list(points_coords)
+
+    while len(current) > 1:
+        current = [
+            (
+                (1 - t) * current[i][0] + t * current[i + 1][0],
+                (1 - t) * current[i][1] + t * current[i + 1][1],
+            )
+            for i in range(len(current) - 1)
+        ]
+
+        left.append(current[0])
+        right.append(current[-1])
+
+    right.reverse()
+
+    return left, right
+
+
+def distance_to_segment(point: Coords, start: Coords, end: Coords) -> float:
+    dx = end[0] - start[0]
+    dy = end[1] - start[1]
+
+    length_squared = dx**2 + dy**2
+
+    if length_squared == 0:
+        return hypot(point[0] - start[0], point[1] - start[1])
+
+    # Project the point on the segment & clamp it to the endpoints
+    t = ((point[0] - start[0]) * dx + (point[1] - start[1]) * dy) / length_squared
+    t = min(max(t, 0.0), 1.0)
+
+    return hypot(point[0] - (start[0] + t * dx), point[1] - (start[1] + t * dy))
+
+
+# Because the curve lies in the convex hull of its points, it can't be further away
+# from the chord than the furthest control point
+def is_flat_enough(points_coords: Sequence[Coords], tolerance: float) -> bool:
+    start = points_coords[0]
+    end = points_coords[-1]
+
+    for point in points_coords[1:-1]:
+        if distance_to_segment(point, start, end) > tolerance:
+            return False
+
+    return True
+
+
+def flatten_curve(
+    points_coords: Sequence[Coords],
+    tolerance: float = DEFAULT_FLATTENING_TOLERANCE,
+) -> List[Coords]:
+    polyline: List[Coords] = [tuple(points_coords[0])]
+
+    # Subdivide depth-first, always continuing with the left half so that the
+    # polyline vertices are produced in order of t
+    stack: List[Tuple[List[Coords], int]] = [(list(points_coords), 0)]
+
+    while len(stack) > 0:
+        current, depth = stack.pop()
+
+        if depth >= MAX_SUBDIVISION_DEPTH or is_flat_enough(current, tolerance):
+            polyline.append(tuple(current[-1]))
+        else:
+            left, right = split_curve(current)
+
+            stack.append((right, depth + 1))
+            stack.append((left, depth + 1))
+
+    return polyline
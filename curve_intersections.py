@@ -0,0 +1,553 @@
+from typing import List, NamedTuple, Sequence, Tuple
+import numpy as np
+from bezier_batch import batch_bounding_boxes, group_curves_by_point_amount
+
+
+# Pieces of curves are subdivided until they are this close (in pixels) to their chords,
+# then the chords are intersected
+INTERSECTION_FLATNESS_TOLERANCE: float = 0.01
+
+# Safeguard against endless subdivision, e.g. of overlapping curves
+MAX_INTERSECTION_DEPTH: int = 40
+
+# Found intersections of the same two curves closer than this (in pixels) are merged,
+# as a crossing exactly between two pieces is found in both of them
+INTERSECTION_MERGE_DISTANCE: float = 0.05
+
+# Maximum amount of candidate pairs produced by the sweep at once
+SWEEP_CHUNK_SIZE: int = 1_000_000
+
+# Chord parameters are accepted slightly outside of [0, 1], so that crossings at the
+# ends of the pieces aren't lost to rounding
+CHORD_PARAMETER_EPS = 10 ** (-9)
+
+# Where curves overlap, the chords of their flat pieces are within twice the flatness
+# tolerance of each other, as both pieces are within the tolerance of their chords
+OVERLAP_DISTANCE_FACTOR: float = 2.0
+
+# Chords of overlapping pieces are close to parallel, chords crossing at larger angles
+# are only as close near the crossing
+OVERLAP_MAX_SINE: float = 0.05
+
+
+class Intersection(NamedTuple):
+    first_curve: int  # Index of the curve, smaller than second_curve
+    first_t: float
+    second_curve: int
+    second_t: float
+    point: Tuple[float, float]
+
+
+# Sort-and-sweep: the boxes are sorted along the axis on which they are spread the most,
+# then every box is paired only with the boxes starting before it ends on that axis.
+# Returns the indices of the pairs of boxes that overlap, shape (P, 2).
+def find_overlapping_boxes(bounding_boxes: np.ndarray) -> np.ndarray:
+    box_count = len(bounding_boxes)
+
+    if box_count < 2:
+        return np.zeros((0, 2), dtype=np.int64)
+
+    centers = (bounding_boxes[:, :2] + bounding_boxes[:, 2:]) / 2
+
+    axis = int(np.argmax(centers.std(axis=0)))
+    other_axis = 1 - axis
+
+    order = np.argsort(bounding_boxes[:, axis], kind="stable")
+
+    boxes = bounding_boxes[order]
+
+    # Boxes after i in the sorted order that start before box i ends
+    ends = np.searchsorted(boxes[:, axis], boxes[:, axis + 2], side="right")
+    counts = np.maximum(ends - np.arange(box_count) - 1, 0)
+
+    pairs: List[np.ndarray] = []
+
+    # Boxes are processed in chunks, so that the candidates don't take too much memory
+    cumulative_counts = np.cumsum(counts)
+
+    start = 0
+
+    while start < box_count:
+        end = int(
+            np.searchsorted(
+                cumulative_counts,
+                (cumulative_counts[start - 1] if start > 0 else 0) + SWEEP_CHUNK_SIZE,
+                side="right",
+            )
+        )
+        end = min(max(end, start + 1), box_count)
+
+        chunk_counts = counts[start:end]
+
+        first = np.repeat(np.arange(start, end), chunk_counts)
+
+        # Position of every candidate within the run of its first box
+        run_starts = np.repeat(np.cumsum(chunk_counts) - chunk_counts, chunk_counts)
+        second = first + 1 + np.arange(len(first)) - run_starts
+
+        overlapping = (boxes[second, other_axis] <= boxes[first, other_axis + 2]) & (
+            boxes[first, other_axis] <= boxes[second, other_axis + 2]
+        )
+
+        pairs.append(
+            np.stack([order[first[overlapping]], order[second[overlapping]]], axis=1)
+        )
+
+        start = end
+
+    pairs_array = np.concatenate(pairs)
+
+    # The smaller index first
+    return np.sort(pairs_array, axis=1)
+
+
+# Splits N curves at t = 0.5 with de Casteljau's algorithm, shape (N, n, 2) each
+def batch_split_curves(control_points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    point_count = control_points.shape[1]
+
+    left = np.empty_like(control_points)
+    right = np.empty_like(control_points)
+
+    current = control_points
+
+    for i in range(point_count):
+        left[:, i] = current[:, 0]
+        right[:, point_count - 1 - i] = current[:, -1]
+
+        current = (current[:, :-1] + current[:, 1:]) / 2
+
+    return left, right
+
+
+# How far a piece is from its chord traversed at a constant speed. The difference of
+# the two is a Bézier curve with the control points' offsets from the equally spaced
+# points of the chord, so they bound it. Replacing such a piece by its chord moves
+# B(t) by at most this much at every t, not only the crossing, but also its t.
+def batch_flatness(control_points: np.ndarray) -> np.ndarray:
+    if control_points.shape[1] == 2:
+        return np.zeros(len(control_points))
+
+    fractions = np.linspace(0.0, 1.0, control_points.shape[1])[None, 1:-1, None]
+
+    chord_points = (1 - fractions) * control_points[:, :1] + fractions * control_points[
+        :, -1:
+    ]
+
+    return np.max(
+        np.linalg.norm(control_points[:, 1:-1] - chord_points, axis=-1), axis=1
+    )
+
+
+# Intersections of pairs of curves (first of shape (P, n, 2), second (P, m, 2)).
+# Pairs of pieces whose control polygons' boxes overlap are subdivided, the larger
+# piece in half, until both are flat. Returns pair indices & both t, each of shape (I,).
+def intersect_curve_pairs(
+    first: np.ndarray,
+    second: np.ndarray,
+    tolerance: float = INTERSECTION_FLATNESS_TOLERANCE,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    pair_indices = np.arange(len(first))
+
+    # Ranges of t covered by the pieces
+    first_ranges = np.tile([0.0, 1.0], (len(first), 1))
+    second_ranges = np.tile([0.0, 1.0], (len(second), 1))
+
+    found_pairs: List[np.ndarray] = []
+    found_first_t: List[np.ndarray] = []
+    found_second_t: List[np.ndarray] = []
+
+    # Ranges of t on the first curves where they overlap the second curves
+    overlap_pairs: List[np.ndarray] = []
+    overlap_ranges: List[np.ndarray] = []
+
+    for _ in range(MAX_INTERSECTION_DEPTH):
+        if len(pair_indices) == 0:
+            break
+
+        first_min, first_max = get_hull_boxes(first)
+        second_min, second_max = get_hull_boxes(second)
+
+        overlapping = (
+            (first_min[:, 0] <= second_max[:, 0] + tolerance)
+            & (second_min[:, 0] <= first_max[:, 0] + tolerance)
+            & (first_min[:, 1] <= second_max[:, 1] + tolerance)
+            & (second_min[:, 1] <= first_max[:, 1] + tolerance)
+        )
+
+        first, second = first[overlapping], second[overlapping]
+        pair_indices = pair_indices[overlapping]
+        first_ranges, second_ranges = (
+            first_ranges[overlapping],
+            second_ranges[overlapping],
+        )
+
+        first_flat = batch_flatness(first) <= tolerance
+        second_flat = batch_flatness(second) <= tolerance
+
+        flat = first_flat & second_flat
+
+        # Flat pieces are replaced by their chords
+        (
+            chord_pairs,
+            first_u,
+            second_u,
+            overlapping_chords,
+            overlap_u,
+        ) = intersect_chords(
+            first[flat], second[flat], tolerance * OVERLAP_DISTANCE_FACTOR
+        )
+
+        overlapped_ranges = first_ranges[flat][overlapping_chords]
+
+        overlap_pairs.append(pair_indices[flat][overlapping_chords])
+        overlap_ranges.append(
+            overlapped_ranges[:, :1]
+            + (overlapped_ranges[:, 1:] - overlapped_ranges[:, :1]) * overlap_u
+        )
+
+        found_pairs.append(pair_indices[flat][chord_pairs])
+        found_first_t.append(get_t_in_range(first_ranges[flat][chord_pairs], first_u))
+        found_second_t.append(
+            get_t_in_range(second_ranges[flat][chord_pairs], second_u)
+        )
+
+        curved = ~flat
+
+        first, second = first[curved], second[curved]
+        pair_indices = pair_indices[curved]
+        first_ranges, second_ranges = first_ranges[curved], second_ranges[curved]
+        first_flat, second_flat = first_flat[curved], second_flat[curved]
+
+        first_sizes = get_box_sizes(first_min, first_max, overlapping, curved)
+        second_sizes = get_box_sizes(second_min, second_max, overlapping, curved)
+
+        # Flat pieces are never split, otherwise the larger one is
+        split_first = ~first_flat & (second_flat | (first_sizes >= second_sizes))
+
+        # Children of pairs whose first piece is split come before the others
+        first_parts, first_ranges_parts = split_pieces(
+            first, first_ranges, split_first, halves_first=True
+        )
+        second_parts, second_ranges_parts = split_pieces(
+            second, second_ranges, ~split_first, halves_first=False
+        )
+
+        first = np.concatenate(first_parts)
+        second = np.concatenate(second_parts)
+        first_ranges = np.concatenate(first_ranges_parts)
+        second_ranges = np.concatenate(second_ranges_parts)
+        pair_indices = np.concatenate(
+            [pair_indices[split_first]] * 2 + [pair_indices[~split_first]] * 2
+        )
+
+    if len(found_pairs) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0)
+
+    found_pairs_array = np.concatenate(found_pairs)
+    found_first_t_array = np.concatenate(found_first_t)
+
+    # Where the curves overlap, the chords of neighbouring pieces meet at their shared
+    # ends, which aren't crossings
+    kept = ~is_within_ranges(
+        found_pairs_array,
+        found_first_t_array,
+        np.concatenate(overlap_pairs),
+        np.concatenate(overlap_ranges),
+    )
+
+    return (
+        found_pairs_array[kept],
+        found_first_t_array[kept],
+        np.concatenate(found_second_t)[kept],
+    )
+
+
+# Whether each t lies in any of the ranges of its pair. Pairs & t are
+# combined into keys pair * 2 + t, which are ordered by the pair first, so a running
+# maximum of the ranges' ends sorted by their starts tells whether a key is covered.
+def is_within_ranges(
+    pairs: np.ndarray, t: np.ndarray, range_pairs: np.ndarray, ranges: np.ndarray
+) -> np.ndarray:
+    if len(range_pairs) == 0:
+        return np.zeros(len(pairs), dtype=bool)
+
+    starts = range_pairs * 2 + ranges[:, 0] - CHORD_PARAMETER_EPS
+    ends = range_pairs * 2 + ranges[:, 1] + CHORD_PARAMETER_EPS
+
+    order = np.argsort(starts, kind="stable")
+
+    starts = starts[order]
+    ends = np.maximum.accumulate(ends[order])
+
+    keys = pairs * 2 + t
+
+    positions = np.searchsorted(starts, keys, side="right") - 1
+
+    return (positions >= 0) & (ends[np.maximum(positions, 0)] >= keys)
+
+
+# Boxes of the control polygons (which contain the pieces), the elementwise loop over
+# the few control points is much faster than reducing along the short axis
+def get_hull_boxes(control_points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    box_min = control_points[:, 0].copy()
+    box_max = control_points[:, 0].copy()
+
+    for i in range(1, control_points.shape[1]):
+        np.minimum(box_min, control_points[:, i], out=box_min)
+        np.maximum(box_max, control_points[:, i], out=box_max)
+
+    return box_min, box_max
+
+
+# Larger side of the boxes that were kept by both masks
+def get_box_sizes(
+    box_min: np.ndarray,
+    box_max: np.ndarray,
+    first_mask: np.ndarray,
+    second_mask: np.ndarray,
+) -> np.ndarray:
+    sides = (box_max[first_mask] - box_min[first_mask])[second_mask]
+
+    return np.maximum(sides[:, 0], sides[:, 1])
+
+
+# Halves the pieces selected by split & duplicates the others, in the order: selected
+# (left halves), selected (right halves), others, others (or the others first)
+def split_pieces(
+    pieces: np.ndarray, ranges: np.ndarray, split: np.ndarray, halves_first: bool
+) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+    left, right = batch_split_curves(pieces[split])
+
+    middles = ranges[split].mean(axis=1)
+
+    left_ranges = np.stack([ranges[split, 0], middles], axis=1)
+    right_ranges = np.stack([middles, ranges[split, 1]], axis=1)
+
+    halves, halves_ranges = [left, right], [left_ranges, right_ranges]
+    others, others_ranges = [pieces[~split]] * 2, [ranges[~split]] * 2
+
+    if halves_first:
+        return halves + others, halves_ranges + others_ranges
+
+    return others + halves, others_ranges + halves_ranges
+
+
+def get_t_in_range(ranges: np.ndarray, u: np.ndarray) -> np.ndarray:
+    return ranges[:, 0] + (ranges[:, 1] - ranges[:, 0]) * u
+
+
+# Intersects the chords of pairs of flat pieces, returns the indices of the pairs whose
+# chords cross, the parameters of the crossings on both chords, the indices of the pairs
+# whose chords overlap (lie on the same line within overlap_distance) & the ranges of
+# the parameters on the first chords that the overlaps cover
+def intersect_chords(
+    first: np.ndarray, second: np.ndarray, overlap_distance: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    first_start, first_direction = first[:, 0], first[:, -1] - first[:, 0]
+    second_start, second_direction = second[:, 0], second[:, -1] - second[:, 0]
+
+    offset = second_start - first_start
+
+    denominator = cross(first_direction, second_direction)
+
+    overlapping, overlap_ranges = get_overlapping_chords(
+        first_direction, offset, second_direction, overlap_distance
+    )
+
+    # Parallel chords don't have a single crossing, neither do overlapping ones
+    not_parallel = (np.abs(denominator) > 0) & ~overlapping
+
+    first_u = np.divide(
+        cross(offset, second_direction),
+        denominator,
+        out=np.full(len(first), -1.0),
+        where=not_parallel,
+    )
+    second_u = np.divide(
+        cross(offset, first_direction),
+        denominator,
+        out=np.full(len(first), -1.0),
+        where=not_parallel,
+    )
+
+    crossing = (
+        not_parallel
+        & (first_u >= -CHORD_PARAMETER_EPS)
+        & (first_u <= 1 + CHORD_PARAMETER_EPS)
+        & (second_u >= -CHORD_PARAMETER_EPS)
+        & (second_u <= 1 + CHORD_PARAMETER_EPS)
+    )
+
+    chord_pairs = np.nonzero(crossing)[0]
+
+    overlapping_pairs = np.nonzero(overlapping)[0]
+
+    return (
+        chord_pairs,
+        np.clip(first_u[chord_pairs], 0.0, 1.0),
+        np.clip(second_u[chord_pairs], 0.0, 1.0),
+        overlapping_pairs,
+        overlap_ranges[overlapping_pairs],
+    )
+
+
+# Whether the parts of the second chords that lie alongside the first ones (project on
+# them) are within overlap_distance of them, with the ranges of the parameters on the
+# first chords that those parts cover. Only those parts are checked, as the pieces can
+# be of very different lengths & overlap only partially, where the rest of a chord
+# leaves the line of the other one as the curves bend.
+def get_overlapping_chords(
+    first_direction: np.ndarray,
+    offset: np.ndarray,
+    second_direction: np.ndarray,
+    overlap_distance: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    lengths_squared = np.einsum("ij,ij->i", first_direction, first_direction)
+
+    long_enough = lengths_squared > 0
+
+    lengths_squared = np.where(long_enough, lengths_squared, 1.0)
+
+    second_end = offset + second_direction
+
+    # Parameters along the first chords & distances from their lines of the ends of the
+    # second chords
+    start_u = np.einsum("ij,ij->i", offset, first_direction) / lengths_squared
+    end_u = np.einsum("ij,ij->i", second_end, first_direction) / lengths_squared
+
+    lengths = np.sqrt(lengths_squared)
+
+    start_distance = cross(offset, first_direction) / lengths
+    end_distance = cross(second_end, first_direction) / lengths
+
+    low_u = np.minimum(start_u, end_u)
+    high_u = np.maximum(start_u, end_u)
+
+    sharing = (high_u >= 0) & (low_u <= 1)
+
+    ranges = np.clip(np.stack([low_u, high_u], axis=1), 0.0, 1.0)
+
+    # Distances change linearly along the chords, so the ends of the parts suffice.
+    # Second chords perpendicular to the first ones project on a single point.
+    u_change = end_u - start_u
+
+    distance_slope = np.divide(
+        end_distance - start_distance,
+        u_change,
+        out=np.zeros(len(u_change)),
+        where=u_change != 0,
+    )
+
+    on_line = (u_change != 0) | (np.abs(end_distance) <= overlap_distance)
+
+    for u in ranges.T:
+        on_line &= (
+            np.abs(start_distance + distance_slope * (u - start_u)) <= overlap_distance
+        )
+
+    second_lengths = np.sqrt(np.einsum("ij,ij->i", second_direction, second_direction))
+
+    parallel = np.abs(cross(first_direction, second_direction)) <= (
+        OVERLAP_MAX_SINE * lengths * second_lengths
+    )
+
+    return long_enough & sharing & on_line & parallel, ranges
+
+
+def cross(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0]
+
+
+# Points on N curves of the same degree, each at its own t, shape (N, 2)
+def batch_points_at(control_points: np.ndarray, t: np.ndarray) -> np.ndarray:
+    current = control_points
+
+    while current.shape[1] > 1:
+        current = (1 - t[:, None, None]) * current[:, :-1] + t[:, None, None] * current[
+            :, 1:
+        ]
+
+    return current[:, 0]
+
+
+# Crossings of every pair of different curves, ordered by the curves & first_t
+def find_intersections(
+    curves_points_coords: Sequence[Sequence[Tuple[float, float]]],
+    tolerance: float = INTERSECTION_FLATNESS_TOLERANCE,
+) -> List[Intersection]:
+    if len(curves_points_coords) < 2:
+        return []
+
+    groups = group_curves_by_point_amount(curves_points_coords)
+
+    bounding_boxes = np.zeros((len(curves_points_coords), 4))
+
+    # Where every curve is within its group
+    point_amounts = np.zeros(len(curves_points_coords), dtype=np.int64)
+    positions = np.zeros(len(curves_points_coords), dtype=np.int64)
+
+    for amount, (indices, control_points) in groups.items():
+        bounding_boxes[indices] = batch_bounding_boxes(control_points)
+        point_amounts[indices] = amount
+        positions[indices] = np.arange(len(indices))
+
+    candidate_pairs = find_overlapping_boxes(bounding_boxes)
+
+    if len(candidate_pairs) == 0:
+        return []
+
+    results: List[np.ndarray] = []
+
+    # The narrow phase runs in one batch per combination of degrees
+    pair_amounts = point_amounts[candidate_pairs]
+
+    for first_amount, second_amount in np.unique(pair_amounts, axis=0).tolist():
+        pairs = candidate_pairs[
+            (pair_amounts[:, 0] == first_amount) & (pair_amounts[:, 1] == second_amount)
+        ]
+
+        first = groups[first_amount][1][positions[pairs[:, 0]]]
+        second = groups[second_amount][1][positions[pairs[:, 1]]]
+
+        found_pairs, first_t, second_t = intersect_curve_pairs(first, second, tolerance)
+
+        points = batch_points_at(first[found_pairs], first_t)
+
+        results.append(
+            np.column_stack(
+                [
+                    pairs[found_pairs, 0],
+                    first_t,
+                    pairs[found_pairs, 1],
+                    second_t,
+                    points,
+                ]
+            )
+        )
+
+    return merge_intersections(np.concatenate(results))
+
+
+# Rows of (first curve, first t, second curve, second t, x, y)
+def merge_intersections(rows: np.ndarray) -> List[Intersection]:
+    rows = rows[np.lexsort((rows[:, 1], rows[:, 2], rows[:, 0]))]
+
+    intersections: List[Intersection] = []
+
+    for first_curve, first_t, second_curve, second_t, x, y in rows.tolist():
+        if len(intersections) > 0:
+            last = intersections[-1]
+
+            if (
+                last.first_curve == first_curve
+                and last.second_curve == second_curve
+                and abs(last.point[0] - x) <= INTERSECTION_MERGE_DISTANCE
+                and abs(last.point[1] - y) <= INTERSECTION_MERGE_DISTANCE
+            ):
+                continue
+
+        intersections.append(
+            Intersection(int(first_curve), first_t, int(second_curve), second_t, (x, y))
+        )
+
+    return intersections
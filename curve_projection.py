@@ -0,0 +1,161 @@
+from typing import NamedTuple, Tuple
+import numpy as np
+from arc_length import (
+    batch_evaluate_coefficients,
+    batch_evaluate_coefficients_at,
+    get_coefficients,
+)
+
+
+# Samples of the coarse table (equally spaced in t) per degree of the curve, the nearest
+# one is close enough to the nearest point for Newton's method to converge to it
+PROJECTION_SAMPLES_PER_DEGREE: int = 16
+
+# Newton's method converges quadratically, so a few steps reach float precision
+PROJECTION_NEWTON_STEPS: int = 4
+
+# Local minima of the table refined per query, the distance to a curve of degree n has
+# at most 2n - 1 of them, but the nearest point is practically always among the nearest few
+PROJECTION_CANDIDATES: int = 3
+
+# Maximum amount of (curve, query, sample) distances calculated at once
+PROJECTION_CHUNK_SIZE: int = 4 * 1024 * 1024
+
+
+# Points of N curves of the same degree at the same parameters
+class ProjectionTable(NamedTuple):
+    t: np.ndarray  # Shape (K,), from 0 to 1
+    points: np.ndarray  # Shape (N, K, 2)
+
+
+# Nearest points of N curves to M query points
+class Projections(NamedTuple):
+    t: np.ndarray  # Shape (N, M)
+    points: np.ndarray  # Shape (N, M, 2)
+    distances: np.ndarray  # Shape (N, M)
+
+
+class CurveProjection(NamedTuple):
+    t: float
+    point: Tuple[float, float]
+    distance: float
+
+
+def batch_projection_tables(
+    control_points: np.ndarray, sample_count: int | None = None
+) -> ProjectionTable:
+    control_points = np.asarray(control_points, dtype=float)
+
+    if sample_count is None:
+        sample_count = PROJECTION_SAMPLES_PER_DEGREE * (control_points.shape[1] - 1) + 1
+
+    t = np.linspace(0.0, 1.0, sample_count)
+
+    points = batch_evaluate_coefficients_at(get_coefficients(control_points), t)
+
+    return ProjectionTable(t, points.transpose(1, 0, 2))
+
+
+# Coefficients of the derivative of polynomials in the power basis (lowest power first)
+def differentiate_coefficients(coefficients: np.ndarray) -> np.ndarray:
+    return coefficients[:, 1:] * np.arange(1, coefficients.shape[1])[:, None]
+
+
+# Nearest point of every curve to every query point of shape (M, 2). A few of the nearest
+# local minima of the table's distances are refined by Newton's method on
+# (B(t) - q) · B'(t) = 0, each kept between its neighbouring samples, so that it can't
+# wander off to another minimum, then the nearest one is picked.
+def batch_project_points(
+    control_points: np.ndarray,
+    queries: np.ndarray,
+    table: ProjectionTable | None = None,
+) -> Projections:
+    control_points = np.asarray(control_points, dtype=float)
+    queries = np.asarray(queries, dtype=float).reshape(-1, 2)
+
+    if table is None:
+        table = batch_projection_tables(control_points)
+
+    curve_count, query_count = control_points.shape[0], queries.shape[0]
+    sample_count = len(table.t)
+    candidate_count = min(PROJECTION_CANDIDATES, sample_count)
+
+    coefficients = get_coefficients(control_points)
+    first_derivatives = differentiate_coefficients(coefficients)
+    second_derivatives = differentiate_coefficients(first_derivatives)
+
+    # Seeds, the queries are split into chunks so that the distances stay small
+    seeds = np.zeros((curve_count, query_count, candidate_count), dtype=np.int64)
+
+    chunk_size = max(PROJECTION_CHUNK_SIZE // max(curve_count * sample_count, 1), 1)
+
+    for start in range(0, query_count, chunk_size):
+        end = min(start + chunk_size, query_count)
+
+        offsets = table.points[:, None, :, :] - queries[None, start:end, None, :]
+
+        squared_distances = np.einsum("nmki,nmki->nmk", offsets, offsets)
+
+        # Samples that aren't local minima only lead to the same minima again
+        not_minima = np.zeros(squared_distances.shape, dtype=bool)
+        not_minima[..., 1:] |= squared_distances[..., 1:] > squared_distances[..., :-1]
+        not_minima[..., :-1] |= squared_distances[..., :-1] > squared_distances[..., 1:]
+
+        squared_distances[not_minima] = np.inf
+
+        seeds[:, start:end] = np.argpartition(
+            squared_distances, candidate_count - 1, axis=2
+        )[..., :candidate_count]
+
+    seeds = seeds.reshape(curve_count, -1)
+
+    seed_t = table.t[seeds]
+
+    step = table.t[1] - table.t[0]
+
+    low_t = np.maximum(seed_t - step, 0.0)
+    high_t = np.minimum(seed_t + step, 1.0)
+
+    # Every query once per candidate, shape (N, M * C, 2)
+    candidate_queries = np.repeat(queries, candidate_count, axis=0)
+
+    t = seed_t
+
+    for _ in range(PROJECTION_NEWTON_STEPS):
+        offsets = batch_evaluate_coefficients(coefficients, t) - candidate_queries
+        velocities = batch_evaluate_coefficients(first_derivatives, t)
+        accelerations = batch_evaluate_coefficients(second_derivatives, t)
+
+        gradients = np.sum(offsets * velocities, axis=-1)
+        curvatures = np.sum(velocities * velocities, axis=-1) + np.sum(
+            offsets * accelerations, axis=-1
+        )
+
+        # Where the distance isn't convex, Newton's method would head to a maximum
+        steps = np.divide(
+            gradients, curvatures, out=np.zeros_like(t), where=curvatures > 0
+        )
+
+        t = np.clip(t - steps, low_t, high_t)
+
+    # The seeds are candidates as well, so the result is never worse than the table
+    t = np.concatenate(
+        [
+            t.reshape(curve_count, query_count, -1),
+            seed_t.reshape(curve_count, query_count, -1),
+        ],
+        axis=2,
+    )
+
+    points = batch_evaluate_coefficients(coefficients, t.reshape(curve_count, -1))
+    points = points.reshape(curve_count, query_count, -1, 2)
+
+    distances = np.linalg.norm(points - queries[None, :, None, :], axis=-1)
+
+    best = np.argmin(distances, axis=2)[..., None]
+
+    return Projections(
+        np.take_along_axis(t, best, axis=2)[..., 0],
+        np.take_along_axis(points, best[..., None], axis=2)[:, :, 0],
+        np.take_along_axis(distances, best, axis=2)[..., 0],
+    )
@@ -0,0 +1,470 @@
+from os import fsync, makedirs, path as os_path, remove, replace, listdir
+from queue import Queue
+from struct import Struct
+from threading import Thread
+from typing import Any, List, Tuple
+from zlib import crc32
+from project_format import (
+    DASHED_LINE_VISIBLE_FLAG,
+    EXTREMUM_POINTS_VISIBLE_FLAG,
+    BOUNDING_BOX_VISIBLE_FLAG,
+    DEFAULT_ATTRIBUTES_FLAG,
+    PROJECT_EXTENSION,
+    CurveAttributes,
+    CurveData,
+    ProjectData,
+    color_to_int,
+    int_to_color,
+    create_project_data,
+    get_curves_data,
+    read_any_project,
+    write_project,
+)
+
+
+# The journal starts with a header naming the project it is based on (empty if none),
+# followed by one frame per edit: length & CRC32 of the record, then the record itself.
+# A crash can only damage the last frame, which is detected by the CRC & dropped.
+JOURNAL_MAGIC = b"BZVJ"
+
+JOURNAL_VERSION: int = 1
+
+JOURNAL_FILENAME = "session.journal"
+
+# Snapshots are numbered, so that the previous one stays valid until the journal
+# that refers to it is replaced
+SNAPSHOT_PREFIX = "session."
+
+# A journal that can't be replayed & its snapshots are kept under this extension, so
+# that they are neither replayed again nor removed
+FAILED_EXTENSION = ".failed"
+
+# The journal is compacted once it is larger than this & than half of its base
+JOURNAL_COMPACTION_MIN_BYTES: int = 256 * 1024
+
+JOURNAL_HEADER = Struct("<4sHI")
+
+FRAME = Struct("<II")
+
+OPERATION = Struct("<B")
+
+CURVE_INDEX = Struct("<I")
+
+POINT = Struct("<ii")
+
+POINT_INDEX = Struct("<H")
+
+POINT_AMOUNT = Struct("<H")
+
+ATTRIBUTES = Struct("<HB5I")
+
+STRING_LENGTH = Struct("<I")
+
+CREATE_CURVE: int = 1
+DELETE_CURVE: int = 2
+MOVE_POINT: int = 3
+SET_POINTS: int = 4
+SET_ATTRIBUTES: int = 5
+SET_IMAGE: int = 6
+
+# Commands for the writer thread
+START_COMMAND = "start"
+RECORD_COMMAND = "record"
+COMPACT_COMMAND = "compact"
+STOP_COMMAND = "stop"
+
+InvalidJournalError: ValueError = ValueError("Invalid Journal")
+
+JournalRecoveryError: RuntimeError = RuntimeError("Journal Could Not Be Recovered")
+
+
+def encode_attributes(attributes: CurveAttributes | None) -> bytes:
+    if attributes is None:
+        return ATTRIBUTES.pack(0, DEFAULT_ATTRIBUTES_FLAG, 0, 0, 0, 0, 0)
+
+    return ATTRIBUTES.pack(
+        attributes.width,
+        DASHED_LINE_VISIBLE_FLAG * attributes.dashed_line_visible
+        | EXTREMUM_POINTS_VISIBLE_FLAG * attributes.extremum_points_visible
+        | BOUNDING_BOX_VISIBLE_FLAG * attributes.bounding_box_visible,
+        *[color_to_int(color) for color in attributes[1:6]],
+    )
+
+
+def decode_attributes(record: bytes, offset: int) -> CurveAttributes | None:
+    width, flags, *colors = ATTRIBUTES.unpack_from(record, offset)
+
+    if flags & DEFAULT_ATTRIBUTES_FLAG:
+        return None
+
+    return CurveAttributes(
+        width,
+        *[int_to_color(color) for color in colors],
+        bool(flags & DASHED_LINE_VISIBLE_FLAG),
+        bool(flags & EXTREMUM_POINTS_VISIBLE_FLAG),
+        bool(flags & BOUNDING_BOX_VISIBLE_FLAG),
+    )
+
+
+def encode_points(points_coords: List[Tuple[int, int]]) -> bytes:
+    return POINT_AMOUNT.pack(len(points_coords)) + b"".join(
+        POINT.pack(*point_coords) for point_coords in points_coords
+    )
+
+
+def decode_points(record: bytes, offset: int) -> List[Tuple[int, int]]:
+    (amount,) = POINT_AMOUNT.unpack_from(record, offset)
+
+    offset += POINT_AMOUNT.size
+
+    return [POINT.unpack_from(record, offset + i * POINT.size) for i in range(amount)]
+
+
+def encode_string(string: str) -> bytes:
+    string_bytes = string.encode("utf-8")
+
+    return STRING_LENGTH.pack(len(string_bytes)) + string_bytes
+
+
+def decode_string(buffer: bytes, offset: int) -> Tuple[str, int]:
+    (length,) = STRING_LENGTH.unpack_from(buffer, offset)
+
+    offset += STRING_LENGTH.size
+
+    return buffer[offset : offset + length].decode("utf-8"), offset + length
+
+
+def is_snapshot_filename(filename: str) -> bool:
+    return filename.startswith(SNAPSHOT_PREFIX) and filename.endswith(PROJECT_EXTENSION)
+
+
+# Functions creating the records of the individual edits, curves are referred to by
+# their index in the list of curves at the time of the edit
+def create_curve_record(
+    points_coords: List[Tuple[int, int]], attributes: CurveAttributes | None
+) -> bytes:
+    return (
+        OPERATION.pack(CREATE_CURVE)
+        + encode_attributes(attributes)
+        + encode_points(points_coords)
+    )
+
+
+def delete_curve_record(curve_index: int) -> bytes:
+    return OPERATION.pack(DELETE_CURVE) + CURVE_INDEX.pack(curve_index)
+
+
+def move_point_record(
+    curve_index: int, point_index: int, point_coords: Tuple[int, int]
+) -> bytes:
+    return (
+        OPERATION.pack(MOVE_POINT)
+        + CURVE_INDEX.pack(curve_index)
+        + POINT_INDEX.pack(point_index)
+        + POINT.pack(*point_coords)
+    )
+
+
+def set_points_record(curve_index: int, points_coords: List[Tuple[int, int]]) -> bytes:
+    return (
+        OPERATION.pack(SET_POINTS)
+        + CURVE_INDEX.pack(curve_index)
+        + encode_points(points_coords)
+    )
+
+
+def set_attributes_record(curve_index: int, attributes: CurveAttributes) -> bytes:
+    return (
+        OPERATION.pack(SET_ATTRIBUTES)
+        + CURVE_INDEX.pack(curve_index)
+        + encode_attributes(attributes)
+    )
+
+
+def set_image_record(image_filename: str | None) -> bytes:
+    return OPERATION.pack(SET_IMAGE) + encode_string(image_filename or "")
+
+
+# Applies a single record to the curves, returns the new image filename
+def apply_record(
+    record: bytes, curves: List[CurveData], image_filename: str | None
+) -> str | None:
+    (operation,) = OPERATION.unpack_from(record, 0)
+
+    offset = OPERATION.size
+
+    if operation == CREATE_CURVE:
+        attributes = decode_attributes(record, offset)
+
+        curves.append(
+            CurveData(decode_points(record, offset + ATTRIBUTES.size), attributes)
+        )
+    elif operation == SET_IMAGE:
+        image_filename = decode_string(record, offset)[0] or None
+    else:
+        (curve_index,) = CURVE_INDEX.unpack_from(record, offset)
+
+        offset += CURVE_INDEX.size
+
+        if operation == DELETE_CURVE:
+            curves.pop(curve_index)
+        elif operation == MOVE_POINT:
+            (point_index,) = POINT_INDEX.unpack_from(record, offset)
+
+            points_coords = list(curves[curve_index].points_coords)
+            points_coords[point_index] = POINT.unpack_from(
+                record, offset + POINT_INDEX.size
+            )
+
+            curves[curve_index] = curves[curve_index]._replace(
+                points_coords=points_coords
+            )
+        elif operation == SET_POINTS:
+            curves[curve_index] = curves[curve_index]._replace(
+                points_coords=decode_points(record, offset)
+            )
+        elif operation == SET_ATTRIBUTES:
+            curves[curve_index] = curves[curve_index]._replace(
+                attributes=decode_attributes(record, offset)
+            )
+        else:
+            raise InvalidJournalError
+
+    return image_filename
+
+
+# Replays the records of the journal on top of its base project
+def replay_journal(journal: bytes) -> ProjectData:
+    base_filename, offset = decode_string(journal, JOURNAL_HEADER.size)
+
+    name = ""
+    image_filename: str | None = None
+    curves: List[CurveData] = []
+
+    if len(base_filename) > 0:
+        base = read_any_project(base_filename)
+
+        name = base.name
+        image_filename = base.image_filename
+        curves = get_curves_data(base)
+
+    while offset + FRAME.size <= len(journal):
+        length, checksum = FRAME.unpack_from(journal, offset)
+
+        record = journal[offset + FRAME.size : offset + FRAME.size + length]
+
+        # The write of the last record was interrupted
+        if len(record) < length or crc32(record) != checksum:
+            break
+
+        image_filename = apply_record(record, curves, image_filename)
+
+        offset += FRAME.size + length
+
+    return create_project_data(name, image_filename, curves)
+
+
+# Every edit is appended to the journal by a background thread, so recording an edit
+# only costs encoding it. The journal is based on a project file (the loaded project or
+# a snapshot written by compaction), so replaying it on top of that file restores
+# the state after a crash. A clean close removes the journal.
+class EditJournal:
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self.journal_filename = os_path.join(directory, JOURNAL_FILENAME)
+
+        # Only touched by the writer thread
+        self.journal_file: Any = None
+        self.snapshot_generation: int = 0
+
+        # Approximate, for deciding when to compact
+        self.journal_size: int = 0
+        self.base_size: int = 0
+
+        self.commands: Queue = Queue()
+        self.writer_thread: Thread | None = None
+
+    def ensure_writer_started(self) -> None:
+        if self.writer_thread is None:
+            self.writer_thread = Thread(target=self.run_writer, daemon=True)
+            self.writer_thread.start()
+
+    # Starts a new journal based on the project file (None for an empty project)
+    def start(self, base_filename: str | None) -> None:
+        self.ensure_writer_started()
+
+        self.journal_size = 0
+        self.base_size = (
+            os_path.getsize(base_filename)
+            if base_filename is not None and os_path.exists(base_filename)
+            else 0
+        )
+
+        self.commands.put((START_COMMAND, base_filename))
+
+    def record(self, record: bytes) -> None:
+        self.ensure_writer_started()
+
+        self.journal_size += FRAME.size + len(record)
+
+        self.commands.put((RECORD_COMMAND, record))
+
+    def needs_compaction(self) -> bool:
+        return self.journal_size > max(
+            JOURNAL_COMPACTION_MIN_BYTES, self.base_size // 2
+        )
+
+    # Writes the current state as a snapshot & starts a new journal based on it.
+    # Records added after this call end up in the new journal.
+    def compact(self, project: ProjectData) -> None:
+        self.ensure_writer_started()
+
+        self.journal_size = 0
+        self.base_size = (
+            project.records.nbytes + project.coords.nbytes
+        )  # Roughly the snapshot's size
+
+        self.commands.put((COMPACT_COMMAND, project))
+
+    # Waits for everything to be written, a clean close also removes the journal
+    def close(self, clean: bool = True) -> None:
+        if self.writer_thread is not None:
+            self.commands.put((STOP_COMMAND, clean))
+            self.writer_thread.join()
+            self.writer_thread = None
+
+    def run_writer(self) -> None:
+        while True:
+            command, argument = self.commands.get()
+
+            if command == START_COMMAND:
+                self.write_new_journal(argument)
+            elif command == RECORD_COMMAND:
+                self.append_record(argument)
+            elif command == COMPACT_COMMAND:
+                snapshot_filename = self.get_snapshot_filename(
+                    self.snapshot_generation + 1
+                )
+
+                write_project(snapshot_filename, argument)
+
+                self.snapshot_generation += 1
+
+                self.write_new_journal(snapshot_filename)
+            elif command == STOP_COMMAND:
+                self.close_journal_file()
+
+                if argument:
+                    self.remove_files()
+
+                return
+
+            # Edits come in bursts, so the file is synced once the burst is written
+            if self.commands.empty() and self.journal_file is not None:
+                self.journal_file.flush()
+                fsync(self.journal_file.fileno())
+
+    def get_snapshot_filename(self, generation: int) -> str:
+        return os_path.join(
+            self.directory, f"{SNAPSHOT_PREFIX}{generation}{PROJECT_EXTENSION}"
+        )
+
+    def write_new_journal(self, base_filename: str | None) -> None:
+        self.close_journal_file()
+
+        makedirs(self.directory, exist_ok=True)
+
+        base = encode_string(base_filename or "")
+
+        # Replaced atomically, so there always is a complete journal header
+        temporary_filename = self.journal_filename + ".tmp"
+
+        with open(temporary_filename, "wb") as f:
+            f.write(JOURNAL_HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION, len(base)))
+            f.write(base)
+            f.flush()
+            fsync(f.fileno())
+
+        replace(temporary_filename, self.journal_filename)
+
+        self.journal_file = open(self.journal_filename, "ab")
+
+        # Snapshots that the new journal isn't based on aren't needed anymore
+        self.remove_snapshots(keep=base_filename)
+
+    def append_record(self, record: bytes) -> None:
+        if self.journal_file is None:
+            self.write_new_journal(None)
+
+        self.journal_file.write(FRAME.pack(len(record), crc32(record)) + record)
+
+    def close_journal_file(self) -> None:
+        if self.journal_file is not None:
+            self.journal_file.close()
+            self.journal_file = None
+
+    def remove_snapshots(self, keep: str | None = None) -> None:
+        if not os_path.isdir(self.directory):
+            return
+
+        for filename in listdir(self.directory):
+            full_filename = os_path.join(self.directory, filename)
+
+            if is_snapshot_filename(filename) and full_filename != keep:
+                remove(full_filename)
+
+    def remove_files(self) -> None:
+        self.remove_snapshots()
+
+        if os_path.exists(self.journal_filename):
+            remove(self.journal_filename)
+
+    # Returns the state at the time of the crash, or None if the last session was
+    # closed cleanly (or never started). If the journal can't be replayed (e.g. its base
+    # snapshot is missing), it's set aside & JournalRecoveryError is raised.
+    def recover(self) -> ProjectData | None:
+        if not os_path.exists(self.journal_filename):
+            return None
+
+        with open(self.journal_filename, "rb") as f:
+            journal = f.read()
+
+        if len(journal) < JOURNAL_HEADER.size:
+            return None
+
+        magic, version, _ = JOURNAL_HEADER.unpack_from(journal, 0)
+
+        if magic != JOURNAL_MAGIC or version > JOURNAL_VERSION:
+            return None
+
+        try:
+            project = replay_journal(journal)
+        except Exception as error:
+            self.set_aside_failed_journal()
+
+            raise JournalRecoveryError from error
+
+        self.snapshot_generation = self.find_last_snapshot_generation()
+
+        return project
+
+    def set_aside_failed_journal(self) -> None:
+        replace(self.journal_filename, self.journal_filename + FAILED_EXTENSION)
+
+        for filename in listdir(self.directory):
+            if is_snapshot_filename(filename):
+                full_filename = os_path.join(self.directory, filename)
+
+                replace(full_filename, full_filename + FAILED_EXTENSION)
+
+    def find_last_snapshot_generation(self) -> int:
+        generation = 0
+
+        for filename in listdir(self.directory):
+            if is_snapshot_filename(filename):
+                number = filename[len(SNAPSHOT_PREFIX) : -len(PROJECT_EXTENSION)]
+
+                if number.isdigit():
+                    generation = max(generation, int(number))
+
+        return generation
@@ -0,0 +1,162 @@
+from collections import OrderedDict
+from os import stat
+from threading import Lock
+from typing import Tuple
+from PIL import Image
+
+
+# Limits of the decoded image cache, whichever is reached first evicts the least
+# recently used image
+MAX_CACHED_IMAGES: int = 16
+MAX_CACHED_IMAGES_BYTES: int = 256 * 1024 * 1024
+
+# JPEGs are decoded at a reduced scale when the source is at least this many times
+# larger than the target size (the rest is done by resizing, for quality)
+JPEG_DRAFT_SCALE_MARGIN: int = 2
+
+# Resize in two steps (fast integer reduction, then resampling) when downscaling by
+# more than this factor, which is much faster with practically the same quality
+RESIZE_REDUCING_GAP: float = 3.0
+
+ImageKey = Tuple[str, int, Tuple[int, int]]
+
+
+# Only reads the header, so it's cheap even for huge images
+def is_valid_image(filename: str) -> bool:
+    try:
+        with Image.open(filename) as image:
+            image.size
+    except (OSError, ValueError, AttributeError, TypeError):
+        return False
+
+    return True
+
+
+def get_image_size(filename: str) -> Tuple[int, int]:
+    with Image.open(filename) as image:
+        return image.size
+
+
+# Largest size with the same aspect ratio as image_size that fits into bounds
+def get_fitted_size(
+    image_size: Tuple[int, int], bounds: Tuple[int, int]
+) -> Tuple[int, int]:
+    if image_size[0] == image_size[1]:
+        smaller_side = min(bounds)
+
+        return (smaller_side, smaller_side)
+
+    elif image_size[0] > image_size[1]:
+        return (bounds[0], round(image_size[1] * (bounds[0] / image_size[0])))
+
+    else:
+        return (round(image_size[0] * (bounds[1] / image_size[1])), bounds[1])
+
+
+def get_image_bytes(image: Image.Image) -> int:
+    return image.width * image.height * len(image.getbands())
+
+
+def decode_image(filename: str, target_size: Tuple[int, int]) -> Image.Image:
+    with Image.open(filename) as image:
+        # Let the JPEG decoder skip the detail that would be thrown away anyway
+        if image.format == "JPEG":
+            image.draft(
+                image.mode,
+                (
+                    target_size[0] * JPEG_DRAFT_SCALE_MARGIN,
+                    target_size[1] * JPEG_DRAFT_SCALE_MARGIN,
+                ),
+            )
+
+        if image.size == target_size:
+            image.load()
+
+            return image.copy()
+
+        return image.resize(target_size, reducing_gap=RESIZE_REDUCING_GAP)
+
+
+# Decoded & downscaled images keyed by their path, modification time & size, so an
+# image is decoded again only when the file changes or it's needed at another size.
+# Images are decoded in background threads too, so the cache is guarded by a lock,
+# which isn't held while decoding.
+class DecodedImageCache:
+    def __init__(
+        self,
+        max_images: int = MAX_CACHED_IMAGES,
+        max_bytes: int = MAX_CACHED_IMAGES_BYTES,
+    ) -> None:
+        self.max_images = max_images
+        self.max_bytes = max_bytes
+
+        self.images: OrderedDict[ImageKey, Image.Image] = OrderedDict()
+        self.total_bytes: int = 0
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self.lock = Lock()
+
+    def get_key(self, filename: str, target_size: Tuple[int, int]) -> ImageKey:
+        return (filename, stat(filename).st_mtime_ns, target_size)
+
+    # The returned image is shared, so it mustn't be modified
+    def get_image(self, filename: str, target_size: Tuple[int, int]) -> Image.Image:
+        key = self.get_key(filename, target_size)
+
+        with self.lock:
+            if key in self.images:
+                self.hits += 1
+
+                self.images.move_to_end(key)
+
+                return self.images[key]
+
+            self.misses += 1
+
+        image = decode_image(filename, target_size)
+
+        with self.lock:
+            # Another thread could have decoded the same image meanwhile
+            if key not in self.images:
+                self.images[key] = image
+                self.total_bytes += get_image_bytes(image)
+
+                self.evict()
+
+            return self.images.get(key, image)
+
+    # Whether get_image would return without decoding
+    def contains(self, filename: str, target_size: Tuple[int, int]) -> bool:
+        try:
+            key = self.get_key(filename, target_size)
+        except OSError:
+            return False
+
+        with self.lock:
+            return key in self.images
+
+    # Returns the image scaled to fit into bounds, without decoding the file to find
+    # out its size
+    def get_fitted_image(self, filename: str, bounds: Tuple[int, int]) -> Image.Image:
+        return self.get_image(
+            filename, get_fitted_size(get_image_size(filename), bounds)
+        )
+
+    def evict(self) -> None:
+        # The most recently used image is always kept, even if it's over the budget alone
+        while len(self.images) > 1 and (
+            len(self.images) > self.max_images or self.total_bytes > self.max_bytes
+        ):
+            _, image = self.images.popitem(last=False)
+
+            self.total_bytes -= get_image_bytes(image)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.images.clear()
+            self.total_bytes = 0
+
+
+decoded_image_cache = DecodedImageCache()
@@ -1,27 +1,69 @@
 from ROOT_PATH import root_path
-from tkinter import Canvas, NW, filedialog
-from typing import Tuple, Callable
+from tkinter import Canvas, Label, NW, filedialog
+from typing import Tuple, Callable, Dict
 from PIL import Image, ImageTk
+from image_cache import (
+    decoded_image_cache,
+    get_fitted_size,
+    get_image_size,
+    is_valid_image,
+)
+from tile_pyramid import TilePyramid, TileKey
+from viewport import Viewport
+from background_tasks import IMAGE_TASK_GROUP, TaskRunner
+from instrumentation import instrumentation
+
+
+# Tag of all canvas items showing the image's tiles
+IMAGE_TILE_TAG = "image_tile"
 
 
 class ImageManager:
-    def __init__(self, canvas: Canvas):
+    def __init__(
+        self,
+        canvas: Canvas,
+        viewport: Viewport | None = None,
+        task_runner: TaskRunner | None = None,
+        status_label: Label | None = None,
+    ):
         self.canvas = canvas
+        self.viewport = viewport if viewport is not None else Viewport()
+        self.task_runner = (
+            task_runner if task_runner is not None else TaskRunner(canvas)
+        )
+        self.status_label = status_label
 
         self.image_filename: str | None = None
-        self.image: ImageTk.PhotoImage | None = None
-        self.canvas_image: int | None = None
+
+        # The image is placed into the world fitted to the canvas it was imported into,
+        # but it's rendered from the tiles of the source image at the current zoom
+        self.image_pos: Tuple[int, int] = (0, 0)
+        self.image_size: Tuple[int, int] = (0, 0)
+        self.tile_pyramid: TilePyramid | None = None
+
+        # Only the tiles that are visible have a PhotoImage & a canvas item
+        self.tile_items: Dict[TileKey, Tuple[ImageTk.PhotoImage, int]] = {}
+
+        # Levels are decoded in the background, meanwhile the closest decoded level
+        # is shown (or nothing, until the first one is ready)
+        self.decoding_level: int | None = None
 
     def remove_image(
         self,
     ) -> None:
         if self.image_filename is not None:
             self.image_filename = None
-        if self.image is not None:
-            self.image = None
-        if self.canvas_image is not None:
-            self.canvas.delete(self.canvas_image)
+        if self.tile_pyramid is not None:
+            self.tile_pyramid.clear()
+            self.tile_pyramid = None
+
+        self.task_runner.cancel(IMAGE_TASK_GROUP)
+        self.decoding_level = None
+
+        self.canvas.delete(IMAGE_TILE_TAG)
+        self.tile_items = {}
 
+    @instrumentation.timed("ImageManager.display_new_image")
     def display_new_image(
         self,
         filename: str,
@@ -34,47 +76,136 @@ class ImageManager:
         # Load new image
         self.image_filename = filename
 
-        raw_image = Image.open(self.image_filename)
+        # Only the header is needed to place the image, it's decoded when it's rendered
+        source_size = get_image_size(self.image_filename)
 
         # Rescale the image so that it fits on the canvas
-        new_image_size: Tuple[int, int] = (0, 0)
+        self.image_size = get_fitted_size(source_size, canvas_size)
+
+        # Calculate position where image's NW corner will be placed on canvas
+        # (in world coordinates, which are the same as the canvas ones when not zoomed)
+        self.image_pos = (
+            round((canvas_size[0] - self.image_size[0]) / 2),
+            round((canvas_size[1] - self.image_size[1]) / 2),
+        )
 
-        if raw_image.width == raw_image.height:
-            smaller_canvas_side = min(canvas_size)
+        self.tile_pyramid = TilePyramid(self.image_filename, source_size)
 
-            new_image_size = (smaller_canvas_side, smaller_canvas_side)
+        self.render_image()
 
-        elif raw_image.width > raw_image.height:
-            new_image_size = (
-                canvas_size[0],
-                round(raw_image.height * (canvas_size[0] / raw_image.width)),
-            )
+    # Shows the tiles intersecting the canvas, reusing the canvas items of tiles that
+    # were already visible & freeing those that aren't anymore
+    def render_image(self) -> None:
+        if self.tile_pyramid is None:
+            return
 
-        else:
-            new_image_size = (
-                round(raw_image.width * (canvas_size[1] / raw_image.height)),
-                canvas_size[1],
-            )
+        canvas_size = (self.canvas.winfo_width(), self.canvas.winfo_height())
 
-        raw_image = raw_image.resize(new_image_size)
+        origin = self.viewport.world_to_screen(self.image_pos)
 
-        # Calculate position where image's NW corner will be placed on canvas
-        image_pos_on_canvas: Tuple[int, int] = (
-            round((canvas_size[0] - raw_image.width) / 2),
-            round((canvas_size[1] - raw_image.height) / 2),
+        source_size = self.tile_pyramid.image_size
+
+        scale = (
+            self.image_size[0] * self.viewport.zoom / source_size[0],
+            self.image_size[1] * self.viewport.zoom / source_size[1],
+        )
+
+        level = self.tile_pyramid.get_level(scale[0])
+
+        decoded_level = self.tile_pyramid.find_decoded_level(level)
+
+        if decoded_level != max(level, 0):
+            self.decode_level(level)
+
+            # Negative levels are cut from the source image as well
+            level = decoded_level
+
+        new_tile_items: Dict[TileKey, Tuple[ImageTk.PhotoImage, int]] = {}
+
+        placements = (
+            []
+            if level is None
+            else self.tile_pyramid.get_visible_tiles(origin, scale, canvas_size, level)
         )
 
-        # Convert the image so that Tkinter can work with it
-        self.image = ImageTk.PhotoImage(raw_image)
+        for placement in placements:
+            if placement.key in self.tile_items:
+                photo_image, item = self.tile_items.pop(placement.key)
+
+                self.canvas.coords(item, placement.position)
+            else:
+                # Convert the tile so that Tkinter can work with it
+                photo_image = ImageTk.PhotoImage(self.tile_pyramid.get_tile(placement))
+
+                item = self.canvas.create_image(
+                    placement.position,
+                    anchor=NW,
+                    image=photo_image,
+                    tags=IMAGE_TILE_TAG,
+                )
 
-        # Apply the image
-        self.canvas_image = self.canvas.create_image(
-            image_pos_on_canvas,
-            anchor=NW,
-            image=self.image,
+            new_tile_items[placement.key] = (photo_image, item)
+
+        for _, item in self.tile_items.values():
+            self.canvas.delete(item)
+
+        self.tile_items = new_tile_items
+
+        self.canvas.tag_lower(IMAGE_TILE_TAG)
+
+    def decode_level(self, level: int) -> None:
+        if self.decoding_level == level and self.task_runner.is_running(
+            IMAGE_TASK_GROUP
+        ):
+            return
+
+        tile_pyramid = self.tile_pyramid
+
+        if len(self.tile_items) == 0:
+            self.show_status("Loading image...", "black")
+
+        self.decoding_level = level
+
+        self.task_runner.submit(
+            IMAGE_TASK_GROUP,
+            lambda task: tile_pyramid.get_level_image(level),
+            lambda _: self.handle_level_decoded(tile_pyramid),
+            self.handle_decoding_error,
         )
 
-        self.canvas.tag_lower(self.canvas_image)
+    def handle_level_decoded(self, tile_pyramid: TilePyramid) -> None:
+        self.decoding_level = None
+
+        # The image could have been replaced meanwhile
+        if tile_pyramid is self.tile_pyramid:
+            first_tiles = len(self.tile_items) == 0
+
+            self.render_image()
+
+            if first_tiles:
+                self.show_status("Image loaded successfully!", "green")
+
+    def handle_decoding_error(self, error: Exception) -> None:
+        self.decoding_level = None
+
+        self.show_status("Error while loading image!", "red")
+
+    # Returns whether there was anything to cancel, an image that isn't shown yet
+    # is removed
+    def cancel_loading(self) -> bool:
+        if not self.task_runner.cancel(IMAGE_TASK_GROUP):
+            return False
+
+        self.decoding_level = None
+
+        if len(self.tile_items) == 0:
+            self.remove_image()
+
+        return True
+
+    def show_status(self, text: str, color: str) -> None:
+        if self.status_label is not None:
+            self.status_label.config(text=text, fg=color)
 
     def import_image(self) -> None:
         filetypes = (("Accepted image files", ["*.png", "*.jpg"]),)
@@ -83,14 +214,32 @@ class ImageManager:
             title="Import Image", initialdir=root_path, filetypes=filetypes
         )
 
-        try:
-            Image.open(
-                filename
-            )  # Try to see if it fails (I don't know what it returns when user chooses nothing)
-        except AttributeError:
-            pass
-        else:
+        # Only the header is read, the image is decoded in the background
+        if is_valid_image(filename):
             self.display_new_image(filename)
 
     def get_active_image_filename(self) -> str | None:
         return self.image_filename
+
+    # Returns (min_x, min_y, max_x, max_y) of the image in world coordinates
+    def get_image_extent(self) -> Tuple[int, int, int, int] | None:
+        if self.image_filename is None:
+            return None
+
+        return (
+            self.image_pos[0],
+            self.image_pos[1],
+            self.image_pos[0] + self.image_size[0],
+            self.image_pos[1] + self.image_size[1],
+        )
+
+    # The image in the size it has in the world & the world position of its NW corner,
+    # so that it can be analysed (e.g. for fitting curves) in world coordinates
+    def get_displayed_image(self) -> Tuple[Image.Image, Tuple[int, int]] | None:
+        if self.image_filename is None:
+            return None
+
+        return (
+            decoded_image_cache.get_image(self.image_filename, self.image_size),
+            self.image_pos,
+        )
@@ -0,0 +1,259 @@
+from contextlib import contextmanager
+from functools import wraps
+from json import dump
+from threading import Lock
+from time import perf_counter
+from tkinter import Canvas
+from typing import Any, Callable, Dict, Iterator, List, TypeVar
+
+
+# Histograms have a bucket for every power of two from 2^0 to 2^(count - 1), spans
+# are recorded in microseconds, so the last bucket starts at ~35 minutes
+HISTOGRAM_BUCKET_COUNT: int = 32
+
+HISTOGRAM_PERCENTILES = (50, 95, 99)
+
+# Histograms of the amounts of canvas items per frame
+CREATED_ITEMS_HISTOGRAM = "canvas_items_created_per_frame"
+DELETED_ITEMS_HISTOGRAM = "canvas_items_deleted_per_frame"
+
+INSTRUMENTATION_FORMAT_VERSION: int = 1
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+# Values are counted in buckets whose sizes grow exponentially, so recording is O(1)
+# & the percentiles are precise to a factor of two, which is plenty for spotting
+# where the time goes
+class Histogram:
+    def __init__(self, unit: str) -> None:
+        self.unit = unit
+
+        self.count: int = 0
+        self.total: float = 0.0
+        self.min: float = float("inf")
+        self.max: float = 0.0
+
+        self.buckets: List[int] = [0] * HISTOGRAM_BUCKET_COUNT
+
+    def record(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+        # Bucket i holds values in [2^(i - 1), 2^i), the first one also those below 1
+        bucket = min(int(value).bit_length(), HISTOGRAM_BUCKET_COUNT - 1)
+
+        self.buckets[bucket] += 1
+
+    # Upper bound of the bucket containing the percentile, capped by the maximum
+    def get_percentile(self, percentile: float) -> float:
+        if self.count == 0:
+            return 0.0
+
+        rank = self.count * percentile / 100
+
+        seen = 0
+
+        for bucket, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+
+            if seen >= rank:
+                return min(float(2**bucket), self.max)
+
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "unit": self.unit,
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count > 0 else 0.0,
+            "min": self.min if self.count > 0 else 0.0,
+            "max": self.max,
+            "percentiles": {
+                str(percentile): self.get_percentile(percentile)
+                for percentile in HISTOGRAM_PERCENTILES
+            },
+            # Upper bounds of the buckets, without the empty ones
+            "buckets": {
+                str(2**bucket): bucket_count
+                for bucket, bucket_count in enumerate(self.buckets)
+                if bucket_count > 0
+            },
+        }
+
+
+# Spans are recorded only while enabled, when disabled a span costs a single check of
+# the flag. Spans can end in background threads, so recording is guarded by a lock.
+class Instrumentation:
+    def __init__(self) -> None:
+        self.enabled: bool = False
+
+        self.histograms: Dict[str, Histogram] = {}
+
+        # Canvas items of the frame that is being drawn & of the last finished frame
+        self.created_items: int = 0
+        self.deleted_items: int = 0
+        self.last_frame_created_items: int = 0
+        self.last_frame_deleted_items: int = 0
+
+        self.lock = Lock()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self.lock:
+            self.histograms = {}
+
+            self.created_items = 0
+            self.deleted_items = 0
+            self.last_frame_created_items = 0
+            self.last_frame_deleted_items = 0
+
+    def record(self, name: str, value: float, unit: str = "us") -> None:
+        with self.lock:
+            histogram = self.histograms.get(name)
+
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(unit)
+
+            histogram.record(value)
+
+    def count_items(self, created: int = 0, deleted: int = 0) -> None:
+        self.created_items += created
+        self.deleted_items += deleted
+
+    # Called once a frame (e.g. a drag step or a redraw of the view) is drawn
+    def end_frame(self) -> None:
+        if not self.enabled:
+            return
+
+        self.record(CREATED_ITEMS_HISTOGRAM, self.created_items, "items")
+        self.record(DELETED_ITEMS_HISTOGRAM, self.deleted_items, "items")
+
+        self.last_frame_created_items = self.created_items
+        self.last_frame_deleted_items = self.deleted_items
+
+        self.created_items = 0
+        self.deleted_items = 0
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+
+        start = perf_counter()
+
+        try:
+            yield
+        finally:
+            self.record(name, (perf_counter() - start) * 1_000_000)
+
+    # Decorator form of span
+    def timed(self, name: str) -> Callable[[F], F]:
+        def decorator(func: F) -> F:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+
+                start = perf_counter()
+
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, (perf_counter() - start) * 1_000_000)
+
+            return wrapper  # type: ignore
+
+        return decorator
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "version": INSTRUMENTATION_FORMAT_VERSION,
+                "histograms": {
+                    name: histogram.to_dict()
+                    for name, histogram in sorted(self.histograms.items())
+                },
+            }
+
+    def export(self, filename: str) -> None:
+        with open(filename, "w") as f:
+            dump(self.to_dict(), f, indent=2)
+
+    # Lines of the overlay: the spans with their counts & percentiles in milliseconds,
+    # then the canvas items of the last frame
+    def get_summary_lines(self) -> List[str]:
+        lines: List[str] = []
+
+        with self.lock:
+            for name, histogram in sorted(self.histograms.items()):
+                if histogram.unit != "us":
+                    continue
+
+                lines.append(
+                    f"{name}: {histogram.count}x"
+                    f" p50 {histogram.get_percentile(50) / 1000:.2f}"
+                    f" p95 {histogram.get_percentile(95) / 1000:.2f}"
+                    f" max {histogram.max / 1000:.2f} ms"
+                )
+
+        lines.append(
+            f"canvas items last frame: +{self.last_frame_created_items}"
+            f" -{self.last_frame_deleted_items}"
+        )
+
+        return lines
+
+
+instrumentation = Instrumentation()
+
+
+# Counts the items created & deleted while the instrumentation is enabled. Items deleted
+# by a tag are counted by looking them up first, which is done only while enabled.
+class InstrumentedCanvas(Canvas):
+    def create_line(self, *args, **kwargs) -> int:
+        if instrumentation.enabled:
+            instrumentation.count_items(created=1)
+
+        return super().create_line(*args, **kwargs)
+
+    def create_oval(self, *args, **kwargs) -> int:
+        if instrumentation.enabled:
+            instrumentation.count_items(created=1)
+
+        return super().create_oval(*args, **kwargs)
+
+    def create_rectangle(self, *args, **kwargs) -> int:
+        if instrumentation.enabled:
+            instrumentation.count_items(created=1)
+
+        return super().create_rectangle(*args, **kwargs)
+
+    def create_text(self, *args, **kwargs) -> int:
+        if instrumentation.enabled:
+            instrumentation.count_items(created=1)
+
+        return super().create_text(*args, **kwargs)
+
+    def create_image(self, *args, **kwargs) -> int:
+        if instrumentation.enabled:
+            instrumentation.count_items(created=1)
+
+        return super().create_image(*args, **kwargs)
+
+    def delete(self, *args) -> None:
+        if instrumentation.enabled:
+            instrumentation.count_items(
+                deleted=sum(len(self.find_withtag(tag_or_id)) for tag_or_id in args)
+            )
+
+        super().delete(*args)
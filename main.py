@@ -1,26 +1,108 @@
 from ROOT_PATH import root_path
 import tkinter as tk
+from tkinter import filedialog
 from pathlib import Path
-from typing import List, Tuple, Dict
+from time import perf_counter
+from typing import List, Tuple, Dict, Sequence
+import numpy as np
 from bezier_curve import (
     BezierCurve,
     DEFAULT_CURVE_COLOR,
-    DEFAULT_ENDPOINT_COLOR,
-    DEFAULT_CONTROL_POINT_COLOR,
     DEFAULT_X_EXTREMUM_COLOR,
     DEFAULT_Y_EXTREMUM_COLOR,
-    curve_names,
+    BOUNDING_BOX_TAG,
+    CURVE_LINE_TAG,
+    DASHED_LINE_TAG,
+    EXTREMUM_POINT_TAG,
+    HANDLE_TAG,
+)
+from bezier_geometry import (
+    P,
+    MAX_CURVE_DEGREE,
+    get_curve_name,
     get_points_default_pos,
 )
-from canvas_point import P, CanvasPoint
+from canvas_point import CanvasPoint
+from curve_fitting import fit_curve_to_stroke, get_fitted_points_coords
+from bezier_batch import (
+    get_bounding_boxes,
+    get_curves_extent,
+    get_curves_near_point,
+    get_nearest_points,
+)
+from curve_intersections import Intersection, find_intersections
+from curve_projection import CurveProjection
+from viewport import Viewport
+from project_format import (
+    CurveAttributes,
+    CurveData,
+    ProjectData,
+    create_project_data,
+    get_curves_data,
+)
+from background_tasks import INTERSECTION_TASK_GROUP, LOAD_TASK_GROUP, TaskRunner
+from edit_journal import (
+    EditJournal,
+    create_curve_record,
+    delete_curve_record,
+    move_point_record,
+    set_points_record,
+    set_attributes_record,
+    set_image_record,
+)
 import projects_manager
 from image_manager import ImageManager
 from color_changer import ColorChanger
+from instrumentation import InstrumentedCanvas, instrumentation
 
 
 # Obtain path to icon
 absolute_path_to_icon = str(Path(root_path, "./bezierve_icon_2.ico").resolve())
 
+# Limits for how often a dragged curve & its equations are redrawn
+MAX_DRAG_FPS: int = 60
+
+MAX_DRAG_LABELS_FPS: int = 10
+
+# How much one step of the mouse wheel zooms in or out
+ZOOM_STEP: float = 1.25
+
+AUTO_FIT_STROKE_COLOR: str = "#ff8800"
+
+AUTO_FIT_STROKE_TAG: str = "auto_fit_stroke"
+
+INTERSECTION_MARKER_COLOR: str = "#ff0000"
+
+INTERSECTION_MARKER_RADIUS: int = 4
+
+INTERSECTION_MARKER_TAG: str = "intersection_marker"
+
+# How close (in screen pixels) the pointer has to be to a curve for the hover readout
+# & for snapping a dragged point (with Shift held) onto another curve
+HOVER_DISTANCE: int = 10
+
+HOVER_MARKER_COLOR: str = "#ff8800"
+
+HOVER_MARKER_RADIUS: int = 4
+
+HOVER_MARKER_TAG: str = "hover_marker"
+
+# Bit of the event state that is set while Shift is held
+SHIFT_MASK: int = 0x0001
+
+# How often the performance overlay is refreshed while it's shown
+PERFORMANCE_OVERLAY_INTERVAL_MS: int = 500
+
+PERFORMANCE_OVERLAY_COLOR: str = "#006600"
+
+PERFORMANCE_OVERLAY_TAG: str = "performance_overlay"
+
+# The edits of the current session are journaled here, for recovery after a crash
+autosave_path = str(Path(root_path, "./saves/autosave/").resolve())
+
+# How often the journal is checked for compaction into a snapshot
+JOURNAL_COMPACTION_INTERVAL_MS: int = 30 * 1000
+
 
 class MainFrame(tk.Frame):
     def __init__(self, parent: tk.Tk | None = None) -> None:
@@ -29,6 +111,16 @@ class MainFrame(tk.Frame):
 
         self.curves: List[BezierCurve] = []
 
+        self.edit_journal = EditJournal(autosave_path)
+
+        # Runs file reading, writing & image decoding outside of the Tk thread
+        self.task_runner = TaskRunner(self)
+
+        # While a project is being opened, its curves aren't journaled one by one
+        self.journal_paused: bool = False
+
+        self.project_name: str = ""
+
         self.canvas_frame = tk.Frame(master=self)
         self.right_panel_frame = tk.Frame(master=self)
         self.bottom_panel_frame = tk.Frame(master=self)
@@ -47,7 +139,8 @@ class MainFrame(tk.Frame):
 
         self.widget_padding = 3
 
-        self.canvas = tk.Canvas(
+        # Counts the items created & deleted per frame while timings are recorded
+        self.canvas = InstrumentedCanvas(
             master=self.canvas_frame,
             highlightthickness=2,
             highlightbackground="#0066cc",
@@ -82,6 +175,24 @@ class MainFrame(tk.Frame):
             width=self.side_panel_width,
         )
 
+        # Create widgets for adding new curves of any other degree
+        self.higher_degree_frame = tk.Frame(self.curves_management_frame)
+
+        self.higher_degree_spinbox = tk.Spinbox(
+            self.higher_degree_frame,
+            from_=4,
+            to=MAX_CURVE_DEGREE,
+            width=3,
+            state="readonly",
+        )
+
+        self.new_higher_degree_button = tk.Button(
+            self.higher_degree_frame,
+            text="New of Degree",
+            command=lambda: self.new_curve(int(self.higher_degree_spinbox.get()) + 1),
+            width=self.side_panel_width - 6,
+        )
+
         # Create button for deleting currently selected curve
         self.delete_curve_button = tk.Button(
             self.curves_management_frame,
@@ -101,6 +212,48 @@ class MainFrame(tk.Frame):
 
         self.canvas.bind("<Button-1>", self.handle_click)
         self.canvas.bind("<B1-Motion>", self.handle_drag)
+        self.canvas.bind("<ButtonRelease-1>", self.handle_release)
+
+        # The nearest point of the curve under the pointer is marked & read out, the
+        # query runs once per idle loop at most
+        self.canvas.bind("<Motion>", self.handle_motion)
+        self.canvas.bind("<Leave>", lambda event: self.clear_hover())
+
+        self.hover_position: Tuple[int, int] | None = None
+        self.hover_job: str | None = None
+
+        # Bounding boxes of all curves, which narrow down the curves near the pointer,
+        # rebuilt lazily after curves are added or removed
+        self.curves_bounding_boxes: np.ndarray | None = None
+
+        # Zooming with the mouse wheel (<Button-4> & <Button-5> on X11) & panning by
+        # dragging with the middle or right mouse button
+        self.viewport = Viewport()
+        self.pan_anchor: Tuple[int, int] | None = None
+        self.view_redraw_job: str | None = None
+
+        self.canvas.bind("<MouseWheel>", self.handle_mouse_wheel)
+        self.canvas.bind("<Button-4>", self.handle_mouse_wheel)
+        self.canvas.bind("<Button-5>", self.handle_mouse_wheel)
+
+        for button in (2, 3):
+            self.canvas.bind(f"<Button-{button}>", self.handle_pan_start)
+            self.canvas.bind(f"<B{button}-Motion>", self.handle_pan_drag)
+            self.canvas.bind(f"<ButtonRelease-{button}>", self.handle_pan_end)
+
+        # More of the image may become visible when the canvas is resized
+        self.canvas.bind("<Configure>", lambda event: self.schedule_view_redraw())
+
+        self.max_drag_fps: int = MAX_DRAG_FPS
+        self.max_drag_labels_fps: int = MAX_DRAG_LABELS_FPS
+        self.pending_drag_position: Tuple[int, int] | None = None
+        self.pending_drag_snap: bool = False
+        self.drag_redraw_job: str | None = None
+        self.drag_labels_job: str | None = None
+        self.last_drag_redraw_time: float = 0.0
+        self.last_drag_labels_update_time: float = 0.0
+        # Curve & index of the point moved by the drag, journaled once it's released
+        self.dragged_point: Tuple[BezierCurve, int] | None = None
 
         self.curves_listbox.bind("<<ListboxSelect>>", self.handle_curve_select)
 
@@ -181,22 +334,103 @@ class MainFrame(tk.Frame):
             state=tk.DISABLED,
         )
 
-        self.image_manager = ImageManager(self.canvas)
+        self.save_info_label = tk.Label(self.saving_management_frame)
+
+        self.image_manager = ImageManager(
+            self.canvas, self.viewport, self.task_runner, self.save_info_label
+        )
 
         self.import_image_button = tk.Button(
             self.image_options_frame,
             text="Import Image",
-            command=self.image_manager.import_image,
+            command=self.import_image,
             width=self.side_panel_width,
         )
 
         self.remove_image_button = tk.Button(
             self.image_options_frame,
             text="Remove Image",
-            command=self.image_manager.remove_image,
+            command=self.remove_image,
+            width=self.side_panel_width,
+        )
+
+        # In auto-fit mode, the user draws a rough stroke along a line of the image
+        # instead of dragging points & a curve is fitted to the edges under it
+        self.auto_fit_mode: bool = False
+        self.auto_fit_stroke: List[Tuple[int, int]] = []
+        self.auto_fit_stroke_line: int | None = None
+
+        self.auto_fit_button = tk.Button(
+            self.image_options_frame,
+            text="Auto-Fit Curve",
+            command=self.toggle_auto_fit_mode,
             width=self.side_panel_width,
         )
 
+        self.view_options_frame = tk.Frame(master=self.left_panel_frame)
+
+        self.fit_all_button = tk.Button(
+            self.view_options_frame,
+            text="Fit All",
+            command=self.fit_all,
+            width=self.side_panel_width,
+        )
+
+        self.reset_view_button = tk.Button(
+            self.view_options_frame,
+            text="Reset View",
+            command=self.reset_view,
+            width=self.side_panel_width,
+        )
+
+        # Crossings of the curves are found in the background & marked on the canvas
+        # until any curve changes
+        self.intersections: List[Intersection] = []
+
+        self.find_intersections_button = tk.Button(
+            self.view_options_frame,
+            text="Find Intersections",
+            command=self.find_intersections,
+            width=self.side_panel_width,
+        )
+
+        self.hover_info_label = tk.Label(
+            self.view_options_frame, text="", width=self.side_panel_width
+        )
+
+        # Timings of the hot paths are recorded only while enabled & can be shown over
+        # the canvas or exported
+        self.record_timings_var: tk.IntVar = tk.IntVar(value=0)
+
+        self.record_timings_checkbutton = tk.Checkbutton(
+            self.view_options_frame,
+            text="Record Timings",
+            variable=self.record_timings_var,
+            onvalue=1,
+            offvalue=0,
+            command=self.toggle_timings_recording,
+        )
+
+        self.show_performance_overlay_var: tk.IntVar = tk.IntVar(value=0)
+
+        self.show_performance_overlay_checkbutton = tk.Checkbutton(
+            self.view_options_frame,
+            text="Show Overlay",
+            variable=self.show_performance_overlay_var,
+            onvalue=1,
+            offvalue=0,
+            command=self.toggle_performance_overlay,
+        )
+
+        self.export_timings_button = tk.Button(
+            self.view_options_frame,
+            text="Export Timings",
+            command=self.export_timings,
+            width=self.side_panel_width,
+        )
+
+        self.performance_overlay_job: str | None = None
+
         self.show_bounding_box_var: tk.IntVar = tk.IntVar(value=0)
 
         self.show_bounding_box_checkbutton = tk.Checkbutton(
@@ -222,7 +456,23 @@ class MainFrame(tk.Frame):
             height=25,
         )
 
-        self.save_info_label = tk.Label(self.saving_management_frame)
+        # Filters the saved projects by the start of their name
+        self.search_projects_label = tk.Label(
+            self.saving_management_frame, text="Search:"
+        )
+
+        self.search_projects_entry = tk.Entry(
+            self.saving_management_frame, width=self.side_panel_listbox_width
+        )
+
+        self.search_projects_entry.bind(
+            "<KeyRelease>",
+            lambda event: projects_manager.show_projects(
+                self.projects_listbox,
+                self.save_info_label,
+                self.search_projects_entry.get(),
+            ),
+        )
 
         self.save_project_button = tk.Button(
             self.saving_management_frame,
@@ -233,6 +483,7 @@ class MainFrame(tk.Frame):
                 self.save_info_label,
                 self.image_manager.get_active_image_filename,
                 self.get_list_of_curves,
+                self.task_runner,
             ),
             width=self.side_panel_width,
         )
@@ -244,13 +495,19 @@ class MainFrame(tk.Frame):
                 self.projects_listbox,
                 self.save_as_entry,
                 self.save_info_label,
-                self.remove_everything,
-                self.image_manager.display_new_image,
-                self.new_curve,
+                self.open_project,
+                self.task_runner,
             ),
             width=self.side_panel_width,
         )
 
+        self.cancel_loading_button = tk.Button(
+            self.saving_management_frame,
+            text="Cancel Loading",
+            command=self.cancel_loading,
+            width=self.side_panel_width,
+        )
+
         self.delete_project_button = tk.Button(
             self.saving_management_frame,
             text="Delete Project",
@@ -260,34 +517,56 @@ class MainFrame(tk.Frame):
             width=self.side_panel_width,
         )
 
+        self.export_svg_button = tk.Button(
+            self.saving_management_frame,
+            text="Export As SVG",
+            command=lambda: projects_manager.export_project_as_svg(
+                self.projects_listbox, self.save_info_label, self.task_runner
+            ),
+            width=self.side_panel_width,
+        )
+
         projects_manager.recognize_save_files(
             self.projects_listbox, self.save_info_label
         )
 
+        # Recovered before anything is edited, as the first edit replaces the journal.
+        # A journal that can't be replayed is set aside & a new one is started.
+        try:
+            recovered_project = self.edit_journal.recover()
+        except Exception:
+            recovered_project = None
+
+            self.save_info_label.config(
+                text="Error while recovering changes!", fg="red"
+            )
+
+        if recovered_project is not None:
+            self.after_idle(lambda: self.open_recovered_project(recovered_project))
+        else:
+            self.edit_journal.start(None)
+
+        self.after(JOURNAL_COMPACTION_INTERVAL_MS, self.compact_edit_journal)
+
     # Define function that executes every time user selects a different curve
+    @instrumentation.timed("MainFrame.handle_curve_select")
     def handle_curve_select(self, event) -> None:
         if len(self.curves_listbox.curselection()) > 0:
-            self.selected_curve = self.curves[self.curves_listbox.curselection()[0]]
+            # Only the edited curve has handles, so the previous one can release its own
+            if self.selected_curve is not None:
+                self.selected_curve.release_handles(self.canvas)
 
-            self.selected_curve.raise_curve_widgets(self.canvas)
+            self.selected_point = None
 
-            # Put the points of the selected curve on top & hide all other points
-            for curve in self.curves:
-                for point in curve.points:
-                    if point in self.selected_curve.points:
-                        self.canvas.itemconfig(point.point, state=tk.NORMAL)
-                        self.canvas.tag_raise(point.point)
-                    else:
-                        self.canvas.itemconfig(point.point, state=tk.HIDDEN)
+            self.selected_curve = self.curves[self.curves_listbox.curselection()[0]]
 
-                    for point in curve.extremum_points:
-                        self.canvas.delete(point.point)
+            # Hide the editing widgets of all curves at once, then show the selected ones on top
+            self.canvas.itemconfig(DASHED_LINE_TAG, state=tk.HIDDEN)
+            self.canvas.itemconfig(EXTREMUM_POINT_TAG, state=tk.HIDDEN)
 
-                if curve.dashed_line is not None:
-                    if curve == self.selected_curve:
-                        self.canvas.itemconfig(curve.dashed_line, state=tk.NORMAL)
-                    else:
-                        self.canvas.itemconfig(curve.dashed_line, state=tk.HIDDEN)
+            self.selected_curve.show_editing_widgets(self.canvas)
+
+            self.selected_curve.raise_curve_widgets(self.canvas)
 
             self.display_curve_equations()
 
@@ -319,69 +598,95 @@ class MainFrame(tk.Frame):
     def get_list_of_curves(self) -> List[BezierCurve]:
         return self.curves
 
-    # Define function for creating points on canvas
-    def new_canvas_points(self, points_coords: List[P]) -> List[CanvasPoint]:
-        canvas_points_list = []
-
-        for point_tuple in points_coords:
-            color = DEFAULT_CONTROL_POINT_COLOR
-            if point_tuple == points_coords[0] or point_tuple == points_coords[-1]:
-                color = DEFAULT_ENDPOINT_COLOR
-            canvas_point = CanvasPoint(point_tuple, self.canvas, color=color)
-            canvas_points_list.append(canvas_point)
-
-        return canvas_points_list
-
     # Define functions for creating new curves
     def new_curve(
-        self, amount_of_points: int, points_list: List[P] | None = None
+        self,
+        amount_of_points: int,
+        points_list: List[P] | None = None,
+        attributes: CurveAttributes | None = None,
     ) -> None:
         canvas_width = self.canvas.winfo_width()
         canvas_height = self.canvas.winfo_height()
 
-        new_points = None
+        new_points = points_list
 
-        if points_list is None:
-            new_points = self.new_canvas_points(
-                get_points_default_pos(
+        if new_points is None:
+            # The default positions are on the canvas, wherever the view currently is
+            new_points = [
+                self.viewport.screen_to_world_point(point)
+                for point in get_points_default_pos(
                     amount_of_points,
                     canvas_width,
                     canvas_height,
                 )
-            )
-        else:
-            new_points = self.new_canvas_points(points_list)
+            ]
+
+        self.add_curves([CurveData(new_points, attributes)])
 
-        last_curve_number = 0
+    # Number of the last curve for every amount of points
+    def get_last_curve_numbers(self) -> Dict[int, int]:
+        last_curve_numbers: Dict[int, int] = {}
 
         for curve in self.curves:
-            if len(curve.points) == len(new_points):
-                last_curve_number = int(curve.name.split("#")[-1])
+            last_curve_numbers[len(curve.points_coords)] = int(
+                curve.name.split("#")[-1]
+            )
 
-        new_curve_name = f"{curve_names[amount_of_points]} #{last_curve_number + 1}"
+        return last_curve_numbers
 
-        new_curve = BezierCurve(
-            name=new_curve_name,
-            points=new_points,
-            canvas_height=canvas_width,
-        )
+    # Adds many curves at once (e.g. when loading a project), so that the names, the
+    # listbox & the stacking order are dealt with once instead of once per curve
+    def add_curves(self, curves_data: Sequence[CurveData]) -> List[BezierCurve]:
+        last_curve_numbers = self.get_last_curve_numbers()
+
+        new_curves: List[BezierCurve] = []
 
-        self.curves.append(new_curve)
+        for curve_data in curves_data:
+            amount_of_points = len(curve_data.points_coords)
 
-        new_curve.draw(self.canvas)
+            curve_number = last_curve_numbers.get(amount_of_points, 0) + 1
+
+            last_curve_numbers[amount_of_points] = curve_number
+
+            new_curve = BezierCurve(
+                name=f"{get_curve_name(amount_of_points)} #{curve_number}",
+                points_coords=curve_data.points_coords,
+                canvas_height=self.canvas.winfo_width(),
+                viewport=self.viewport,
+            )
+
+            if curve_data.attributes is not None:
+                new_curve.apply_attributes(curve_data.attributes)
+
+            # New items are created on top of the others anyway
+            new_curve.draw(self.canvas, raise_new_items=False)
+
+            new_curves.append(new_curve)
+
+        if not self.journal_paused:
+            for curve_data in curves_data:
+                self.edit_journal.record(
+                    create_curve_record(curve_data.points_coords, curve_data.attributes)
+                )
+
+        self.curves.extend(new_curves)
+
+        self.handle_curves_changed()
+
+        self.curves_listbox.insert(tk.END, *[curve.name for curve in new_curves])
+
+        # Because the newly added curves are not automatically selected, we can
+        # immediately hide their editing widgets, together with those of all other curves
+        self.canvas.itemconfig(DASHED_LINE_TAG, state=tk.HIDDEN)
+        self.canvas.itemconfig(EXTREMUM_POINT_TAG, state=tk.HIDDEN)
 
         if self.selected_curve is not None:
-            self.selected_curve.raise_curve_widgets(self.canvas)
+            self.selected_curve.show_editing_widgets(self.canvas)
+            self.selected_curve.update_extremum_points_visibility(self.canvas)
 
-        self.curves_listbox.insert(tk.END, new_curve_name)
+            self.selected_curve.raise_curve_widgets(self.canvas)
 
-        # Because the newly added curve is not automatically selected, we can immediately hide its points
-        for point in new_curve.points:
-            self.canvas.itemconfig(point.point, state=tk.HIDDEN)
-        for point in new_curve.extremum_points:
-            self.canvas.itemconfig(point.point, state=tk.HIDDEN)
-        if new_curve.dashed_line is not None:
-            self.canvas.itemconfig(new_curve.dashed_line, state=tk.HIDDEN)
+        return new_curves
 
     def draw_selected_curve(self) -> None:
         if self.selected_curve is not None:
@@ -401,52 +706,82 @@ class MainFrame(tk.Frame):
             if self.selected_curve == curve_to_be_deleted:
                 self.selected_curve = None
 
-            for point in curve_to_be_deleted.points:
-                if self.selected_point == point.point:
+            for point in curve_to_be_deleted.handles:
+                if self.selected_point == point:
                     self.selected_point = None
 
-                self.canvas.delete(point.point)
+            curve_to_be_deleted.delete(self.canvas)
 
-            if curve_to_be_deleted.curve is not None:
-                self.canvas.delete(curve_to_be_deleted.curve)
+            self.curves.pop(curve_index_to_be_deleted)
 
-            if curve_to_be_deleted.dashed_line is not None:
-                self.canvas.delete(curve_to_be_deleted.dashed_line)
+            self.handle_curves_changed()
 
-            for extremum_point in curve_to_be_deleted.extremum_points:
-                self.canvas.delete(extremum_point.point)
+            if not self.journal_paused:
+                self.edit_journal.record(delete_curve_record(curve_index_to_be_deleted))
 
-            if curve_to_be_deleted.bounding_box_canvas_line is not None:
-                self.canvas.delete(curve_to_be_deleted.bounding_box_canvas_line)
+            self.curves_listbox.delete(self.curves_listbox.curselection())
 
-            self.curves.pop(curve_index_to_be_deleted)
+            self.reset_curve_widgets()
 
-            self.curves_listbox.delete(self.curves_listbox.curselection())
+    # Removes all curves at once (e.g. when a project is replaced), so that the canvas,
+    # the listbox & the widgets are dealt with once instead of once per curve
+    def remove_all_curves(self) -> None:
+        self.selected_curve = None
+        self.selected_point = None
+
+        # Every item of every curve has one of the role tags
+        self.canvas.delete(
+            CURVE_LINE_TAG,
+            DASHED_LINE_TAG,
+            BOUNDING_BOX_TAG,
+            HANDLE_TAG,
+            EXTREMUM_POINT_TAG,
+        )
 
-            # Revert every widget to default
+        if not self.journal_paused:
+            for curve_index in reversed(range(len(self.curves))):
+                self.edit_journal.record(delete_curve_record(curve_index))
 
-            self.display_curve_equations()
+        self.curves.clear()
 
-            self.display_curve_extrema()
+        self.handle_curves_changed()
+
+        self.curves_listbox.delete(0, tk.END)
 
-            self.show_dashed_line_var.set(value=1)
+        self.reset_curve_widgets()
 
-            self.show_dashed_line_checkbutton.config(state=tk.DISABLED)
+    # Reverts every widget to default, once no curve is selected
+    def reset_curve_widgets(self) -> None:
+        self.display_curve_equations()
 
-            self.show_extremum_points_var.set(value=1)
+        self.display_curve_extrema()
 
-            self.show_extremum_points_checkbutton.config(state=tk.DISABLED)
+        self.show_dashed_line_var.set(value=1)
 
-            self.show_bounding_box_var.set(value=0)
+        self.show_dashed_line_checkbutton.config(state=tk.DISABLED)
 
-            self.show_bounding_box_checkbutton.config(state=tk.DISABLED)
+        self.show_extremum_points_var.set(value=1)
 
-            self.curve_color_changer.revert_original_color()
+        self.show_extremum_points_checkbutton.config(state=tk.DISABLED)
+
+        self.show_bounding_box_var.set(value=0)
+
+        self.show_bounding_box_checkbutton.config(state=tk.DISABLED)
+
+        self.curve_color_changer.revert_original_color()
+
+    def select_curve(self, index: int) -> None:
+        self.curves_listbox.selection_clear(0, tk.END)
+        self.curves_listbox.selection_set(index)
+
+        self.handle_curve_select(None)
 
     # Handle mouse events
     def handle_click(self, event) -> None:
-        if self.selected_curve is not None:
-            for point in self.selected_curve.points:
+        if self.auto_fit_mode:
+            self.start_auto_fit_stroke(event)
+        elif self.selected_curve is not None:
+            for point in self.selected_curve.handles:
                 tags = self.canvas.gettags(point.point)
                 if "current" in tags:
                     self.selected_point = point
@@ -460,14 +795,76 @@ class MainFrame(tk.Frame):
                     event.y - self.selected_point.point_coords[1],
                 )
 
+    # Dragging only records the latest pointer position, the redraw itself runs in a
+    # single scheduled callback at most max_drag_fps times per second
+    @instrumentation.timed("MainFrame.handle_drag")
     def handle_drag(self, event) -> None:
-        if self.selected_point:
+        if self.auto_fit_mode:
+            self.extend_auto_fit_stroke(event)
+        elif self.selected_point:
+            self.pending_drag_position = (event.x, event.y)
+            self.pending_drag_snap = bool(event.state & SHIFT_MASK)
+
+            if self.drag_redraw_job is None:
+                delay = 1 / self.max_drag_fps - (
+                    perf_counter() - self.last_drag_redraw_time
+                )
+
+                self.drag_redraw_job = self.after(
+                    max(round(delay * 1000), 0), self.process_pending_drag
+                )
+
+    def handle_release(self, event) -> None:
+        if self.auto_fit_mode:
+            self.finish_auto_fit_stroke()
+
+        # Make sure the point ends up exactly where the pointer was released
+        if self.drag_redraw_job is not None:
+            self.after_cancel(self.drag_redraw_job)
+
+            self.process_pending_drag()
+
+        if self.drag_labels_job is not None:
+            self.after_cancel(self.drag_labels_job)
+
+            self.update_drag_labels()
+
+        self.journal_dragged_point()
+
+    # A whole drag is journaled as a single move to where the point ended up
+    def journal_dragged_point(self) -> None:
+        if self.dragged_point is None:
+            return
+
+        curve, point_index = self.dragged_point
+
+        self.dragged_point = None
+
+        if curve in self.curves:
+            self.edit_journal.record(
+                move_point_record(
+                    self.curves.index(curve),
+                    point_index,
+                    curve.points_coords[point_index],
+                )
+            )
+
+    @instrumentation.timed("MainFrame.process_pending_drag")
+    def process_pending_drag(self) -> None:
+        self.drag_redraw_job = None
+        self.last_drag_redraw_time = perf_counter()
+
+        if self.selected_point and self.pending_drag_position is not None:
+            pointer_x, pointer_y = self.pending_drag_position
+
+            self.pending_drag_position = None
+
             # Calculate distance moved from last position
             dx, dy = (
-                event.x
+                pointer_x
                 - self.selected_point.point_coords[0]
                 + -1 * self.selected_point_offset[0],
-                event.y
+                pointer_y
                 - self.selected_point.point_coords[1]
                 + -1 * self.selected_point_offset[1],
             )
@@ -485,37 +882,492 @@ class MainFrame(tk.Frame):
             elif (self.selected_point.point_coords[1] + dy) > canvas_height:
                 dy = canvas_height - self.selected_point.point_coords[1]
 
-            self.canvas.move(self.selected_point.point, dx, dy)
+            if self.selected_curve is not None:
+                point_index = self.selected_curve.handles.index(self.selected_point)
+
+                new_point_coords = self.viewport.screen_to_world_point(
+                    (
+                        self.selected_point.point_coords[0] + dx,
+                        self.selected_point.point_coords[1] + dy,
+                    )
+                )
+
+                # With Shift held, the point snaps onto the nearest other curve
+                if self.pending_drag_snap:
+                    nearest = self.find_nearest_curve_point(
+                        new_point_coords, self.selected_curve
+                    )
+
+                    if nearest is not None:
+                        new_point_coords = (
+                            round(nearest[1].point[0]),
+                            round(nearest[1].point[1]),
+                        )
+
+                # Frames where the point stays put (e.g. pinned to the edge of the
+                # canvas) change nothing
+                if (
+                    tuple(self.selected_curve.points_coords[point_index])
+                    != new_point_coords
+                ):
+                    # Moves the handle as well
+                    self.selected_curve.set_point_coords(point_index, new_point_coords)
+
+                    self.dragged_point = (self.selected_curve, point_index)
+
+                    self.handle_curves_changed(self.selected_curve)
+
+                    self.selected_curve.draw(self.canvas)
+
+                    self.schedule_drag_labels_update()
 
-            self.selected_point.point_coords = (
-                self.selected_point.point_coords[0] + dx,
-                self.selected_point.point_coords[1] + dy,
+        instrumentation.end_frame()
+
+    # The equations & extrema labels are updated less often than the curve itself
+    def schedule_drag_labels_update(self) -> None:
+        if self.drag_labels_job is None:
+            delay = 1 / self.max_drag_labels_fps - (
+                perf_counter() - self.last_drag_labels_update_time
             )
 
-            self.draw_selected_curve()
+            self.drag_labels_job = self.after(
+                max(round(delay * 1000), 0), self.update_drag_labels
+            )
+
+    def update_drag_labels(self) -> None:
+        self.drag_labels_job = None
+        self.last_drag_labels_update_time = perf_counter()
+
+        self.display_curve_equations()
+
+        self.display_curve_extrema()
+
+    def handle_mouse_wheel(self, event) -> None:
+        if event.num == 4 or event.delta > 0:
+            factor = ZOOM_STEP
+        else:
+            factor = 1 / ZOOM_STEP
+
+        self.viewport.zoom_at((event.x, event.y), factor)
+
+        self.schedule_view_redraw()
+
+    def handle_pan_start(self, event) -> None:
+        self.pan_anchor = (event.x, event.y)
+
+    def handle_pan_drag(self, event) -> None:
+        if self.pan_anchor is not None:
+            self.viewport.pan(
+                event.x - self.pan_anchor[0], event.y - self.pan_anchor[1]
+            )
+
+            self.pan_anchor = (event.x, event.y)
+
+            self.schedule_view_redraw()
+
+    def handle_pan_end(self, event) -> None:
+        self.pan_anchor = None
+
+    # Zooming & panning can produce many events per frame, so they are redrawn together
+    def schedule_view_redraw(self) -> None:
+        if self.view_redraw_job is None:
+            self.view_redraw_job = self.after_idle(self.redraw_view)
+
+    def redraw_view(self) -> None:
+        self.view_redraw_job = None
+
+        self.image_manager.render_image()
+
+        for curve in self.curves:
+            curve.draw(self.canvas)
+
+        self.draw_intersection_markers()
+
+        # The curve under the pointer may be a different one now
+        self.schedule_hover_update()
+
+        instrumentation.end_frame()
+
+    # Zoom & pan so that all curves & the image are visible
+    def fit_all(self) -> None:
+        extents = []
+
+        curves_extent = get_curves_extent(
+            [curve.points_coords for curve in self.curves]
+        )
+
+        if curves_extent is not None:
+            extents.append(curves_extent)
+
+        image_extent = self.image_manager.get_image_extent()
+
+        if image_extent is not None:
+            extents.append(image_extent)
+
+        if len(extents) > 0:
+            self.viewport.fit(
+                (
+                    min(extent[0] for extent in extents),
+                    min(extent[1] for extent in extents),
+                    max(extent[2] for extent in extents),
+                    max(extent[3] for extent in extents),
+                ),
+                (self.canvas.winfo_width(), self.canvas.winfo_height()),
+            )
+
+            self.schedule_view_redraw()
+
+    def reset_view(self) -> None:
+        self.viewport.reset()
+
+        self.schedule_view_redraw()
+
+    def find_intersections(self) -> None:
+        self.clear_intersections()
+
+        # The worker gets its own copy, as the curves can be edited meanwhile
+        curves_points_coords = [list(curve.points_coords) for curve in self.curves]
+
+        self.save_info_label.config(text="Finding intersections...", fg="black")
+
+        self.task_runner.submit(
+            INTERSECTION_TASK_GROUP,
+            lambda task: find_intersections(curves_points_coords),
+            self.handle_intersections_found,
+            self.handle_intersections_error,
+        )
+
+    def handle_intersections_found(self, intersections: List[Intersection]) -> None:
+        self.intersections = intersections
+
+        self.draw_intersection_markers()
+
+        self.save_info_label.config(
+            text=f"Intersections found: {len(intersections)}", fg="green"
+        )
+
+    def handle_intersections_error(self, error: Exception) -> None:
+        self.save_info_label.config(text="Error while finding intersections!", fg="red")
+
+    def draw_intersection_markers(self) -> None:
+        self.canvas.delete(INTERSECTION_MARKER_TAG)
+
+        for intersection in self.intersections:
+            x, y = self.viewport.world_to_screen(intersection.point)
+
+            self.canvas.create_oval(
+                x - INTERSECTION_MARKER_RADIUS,
+                y - INTERSECTION_MARKER_RADIUS,
+                x + INTERSECTION_MARKER_RADIUS,
+                y + INTERSECTION_MARKER_RADIUS,
+                outline=INTERSECTION_MARKER_COLOR,
+                width=2,
+                tags=INTERSECTION_MARKER_TAG,
+            )
+
+    # The bounding boxes of the curves are updated only for the changed curve if it's
+    # known, otherwise they are rebuilt when they are needed next
+    def handle_curves_changed(self, changed_curve: BezierCurve | None = None) -> None:
+        if changed_curve is not None and self.curves_bounding_boxes is not None:
+            self.curves_bounding_boxes[
+                self.curves.index(changed_curve)
+            ] = changed_curve.geometry.get_bounding_box()
+        else:
+            self.curves_bounding_boxes = None
+
+        self.clear_intersections()
+
+    def handle_motion(self, event) -> None:
+        self.hover_position = (event.x, event.y)
+
+        self.schedule_hover_update()
+
+    def schedule_hover_update(self) -> None:
+        if self.hover_job is None and self.hover_position is not None:
+            self.hover_job = self.after_idle(self.update_hover)
+
+    def update_hover(self) -> None:
+        self.hover_job = None
+
+        self.canvas.delete(HOVER_MARKER_TAG)
+
+        if self.hover_position is None:
+            return
+
+        nearest = self.find_nearest_curve_point(
+            self.viewport.screen_to_world(self.hover_position)
+        )
+
+        if nearest is None:
+            self.hover_info_label.config(text="")
+
+            return
+
+        curve_index, projection = nearest
+
+        x, y = self.viewport.world_to_screen(projection.point)
+
+        self.canvas.create_oval(
+            x - HOVER_MARKER_RADIUS,
+            y - HOVER_MARKER_RADIUS,
+            x + HOVER_MARKER_RADIUS,
+            y + HOVER_MARKER_RADIUS,
+            fill=HOVER_MARKER_COLOR,
+            outline=HOVER_MARKER_COLOR,
+            tags=HOVER_MARKER_TAG,
+        )
+
+        self.hover_info_label.config(
+            text=f"{self.curves[curve_index].name}\n"
+            f"t = {projection.t:.4f}\n"
+            f"({projection.point[0]:.1f}, {projection.point[1]:.1f})"
+        )
+
+    def clear_hover(self) -> None:
+        self.hover_position = None
+
+        self.canvas.delete(HOVER_MARKER_TAG)
+
+        self.hover_info_label.config(text="")
+
+    # Index of the curve closest to the world point & the nearest point on it, if it's
+    # within HOVER_DISTANCE screen pixels. Only curves whose bounding boxes are close
+    # enough are projected on.
+    def find_nearest_curve_point(
+        self,
+        world_point: Tuple[float, float],
+        excluded_curve: BezierCurve | None = None,
+    ) -> Tuple[int, CurveProjection] | None:
+        if len(self.curves) == 0:
+            return None
+
+        if self.curves_bounding_boxes is None:
+            self.curves_bounding_boxes = get_bounding_boxes(
+                [curve.points_coords for curve in self.curves]
+            )
+
+        max_distance = HOVER_DISTANCE / self.viewport.zoom
+
+        # The bounding boxes are rounded, hence the extra pixel
+        curve_indices = [
+            curve_index
+            for curve_index in get_curves_near_point(
+                self.curves_bounding_boxes, world_point, max_distance + 1
+            )
+            if self.curves[curve_index] is not excluded_curve
+        ]
+
+        if len(curve_indices) == 0:
+            return None
+
+        # All the candidates are projected on at once
+        projections = get_nearest_points(
+            [self.curves[curve_index].points_coords for curve_index in curve_indices],
+            [world_point],
+        )
+
+        nearest = int(projections.distances[:, 0].argmin())
+
+        if projections.distances[nearest, 0] > max_distance:
+            return None
+
+        return (
+            curve_indices[nearest],
+            CurveProjection(
+                float(projections.t[nearest, 0]),
+                (
+                    float(projections.points[nearest, 0, 0]),
+                    float(projections.points[nearest, 0, 1]),
+                ),
+                float(projections.distances[nearest, 0]),
+            ),
+        )
+
+    def toggle_timings_recording(self) -> None:
+        if self.record_timings_var.get():
+            instrumentation.enable()
+        else:
+            instrumentation.disable()
+
+    def toggle_performance_overlay(self) -> None:
+        if self.show_performance_overlay_var.get():
+            if self.performance_overlay_job is None:
+                self.update_performance_overlay()
+        else:
+            if self.performance_overlay_job is not None:
+                self.after_cancel(self.performance_overlay_job)
+
+                self.performance_overlay_job = None
+
+            self.canvas.delete(PERFORMANCE_OVERLAY_TAG)
+
+    # The overlay is a single text item that is kept & only updated, so that it doesn't
+    # show up in the counts of the canvas items of the frames
+    def update_performance_overlay(self) -> None:
+        text = "\n".join(instrumentation.get_summary_lines())
+
+        if len(self.canvas.find_withtag(PERFORMANCE_OVERLAY_TAG)) > 0:
+            self.canvas.itemconfig(PERFORMANCE_OVERLAY_TAG, text=text)
+        else:
+            self.canvas.create_text(
+                self.widget_padding,
+                self.widget_padding,
+                text=text,
+                anchor=tk.NW,
+                fill=PERFORMANCE_OVERLAY_COLOR,
+                font=("Courier", 9),
+                tags=PERFORMANCE_OVERLAY_TAG,
+            )
+
+        self.canvas.tag_raise(PERFORMANCE_OVERLAY_TAG)
+
+        self.performance_overlay_job = self.after(
+            PERFORMANCE_OVERLAY_INTERVAL_MS, self.update_performance_overlay
+        )
+
+    def export_timings(self) -> None:
+        filename = filedialog.asksaveasfilename(
+            title="Export Timings",
+            initialdir=root_path,
+            defaultextension=".json",
+            filetypes=(("JSON files", "*.json"),),
+        )
+
+        if not filename:
+            return
+
+        try:
+            instrumentation.export(filename)
+        except OSError:
+            self.save_info_label.config(text="Error while exporting timings!", fg="red")
+        else:
+            self.save_info_label.config(
+                text="Timings exported successfully!", fg="green"
+            )
+
+    # Found intersections are outdated once a curve changes, as is a running search
+    def clear_intersections(self) -> None:
+        self.task_runner.cancel(INTERSECTION_TASK_GROUP)
+
+        if len(self.intersections) > 0:
+            self.intersections = []
+
+            self.canvas.delete(INTERSECTION_MARKER_TAG)
+
+    def toggle_auto_fit_mode(self) -> None:
+        self.auto_fit_mode = not self.auto_fit_mode
+
+        self.auto_fit_button.config(
+            relief=tk.SUNKEN if self.auto_fit_mode else tk.RAISED
+        )
+
+        self.selected_point = None
+
+        self.clear_auto_fit_stroke()
+
+    def start_auto_fit_stroke(self, event) -> None:
+        self.clear_auto_fit_stroke()
+
+        self.auto_fit_stroke = [(event.x, event.y)]
+
+    def extend_auto_fit_stroke(self, event) -> None:
+        if len(self.auto_fit_stroke) == 0:
+            return
+
+        self.auto_fit_stroke.append((event.x, event.y))
+
+        flat_stroke = [coord for point in self.auto_fit_stroke for coord in point]
+
+        if self.auto_fit_stroke_line is None:
+            self.auto_fit_stroke_line = self.canvas.create_line(
+                flat_stroke,
+                fill=AUTO_FIT_STROKE_COLOR,
+                width=2,
+                dash=(2, 2),
+                tags=AUTO_FIT_STROKE_TAG,
+            )
+        else:
+            self.canvas.coords(self.auto_fit_stroke_line, flat_stroke)
+
+    def clear_auto_fit_stroke(self) -> None:
+        self.auto_fit_stroke = []
+
+        if self.auto_fit_stroke_line is not None:
+            self.canvas.delete(self.auto_fit_stroke_line)
+
+            self.auto_fit_stroke_line = None
+
+    def finish_auto_fit_stroke(self) -> None:
+        stroke = self.auto_fit_stroke
+
+        self.clear_auto_fit_stroke()
+
+        if len(stroke) < 2:
+            return
+
+        displayed_image = self.image_manager.get_displayed_image()
+
+        if displayed_image is None:
+            self.save_info_label.config(text="Import an image to auto-fit")
+
+            return
+
+        image, (image_x, image_y) = displayed_image
+
+        world_stroke = [self.viewport.screen_to_world(point) for point in stroke]
+
+        # The fitting works in the image's pixels, which are offset in the world
+        fit_result = fit_curve_to_stroke(
+            image, [(x - image_x, y - image_y) for x, y in world_stroke]
+        )
+
+        if fit_result is None:
+            self.save_info_label.config(text="No edges found under the stroke")
+
+            return
+
+        points = get_fitted_points_coords(fit_result, (image_x, image_y))
+
+        self.new_curve(len(points), points)
+
+        self.select_curve(len(self.curves) - 1)
 
     # Define functions for setting certain colors
     def change_curve_color(self, new_color: str) -> None:
         if self.selected_curve is not None:
             self.selected_curve.change_curve_color(self.canvas, new_color)
+            self.record_selected_curve_attributes()
 
     def change_endpoints_color(self, new_color) -> None:
         if self.selected_curve is not None:
             self.selected_curve.change_endpoints_color(self.canvas, new_color)
+            self.record_selected_curve_attributes()
 
     def change_control_points_color(self, new_color) -> None:
         if self.selected_curve is not None:
             self.selected_curve.change_control_points_color(self.canvas, new_color)
+            self.record_selected_curve_attributes()
 
     def change_x_extremum_points_color(self, new_color) -> None:
         if self.selected_curve is not None:
             self.selected_curve.x_extremum_points_color = new_color
             self.selected_curve.draw(self.canvas)
+            self.record_selected_curve_attributes()
 
     def change_y_extremum_points_color(self, new_color) -> None:
         if self.selected_curve is not None:
             self.selected_curve.y_extremum_points_color = new_color
             self.selected_curve.draw(self.canvas)
+            self.record_selected_curve_attributes()
+
+    def record_selected_curve_attributes(self) -> None:
+        if self.selected_curve is not None:
+            self.edit_journal.record(
+                set_attributes_record(
+                    self.curves.index(self.selected_curve),
+                    self.selected_curve.get_attributes(),
+                )
+            )
 
     def update_equation_texts(self, new_text: Tuple[str, str] | None) -> None:
         # Make the texts accesible for the program
@@ -631,22 +1483,24 @@ class MainFrame(tk.Frame):
     def reset_points(self) -> None:
         if self.selected_curve is not None:
             new_points_pos = get_points_default_pos(
-                len(self.selected_curve.points),
+                len(self.selected_curve.points_coords),
                 self.canvas.winfo_width(),
                 self.canvas.winfo_height(),
             )
 
-            for i in range(len(self.selected_curve.points)):
-                dx, dy = (
-                    new_points_pos[i][0]
-                    - self.selected_curve.points[i].point_coords[0],
-                    new_points_pos[i][1]
-                    - self.selected_curve.points[i].point_coords[1],
+            for i in range(len(new_points_pos)):
+                self.selected_curve.set_point_coords(
+                    i, self.viewport.screen_to_world_point(new_points_pos[i])
                 )
 
-                self.canvas.move(self.selected_curve.points[i].point, dx, dy)
+            self.edit_journal.record(
+                set_points_record(
+                    self.curves.index(self.selected_curve),
+                    self.selected_curve.points_coords,
+                )
+            )
 
-                self.selected_curve.points[i].point_coords = new_points_pos[i]
+            self.handle_curves_changed(self.selected_curve)
 
             self.draw_selected_curve()
 
@@ -659,6 +1513,8 @@ class MainFrame(tk.Frame):
 
             self.selected_curve.draw(self.canvas)
 
+            self.record_selected_curve_attributes()
+
     def toggle_extremum_points_showing(self) -> None:
         if self.selected_curve is not None:
             self.selected_curve.extremum_points_visible = bool(
@@ -667,6 +1523,8 @@ class MainFrame(tk.Frame):
 
             self.selected_curve.draw(self.canvas)
 
+            self.record_selected_curve_attributes()
+
     def toggle_bounding_box_showing(self) -> None:
         if self.selected_curve is not None:
             self.selected_curve.bounding_box_visible = bool(
@@ -675,15 +1533,101 @@ class MainFrame(tk.Frame):
 
             self.selected_curve.draw(self.canvas)
 
+            self.record_selected_curve_attributes()
+
+    def import_image(self) -> None:
+        previous_image_filename = self.image_manager.get_active_image_filename()
+
+        self.image_manager.import_image()
+
+        if self.image_manager.get_active_image_filename() != previous_image_filename:
+            self.edit_journal.record(
+                set_image_record(self.image_manager.get_active_image_filename())
+            )
+
+    def remove_image(self) -> None:
+        if self.image_manager.get_active_image_filename() is not None:
+            self.image_manager.remove_image()
+
+            self.edit_journal.record(set_image_record(None))
+
     def remove_everything(self):
         self.image_manager.remove_image()
 
-        self.selected_curve = None
+        # Loaded projects are placed into the world as if nothing was zoomed
+        self.reset_view()
+
+        self.remove_all_curves()
+
+    # Cancels loading of a project & of an image that isn't shown yet
+    def cancel_loading(self) -> None:
+        image_filename = self.image_manager.get_active_image_filename()
+
+        project_cancelled = self.task_runner.cancel(LOAD_TASK_GROUP)
+        image_cancelled = self.image_manager.cancel_loading()
+
+        if image_filename != self.image_manager.get_active_image_filename():
+            self.edit_journal.record(set_image_record(None))
+
+        if project_cancelled or image_cancelled:
+            self.save_info_label.config(text="Loading cancelled!", fg="orange")
+        else:
+            self.save_info_label.config(text="Nothing is loading!", fg="orange")
+
+    def get_project_data(self) -> ProjectData:
+        return create_project_data(
+            self.project_name,
+            self.image_manager.get_active_image_filename(),
+            [
+                CurveData(curve.points_coords, curve.get_attributes())
+                for curve in self.curves
+            ],
+        )
 
-        for i in range(len(self.curves)):
-            self.curves_listbox.selection_set(tk.END)
+    # Replaces everything with the project, which also becomes the journal's new base
+    def open_project(self, project: ProjectData, curves_data: List[CurveData]) -> None:
+        self.journal_paused = True
 
-            self.delete_selected_curve()
+        try:
+            self.remove_everything()
+
+            if project.image_filename is not None:
+                self.image_manager.display_new_image(project.image_filename)
+
+            self.add_curves(curves_data)
+        finally:
+            self.journal_paused = False
+
+        self.project_name = project.name
+
+        self.edit_journal.compact(project)
+
+    def open_recovered_project(self, project: ProjectData) -> None:
+        # The image is fitted to the canvas, so its size has to be known
+        self.canvas.update_idletasks()
+
+        try:
+            self.open_project(project, get_curves_data(project))
+        except:
+            self.save_info_label.config(
+                text="Error while recovering changes!", fg="red"
+            )
+        else:
+            self.save_info_label.config(text="Unsaved changes recovered!", fg="green")
+
+    # Replaces the journal with a snapshot of the current state once it grows large,
+    # so that it doesn't take long to replay
+    def compact_edit_journal(self) -> None:
+        if self.edit_journal.needs_compaction():
+            self.edit_journal.compact(self.get_project_data())
+
+        self.after(JOURNAL_COMPACTION_INTERVAL_MS, self.compact_edit_journal)
+
+    # Closed cleanly, so there is nothing to recover on the next start
+    def close(self) -> None:
+        self.task_runner.shutdown()
+
+        self.edit_journal.close()
 
     def grid_widgets(self) -> None:
         # MAIN GRID
@@ -717,6 +1661,7 @@ class MainFrame(tk.Frame):
         self.image_options_frame.grid(
             column=0, row=1, sticky=tk.S, pady=self.widget_padding
         )
+        self.view_options_frame.grid(column=0, row=2, sticky=tk.S)
         self.curves_management_frame.grid(column=0, row=0, sticky=tk.N)
 
         # Canvas frame grid
@@ -737,8 +1682,11 @@ class MainFrame(tk.Frame):
         self.new_linear_button.grid(column=0, row=1, pady=self.widget_padding)
         self.new_quadratic_button.grid(column=0, row=2)
         self.new_cubic_button.grid(column=0, row=3, pady=self.widget_padding)
-        self.delete_curve_button.grid(column=0, row=4)
-        self.reset_points_button.grid(column=0, row=5, pady=self.widget_padding)
+        self.higher_degree_frame.grid(column=0, row=4)
+        self.new_higher_degree_button.grid(column=0, row=0)
+        self.higher_degree_spinbox.grid(column=1, row=0, padx=(self.widget_padding, 0))
+        self.delete_curve_button.grid(column=0, row=5, pady=self.widget_padding)
+        self.reset_points_button.grid(column=0, row=6)
 
         self.curve_color_changer.label.grid(
             column=0,
@@ -790,24 +1738,43 @@ class MainFrame(tk.Frame):
         # Left panel frame grid
         left_panel_padding = (2 * self.widget_padding, self.widget_padding)
 
-        self.projects_listbox.grid(column=0, row=0, pady=self.widget_padding)
-        self.save_project_button.grid(column=0, row=1)
+        self.search_projects_label.grid(
+            column=0,
+            row=0,
+            padx=left_panel_padding,
+            pady=self.widget_padding,
+            sticky=tk.W,
+        )
+        self.search_projects_entry.grid(column=0, row=1)
+        self.projects_listbox.grid(column=0, row=2, pady=self.widget_padding)
+        self.save_project_button.grid(column=0, row=3)
         self.save_as_label.grid(
             column=0,
-            row=2,
+            row=4,
             padx=left_panel_padding,
             pady=self.widget_padding,
             sticky=tk.W,
         )
-        self.save_as_entry.grid(column=0, row=3)
-        self.save_info_label.grid(column=0, row=4, pady=self.widget_padding)
-        self.load_project_button.grid(column=0, row=5)
-        self.delete_project_button.grid(column=0, row=6, pady=self.widget_padding)
+        self.save_as_entry.grid(column=0, row=5)
+        self.save_info_label.grid(column=0, row=6, pady=self.widget_padding)
+        self.load_project_button.grid(column=0, row=7)
+        self.delete_project_button.grid(column=0, row=8, pady=self.widget_padding)
+        self.cancel_loading_button.grid(column=0, row=9)
+        self.export_svg_button.grid(column=0, row=10, pady=self.widget_padding)
 
         self.import_image_button.grid(
             column=0, row=0, padx=self.widget_padding, pady=self.widget_padding
         )
         self.remove_image_button.grid(column=0, row=1)
+        self.auto_fit_button.grid(column=0, row=2, pady=self.widget_padding)
+
+        self.fit_all_button.grid(column=0, row=0)
+        self.reset_view_button.grid(column=0, row=1, pady=self.widget_padding)
+        self.find_intersections_button.grid(column=0, row=2)
+        self.hover_info_label.grid(column=0, row=3, pady=self.widget_padding)
+        self.record_timings_checkbutton.grid(column=0, row=4, sticky=tk.W)
+        self.show_performance_overlay_checkbutton.grid(column=0, row=5, sticky=tk.W)
+        self.export_timings_button.grid(column=0, row=6, pady=self.widget_padding)
 
         # Configure weights
 
@@ -833,7 +1800,7 @@ class MainFrame(tk.Frame):
         self.left_panel_frame.grid_rowconfigure(0, weight=1)
         self.left_panel_frame.grid_rowconfigure(1, weight=1)
 
-        self.saving_management_frame.grid_rowconfigure(0, weight=1)
+        self.saving_management_frame.grid_rowconfigure(2, weight=1)
 
         self.right_panel_frame.grid_rowconfigure(0, weight=1)
         self.right_panel_frame.grid_rowconfigure(1, weight=1)
@@ -849,13 +1816,19 @@ class App(tk.Tk):
         self.wm_state("zoomed")
         self.create_widgets()
 
+        self.protocol("WM_DELETE_WINDOW", self.handle_close)
+
     def create_widgets(self) -> None:
-        frame = MainFrame(self)
-        frame.grid_widgets()
-        frame.grid(column=0, row=0, sticky=tk.NSEW)
+        self.main_frame = MainFrame(self)
+        self.main_frame.grid_widgets()
+        self.main_frame.grid(column=0, row=0, sticky=tk.NSEW)
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(0, weight=1)
 
+    def handle_close(self) -> None:
+        self.main_frame.close()
+        self.destroy()
+
 
 if __name__ == "__main__":
     app = App()
@@ -0,0 +1,188 @@
+from bisect import bisect_left
+from json import JSONDecodeError, dump, load
+from os import listdir, path as os_path, stat
+from typing import Dict, List, NamedTuple
+from project_format import (
+    PROJECT_EXTENSION,
+    LEGACY_PROJECT_EXTENSION,
+    read_project_summary,
+)
+
+
+CATALOG_FILENAME = "catalog.json"
+
+CATALOG_VERSION: int = 1
+
+
+class CatalogEntry(NamedTuple):
+    name: str
+    filename: str  # Relative to the saves directory
+    curve_count: int
+    image_filename: str | None
+    size: int
+    modified_time: float
+
+
+# Index of the saves directory, so that the projects don't have to be listed & opened
+# on every start. It's updated on every save & delete made through it. The catalog is
+# written in place after the project files, so if the directory was modified later than
+# the catalog, something else changed it & the catalog is rebuilt by scanning.
+class ProjectCatalog:
+    def __init__(self, saves_path: str) -> None:
+        self.saves_path = saves_path
+        self.catalog_filename = os_path.join(saves_path, CATALOG_FILENAME)
+
+        self.entries: Dict[str, CatalogEntry] = {}
+        # Sorted, for prefix search
+        self.names: List[str] = []
+
+        self.loaded: bool = False
+
+    def ensure_loaded(self) -> None:
+        if not self.loaded:
+            if not self.read():
+                self.rebuild()
+
+            self.loaded = True
+
+    # Returns whether the catalog on disk could be used
+    def read(self) -> bool:
+        try:
+            if (
+                stat(self.catalog_filename).st_mtime_ns
+                < stat(self.saves_path).st_mtime_ns
+            ):
+                return False
+
+            with open(self.catalog_filename, "r") as f:
+                data = load(f)
+
+            if data["version"] != CATALOG_VERSION:
+                return False
+
+            entries = [CatalogEntry(*entry) for entry in data["entries"]]
+        except (OSError, JSONDecodeError, KeyError, TypeError):
+            return False
+
+        self.set_entries(entries)
+
+        return True
+
+    def rebuild(self) -> None:
+        entries: Dict[str, CatalogEntry] = {}
+
+        for filename in listdir(self.saves_path):
+            name, extension = os_path.splitext(filename)
+
+            if extension not in (PROJECT_EXTENSION, LEGACY_PROJECT_EXTENSION):
+                continue
+
+            # If a project was saved in both formats, the binary one is used
+            if name in entries and extension == LEGACY_PROJECT_EXTENSION:
+                continue
+
+            entry = self.create_entry(name, filename)
+
+            if entry is not None:
+                entries[name] = entry
+
+        self.set_entries(list(entries.values()))
+
+        self.write()
+
+    def write(self) -> None:
+        try:
+            with open(self.catalog_filename, "w") as f:
+                dump(
+                    {
+                        "version": CATALOG_VERSION,
+                        "entries": [list(self.entries[name]) for name in self.names],
+                    },
+                    f,
+                )
+        except OSError:
+            # Without the catalog, the directory is simply scanned next time
+            pass
+
+    def set_entries(self, entries: List[CatalogEntry]) -> None:
+        self.entries = {entry.name: entry for entry in entries}
+        self.names = sorted(self.entries)
+
+    def create_entry(self, name: str, filename: str) -> CatalogEntry | None:
+        full_filename = os_path.join(self.saves_path, filename)
+
+        try:
+            summary = read_project_summary(full_filename)
+            file_stat = stat(full_filename)
+        except (OSError, ValueError, UnicodeDecodeError):
+            return None
+
+        return CatalogEntry(
+            name=name,
+            filename=filename,
+            curve_count=summary.curve_count,
+            image_filename=summary.image_filename,
+            size=file_stat.st_size,
+            modified_time=file_stat.st_mtime,
+        )
+
+    def get_names(self) -> List[str]:
+        self.ensure_loaded()
+
+        return self.names
+
+    def contains(self, name: str) -> bool:
+        self.ensure_loaded()
+
+        return name in self.entries
+
+    def get_entry(self, name: str) -> CatalogEntry | None:
+        self.ensure_loaded()
+
+        return self.entries.get(name)
+
+    def get_project_filename(self, name: str) -> str | None:
+        entry = self.get_entry(name)
+
+        if entry is None:
+            return None
+
+        return os_path.join(self.saves_path, entry.filename)
+
+    def find_by_prefix(self, prefix: str) -> List[str]:
+        self.ensure_loaded()
+
+        start = bisect_left(self.names, prefix)
+        end = start
+
+        while end < len(self.names) and self.names[end].startswith(prefix):
+            end += 1
+
+        return self.names[start:end]
+
+    # Call after the project file was written
+    def add_project(self, name: str, filename: str) -> None:
+        self.ensure_loaded()
+
+        entry = self.create_entry(name, os_path.basename(filename))
+
+        if entry is None:
+            return
+
+        if name not in self.entries:
+            self.names.insert(bisect_left(self.names, name), name)
+
+        self.entries[name] = entry
+
+        self.write()
+
+    # Call after the project file was deleted
+    def remove_project(self, name: str) -> None:
+        self.ensure_loaded()
+
+        if self.entries.pop(name, None) is None:
+            return
+
+        self.names.pop(bisect_left(self.names, name))
+
+        self.write()
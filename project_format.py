@@ -0,0 +1,400 @@
+from mmap import mmap, ACCESS_READ
+from struct import Struct, error as StructError
+from functools import lru_cache
+from typing import List, NamedTuple, Sequence, Tuple
+from zlib import compress, decompress, decompressobj
+import numpy as np
+
+
+# .bzp files start with a fixed header:
+# magic, version, flags, amount of curves, amount of points, size of the strings block
+# followed by (possibly zlib compressed):
+# strings block (project name & image path, each prefixed by its length), padded to 4 bytes,
+# one attributes record per curve & the coordinates of all points as pairs of int32
+PROJECT_EXTENSION = ".bzp"
+
+LEGACY_PROJECT_EXTENSION = ".txt"
+
+PROJECT_MAGIC = b"BZVP"
+
+PROJECT_FORMAT_VERSION: int = 1
+
+COMPRESSED_FLAG: int = 1
+
+# Compression makes the files smaller, but loading can't use the memory map directly
+DEFAULT_COMPRESSION: bool = False
+
+COMPRESSION_LEVEL: int = 6
+
+# Projects use only a few distinct colors, so their conversions are cached
+COLOR_CACHE_SIZE: int = 256
+
+HEADER = Struct("<4sHHIII")
+
+STRING_LENGTH = Struct("<I")
+
+DASHED_LINE_VISIBLE_FLAG: int = 1
+EXTREMUM_POINTS_VISIBLE_FLAG: int = 2
+BOUNDING_BOX_VISIBLE_FLAG: int = 4
+# The curve has the default attributes (e.g. it comes from a legacy save)
+DEFAULT_ATTRIBUTES_FLAG: int = 8
+
+CURVE_RECORD_DTYPE = np.dtype(
+    [
+        ("point_amount", "<u4"),
+        ("width", "<u2"),
+        ("flags", "u1"),
+        ("padding", "u1"),
+        # Curve, endpoints, control points, X extremum & Y extremum color as 0xRRGGBB
+        ("colors", "<u4", (5,)),
+    ]
+)
+
+COORDS_DTYPE = np.dtype("<i4")
+
+InvalidProjectFileError: ValueError = ValueError("Invalid Project File")
+
+
+class CurveAttributes(NamedTuple):
+    width: int
+    color: str
+    endpoints_color: str
+    control_points_color: str
+    x_extremum_points_color: str
+    y_extremum_points_color: str
+    dashed_line_visible: bool
+    extremum_points_visible: bool
+    bounding_box_visible: bool
+
+
+class CurveData(NamedTuple):
+    points_coords: List[Tuple[int, int]]
+    attributes: CurveAttributes | None  # None for the defaults
+
+
+class ProjectSummary(NamedTuple):
+    name: str
+    image_filename: str | None
+    curve_count: int
+
+
+# Columnar, so that whole projects are read & written without touching every curve
+class ProjectData(NamedTuple):
+    name: str
+    image_filename: str | None
+    records: np.ndarray  # One CURVE_RECORD_DTYPE record per curve
+    coords: np.ndarray  # Points of all curves one after another, shape (amount, 2)
+
+    @property
+    def curve_count(self) -> int:
+        return len(self.records)
+
+
+@lru_cache(maxsize=COLOR_CACHE_SIZE)
+def color_to_int(color: str) -> int:
+    return int(color.lstrip("#"), 16)
+
+
+@lru_cache(maxsize=COLOR_CACHE_SIZE)
+def int_to_color(value: int) -> str:
+    return f"#{value:06x}"
+
+
+def pad_to_4_bytes(size: int) -> int:
+    return (size + 3) // 4 * 4
+
+
+def encode_strings(*strings: str) -> bytes:
+    encoded = b""
+
+    for string in strings:
+        string_bytes = string.encode("utf-8")
+
+        encoded += STRING_LENGTH.pack(len(string_bytes)) + string_bytes
+
+    return encoded
+
+
+def decode_strings(buffer: bytes, amount: int) -> List[str]:
+    strings: List[str] = []
+
+    position = 0
+
+    for _ in range(amount):
+        (length,) = STRING_LENGTH.unpack_from(buffer, position)
+
+        position += STRING_LENGTH.size
+
+        strings.append(bytes(buffer[position : position + length]).decode("utf-8"))
+
+        position += length
+
+    return strings
+
+
+def create_project_data(
+    name: str, image_filename: str | None, curves: Sequence[CurveData]
+) -> ProjectData:
+    records: List[tuple] = []
+
+    for curve in curves:
+        attributes = curve.attributes
+
+        if attributes is None:
+            records.append(
+                (len(curve.points_coords), 0, DEFAULT_ATTRIBUTES_FLAG, 0, (0,) * 5)
+            )
+        else:
+            records.append(
+                (
+                    len(curve.points_coords),
+                    attributes.width,
+                    DASHED_LINE_VISIBLE_FLAG * attributes.dashed_line_visible
+                    | EXTREMUM_POINTS_VISIBLE_FLAG * attributes.extremum_points_visible
+                    | BOUNDING_BOX_VISIBLE_FLAG * attributes.bounding_box_visible,
+                    0,
+                    tuple(color_to_int(color) for color in attributes[1:6]),
+                )
+            )
+
+    coords = np.fromiter(
+        (
+            coord
+            for curve in curves
+            for point_coords in curve.points_coords
+            for coord in point_coords
+        ),
+        dtype=COORDS_DTYPE,
+    ).reshape(-1, 2)
+
+    return ProjectData(
+        name, image_filename, np.array(records, dtype=CURVE_RECORD_DTYPE), coords
+    )
+
+
+# Offsets of every curve's first point in coords, plus the total amount of points
+def get_curve_offsets(project: ProjectData) -> np.ndarray:
+    offsets = np.zeros(project.curve_count + 1, dtype=np.int64)
+
+    np.cumsum(project.records["point_amount"], out=offsets[1:])
+
+    return offsets
+
+
+def get_curves_points_coords(project: ProjectData) -> List[List[Tuple[int, int]]]:
+    # Converting whole columns at once is much faster than going point by point
+    all_points = list(zip(project.coords[:, 0].tolist(), project.coords[:, 1].tolist()))
+
+    offsets = get_curve_offsets(project).tolist()
+
+    return [all_points[offsets[i] : offsets[i + 1]] for i in range(project.curve_count)]
+
+
+def get_curves_attributes(project: ProjectData) -> List[CurveAttributes | None]:
+    # Most curves share their attributes, so every distinct record is converted only once
+    distinct_records, indices = np.unique(
+        project.records[["width", "flags", "colors"]], return_inverse=True
+    )
+
+    distinct_attributes: List[CurveAttributes | None] = []
+
+    for width, flags, colors in distinct_records.tolist():
+        if flags & DEFAULT_ATTRIBUTES_FLAG:
+            distinct_attributes.append(None)
+        else:
+            distinct_attributes.append(
+                CurveAttributes(
+                    width,
+                    *[int_to_color(color) for color in colors],
+                    bool(flags & DASHED_LINE_VISIBLE_FLAG),
+                    bool(flags & EXTREMUM_POINTS_VISIBLE_FLAG),
+                    bool(flags & BOUNDING_BOX_VISIBLE_FLAG),
+                )
+            )
+
+    return [distinct_attributes[i] for i in indices.tolist()]
+
+
+def get_curves_data(project: ProjectData) -> List[CurveData]:
+    return [
+        CurveData(points_coords, attributes)
+        for points_coords, attributes in zip(
+            get_curves_points_coords(project), get_curves_attributes(project)
+        )
+    ]
+
+
+def write_project(
+    filename: str, project: ProjectData, compressed: bool = DEFAULT_COMPRESSION
+) -> None:
+    strings = encode_strings(project.name, project.image_filename or "")
+
+    payload = b"".join(
+        [
+            strings,
+            bytes(pad_to_4_bytes(len(strings)) - len(strings)),
+            np.ascontiguousarray(project.records, dtype=CURVE_RECORD_DTYPE).tobytes(),
+            np.ascontiguousarray(project.coords, dtype=COORDS_DTYPE).tobytes(),
+        ]
+    )
+
+    flags = 0
+
+    if compressed:
+        payload = compress(payload, COMPRESSION_LEVEL)
+        flags |= COMPRESSED_FLAG
+
+    header = HEADER.pack(
+        PROJECT_MAGIC,
+        PROJECT_FORMAT_VERSION,
+        flags,
+        project.curve_count,
+        len(project.coords),
+        len(strings),
+    )
+
+    with open(filename, "wb") as f:
+        f.write(header)
+        f.write(payload)
+
+
+def read_project(filename: str) -> ProjectData:
+    with open(filename, "rb") as f:
+        try:
+            mapped = mmap(f.fileno(), 0, access=ACCESS_READ)
+        except ValueError:  # Empty files can't be mapped
+            raise InvalidProjectFileError
+
+        with mapped:
+            if len(mapped) < HEADER.size:
+                raise InvalidProjectFileError
+
+            (
+                magic,
+                version,
+                flags,
+                curve_count,
+                point_count,
+                strings_size,
+            ) = HEADER.unpack_from(mapped, 0)
+
+            if magic != PROJECT_MAGIC or version > PROJECT_FORMAT_VERSION:
+                raise InvalidProjectFileError
+
+            # Uncompressed files are read straight from the mapped memory
+            if flags & COMPRESSED_FLAG:
+                payload = memoryview(decompress(mapped[HEADER.size :]))
+            else:
+                payload = memoryview(mapped)[HEADER.size :]
+
+            try:
+                return parse_payload(payload, curve_count, point_count, strings_size)
+            finally:
+                # The map can only be closed once nothing points into it
+                payload.release()
+
+
+def parse_payload(
+    payload: memoryview, curve_count: int, point_count: int, strings_size: int
+) -> ProjectData:
+    records_offset = pad_to_4_bytes(strings_size)
+    coords_offset = records_offset + curve_count * CURVE_RECORD_DTYPE.itemsize
+
+    if len(payload) < coords_offset + point_count * 2 * COORDS_DTYPE.itemsize:
+        raise InvalidProjectFileError
+
+    # Decoded from a copy, a slice of the payload kept alive by the traceback of a
+    # failed decoding would keep the file from being closed
+    try:
+        name, image_filename = decode_strings(bytes(payload[:strings_size]), 2)
+    except (UnicodeDecodeError, StructError) as error:
+        raise InvalidProjectFileError from error
+
+    # Copied out of the payload, so that the file can be closed
+    records = np.frombuffer(
+        payload, dtype=CURVE_RECORD_DTYPE, count=curve_count, offset=records_offset
+    ).copy()
+    coords = (
+        np.frombuffer(
+            payload, dtype=COORDS_DTYPE, count=point_count * 2, offset=coords_offset
+        )
+        .reshape(point_count, 2)
+        .copy()
+    )
+
+    if int(records["point_amount"].sum()) != point_count:
+        raise InvalidProjectFileError
+
+    return ProjectData(name, image_filename or None, records, coords)
+
+
+# Old saves are text files: the project name, the image path (or an empty line) &
+# one "x,y;x,y;..." line per curve. They don't hold any attributes, so the curves get
+# the default ones.
+def read_legacy_project(filename: str) -> ProjectData:
+    with open(filename, "r") as f:
+        lines = [line.strip() for line in f.read().splitlines()]
+
+    if len(lines) < 2:
+        raise InvalidProjectFileError
+
+    curves: List[CurveData] = []
+
+    for point_seq in lines[2:]:
+        if len(point_seq) == 0:
+            continue
+
+        points: List[Tuple[int, int]] = []
+
+        for point in point_seq.split(";"):
+            x, y = point.split(",")
+
+            points.append((int(x), int(y)))
+
+        curves.append(CurveData(points, None))
+
+    return create_project_data(lines[0], lines[1] or None, curves)
+
+
+def read_any_project(filename: str) -> ProjectData:
+    if filename.endswith(LEGACY_PROJECT_EXTENSION):
+        return read_legacy_project(filename)
+
+    return read_project(filename)
+
+
+# Reads only what's needed to describe the project, without its curves
+def read_project_summary(filename: str) -> ProjectSummary:
+    if filename.endswith(LEGACY_PROJECT_EXTENSION):
+        with open(filename, "r") as f:
+            lines = f.read().splitlines()
+
+        if len(lines) < 2:
+            raise InvalidProjectFileError
+
+        curve_count = sum(1 for line in lines[2:] if len(line.strip()) > 0)
+
+        return ProjectSummary(lines[0].strip(), lines[1].strip() or None, curve_count)
+
+    with open(filename, "rb") as f:
+        header = f.read(HEADER.size)
+
+        if len(header) < HEADER.size:
+            raise InvalidProjectFileError
+
+        magic, version, flags, curve_count, _, strings_size = HEADER.unpack(header)
+
+        if magic != PROJECT_MAGIC or version > PROJECT_FORMAT_VERSION:
+            raise InvalidProjectFileError
+
+        if flags & COMPRESSED_FLAG:
+            strings = decompressobj().decompress(f.read(), strings_size)
+        else:
+            strings = f.read(strings_size)
+
+    if len(strings) < strings_size:
+        raise InvalidProjectFileError
+
+    name, image_filename = decode_strings(strings, 2)
+
+    return ProjectSummary(name, image_filename or None, curve_count)
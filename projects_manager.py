@@ -1,10 +1,57 @@
 from ROOT_PATH import root_path
 from pathlib import Path
-from os import remove, listdir, path as os_path
-from tkinter import Listbox, Entry, Label, END
-from typing import List, Callable
+from os import remove, replace, path as os_path
+from tkinter import Listbox, Entry, Label, END, filedialog
+from typing import List, Callable, Tuple
 from bezier_curve import BezierCurve
-from canvas_point import P
+from project_format import (
+    PROJECT_EXTENSION,
+    LEGACY_PROJECT_EXTENSION,
+    CurveData,
+    ProjectData,
+    create_project_data,
+    get_curves_data,
+    read_any_project,
+    write_project,
+)
+from project_catalog import ProjectCatalog
+from svg_export import SVG_EXTENSION, export_project_svg
+from background_tasks import (
+    SAVE_TASK_GROUP,
+    LOAD_TASK_GROUP,
+    EXPORT_TASK_GROUP,
+    Task,
+    TaskRunner,
+)
+from instrumentation import instrumentation
+
+
+TEMPORARY_EXTENSION = ".tmp"
+
+project_catalog: ProjectCatalog | None = None
+
+
+def get_project_catalog() -> ProjectCatalog:
+    global project_catalog
+
+    if project_catalog is None:
+        project_catalog = ProjectCatalog(str(Path(root_path, "./saves/").resolve()))
+
+    return project_catalog
+
+
+def get_project_filename(project_name: str, extension: str = PROJECT_EXTENSION) -> str:
+    return str(Path(root_path, f"./saves/{project_name}{extension}").resolve())
+
+
+# Projects are saved in the binary format, but legacy text saves can still be opened
+def find_project_filename(project_name: str) -> str:
+    filename = get_project_catalog().get_project_filename(project_name)
+
+    if filename is None:
+        return get_project_filename(project_name)
+
+    return filename
 
 
 def find_selected_project_filename(projects_listbox: Listbox) -> str | None:
@@ -13,62 +60,62 @@ def find_selected_project_filename(projects_listbox: Listbox) -> str | None:
     if len(selected_projects) > 0:
         project_name = projects_listbox.get(selected_projects[0])
 
-        selected_project_filename = str(
-            Path(root_path, f"./saves/{project_name}.txt").resolve()
-        )  # We can use only the first one selected because only one can be selected
-
-        return selected_project_filename
+        # We can use only the first one selected because only one can be selected
+        return find_project_filename(project_name)
     else:
         return None
 
 
+@instrumentation.timed("save_project")
 def save_project(
     projects_listbox: Listbox,
     save_as_entry: Entry,
     save_info_label: Label,
     get_active_image_filename_func: Callable[[], str | None],
     get_list_of_curves_func: Callable[[], List[BezierCurve]],
+    task_runner: TaskRunner,
 ) -> None:
     name_chosen_by_user: str = save_as_entry.get()
 
     list_of_curves: List[BezierCurve] = get_list_of_curves_func()
 
-    if len(list_of_curves) > 0:
+    if task_runner.is_running(SAVE_TASK_GROUP):
+        save_info_label.config(text="Project is still being saved!", fg="orange")
+    elif len(list_of_curves) > 0:
         if len(name_chosen_by_user) > 0 and not name_chosen_by_user.isspace():
-            if name_chosen_by_user not in projects_listbox.get(0, END):
-                name_of_project: str = name_chosen_by_user.strip()
-                name_of_project = name_of_project.lower()
-                name_of_project = name_of_project.replace(" ", "_")
+            name_of_project: str = name_chosen_by_user.strip()
+            name_of_project = name_of_project.lower()
+            name_of_project = name_of_project.replace(" ", "_")
 
+            if not get_project_catalog().contains(name_of_project):
                 imported_image_filename: str | None = get_active_image_filename_func()
 
-                try:
-                    with open(
-                        str(
-                            Path(root_path, f"./saves/{name_of_project}.txt").resolve()
+                project_filename = get_project_filename(name_of_project)
+
+                # Copied, because the curves can be edited while the project is saved
+                curves_data = [
+                    CurveData(list(curve.points_coords), curve.get_attributes())
+                    for curve in list_of_curves
+                ]
+
+                # Timed separately, as save_project itself only starts the writing
+                @instrumentation.timed("save_project.write")
+                def save(task: Task) -> None:
+                    # Written under another name first, so that a project file is
+                    # never left half written
+                    temporary_filename = project_filename + TEMPORARY_EXTENSION
+
+                    write_project(
+                        temporary_filename,
+                        create_project_data(
+                            name_of_project, imported_image_filename, curves_data
                         ),
-                        "w",
-                    ) as f:
-                        f.write(name_of_project + "\n")
-
-                        if imported_image_filename is not None:
-                            f.write(imported_image_filename + "\n")
-                        else:
-                            f.write("\n")
-
-                        for curve in list_of_curves:
-                            points_seq: str = ""
-
-                            for point in curve.points:
-                                points_seq += (
-                                    f"{point.point_coords[0]},{point.point_coords[1]};"
-                                )
-
-                            points_seq = points_seq.rstrip(";")
+                    )
 
-                            points_seq += "\n"
+                    replace(temporary_filename, project_filename)
 
-                            f.write(points_seq)
+                def handle_saved(_) -> None:
+                    get_project_catalog().add_project(name_of_project, project_filename)
 
                     projects_listbox.insert(END, name_of_project)
 
@@ -77,8 +124,17 @@ def save_project(
                     save_info_label.config(
                         text="Project saved successfully!", fg="green"
                     )
-                except:
-                    save_info_label.config(text="Error while creating file!", fg="red")
+
+                task_runner.submit(
+                    SAVE_TASK_GROUP,
+                    save,
+                    handle_saved,
+                    lambda error: save_info_label.config(
+                        text="Error while creating file!", fg="red"
+                    ),
+                )
+
+                save_info_label.config(text="Saving project...", fg="black")
             else:
                 save_info_label.config(text="Project name already exists!", fg="orange")
         else:
@@ -87,62 +143,87 @@ def save_project(
         save_info_label.config(text="Project has no curves!", fg="orange")
 
 
+@instrumentation.timed("load_project")
 def load_project(
     projects_listbox: Listbox,
     save_as_entry: Entry,
     save_info_label: Label,
-    remove_everything_func: Callable[[], None],
-    new_image_func: Callable[[str], None],
-    new_curve_func: Callable[[int, List[P] | None], None],
+    open_project_func: Callable[[ProjectData, List[CurveData]], None],
+    task_runner: TaskRunner,
 ) -> None:
     selected_project_filename = find_selected_project_filename(projects_listbox)
 
     if selected_project_filename is not None:
-        img_filename: str | None = None
-
-        all_curve_point_seqs: List[str] = []
-
-        try:
-            with open(selected_project_filename, "r") as f:
-                lines = f.readlines()
-
-                lines = [line.strip().rstrip("\n") for line in lines]
-
-                _img_filename = lines[1]
-
-                if len(_img_filename) > 0:
-                    img_filename = _img_filename
-
-                all_curve_point_seqs = lines[2:]
-        except:
-            save_info_label.config(text="Error while loading file!", fg="red")
-        else:
-            remove_everything_func()
+        # Reading & converting the curves runs in the background, only the curves
+        # themselves are created in the Tk thread
+        @instrumentation.timed("load_project.read")
+        def load(task: Task) -> Tuple[ProjectData, List[CurveData]]:
+            project = read_any_project(selected_project_filename)
 
-            # Load project
-            if img_filename is not None:
-                new_image_func(img_filename)
+            task.raise_if_cancelled()
 
-            for point_seq in all_curve_point_seqs:
-                all_points = point_seq.split(";")
+            return project, get_curves_data(project)
 
-                points: List[P] = []
+        @instrumentation.timed("load_project.open")
+        def handle_loaded(result: Tuple[ProjectData, List[CurveData]]) -> None:
+            open_project_func(*result)
 
-                for point in all_points:
-                    xy = point.split(",")
+            save_info_label.config(text="Project loaded successfully!", fg="green")
 
-                    x = int(xy[0])
-                    y = int(xy[1])
+            save_as_entry.delete(0, END)
 
-                    points.append((x, y))
+        # A project that is still loading is cancelled
+        task_runner.submit(
+            LOAD_TASK_GROUP,
+            load,
+            handle_loaded,
+            lambda error: save_info_label.config(
+                text="Error while loading file!", fg="red"
+            ),
+        )
+
+        save_info_label.config(text="Loading project...", fg="black")
+    else:
+        save_info_label.config(text="No project selected!", fg="orange")
 
-                new_curve_func(len(all_points), points)
 
-            save_info_label.config(text="Project loaded successfully!", fg="green")
+# The saved project is exported straight from its file in the background, so that even
+# projects too large to keep open are exported
+def export_project_as_svg(
+    projects_listbox: Listbox,
+    save_info_label: Label,
+    task_runner: TaskRunner,
+) -> None:
+    selected_project_filename = find_selected_project_filename(projects_listbox)
 
-            save_as_entry.delete(0, END)
-    else:
+    if selected_project_filename is None:
         save_info_label.config(text="No project selected!", fg="orange")
+    elif task_runner.is_running(EXPORT_TASK_GROUP):
+        save_info_label.config(text="Project is still being exported!", fg="orange")
+    else:
+        svg_filename = filedialog.asksaveasfilename(
+            title="Export As SVG",
+            initialdir=root_path,
+            initialfile=Path(selected_project_filename).stem + SVG_EXTENSION,
+            defaultextension=SVG_EXTENSION,
+            filetypes=(("SVG files", "*" + SVG_EXTENSION),),
+        )
+
+        if not svg_filename:
+            return
+
+        task_runner.submit(
+            EXPORT_TASK_GROUP,
+            lambda task: export_project_svg(selected_project_filename, svg_filename),
+            lambda _: save_info_label.config(
+                text="Project exported successfully!", fg="green"
+            ),
+            lambda error: save_info_label.config(
+                text="Error while exporting project!", fg="red"
+            ),
+        )
+
+        save_info_label.config(text="Exporting project...", fg="black")
 
 
 def delete_project(
@@ -150,15 +231,24 @@ def delete_project(
     save_as_entry: Entry,
     save_info_label: Label,
 ) -> None:
-    selected_project_filename = find_selected_project_filename(projects_listbox)
+    selected_projects = projects_listbox.curselection()
+
+    if len(selected_projects) > 0:
+        project_name = projects_listbox.get(selected_projects[0])
 
-    if selected_project_filename is not None:
         try:
-            remove(selected_project_filename)
+            # A legacy save of the same name would show up again otherwise
+            for extension in (PROJECT_EXTENSION, LEGACY_PROJECT_EXTENSION):
+                filename = get_project_filename(project_name, extension)
+
+                if os_path.exists(filename):
+                    remove(filename)
         except:
             save_info_label.config(text="Error while deleting project!", fg="red")
         else:
-            projects_listbox.delete(projects_listbox.curselection()[0])
+            get_project_catalog().remove_project(project_name)
+
+            projects_listbox.delete(selected_projects[0])
 
             save_info_label.config(text="Project deleted successfully!", fg="green")
 
@@ -169,9 +259,21 @@ def recognize_save_files(
     projects_listbox: Listbox,
     save_info_label: Label,
 ):
+    show_projects(projects_listbox, save_info_label)
+
+
+# Shows the projects whose name starts with prefix, straight from the catalog
+def show_projects(
+    projects_listbox: Listbox,
+    save_info_label: Label,
+    prefix: str = "",
+) -> None:
     try:
-        for filename in listdir(str(Path(root_path, "./saves/").resolve())):
-            if filename.endswith(".txt"):
-                projects_listbox.insert(END, os_path.splitext(filename)[0])
+        project_names = get_project_catalog().find_by_prefix(
+            prefix.strip().lower().replace(" ", "_")
+        )
     except:
         save_info_label.config(text="Error while importing projects!", fg="red")
+    else:
+        projects_listbox.delete(0, END)
+        projects_listbox.insert(END, *project_names)
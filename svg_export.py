@@ -0,0 +1,205 @@
+from os import replace
+from typing import Dict, List, Sequence, TextIO, Tuple
+from xml.sax.saxutils import quoteattr
+import sys
+import numpy as np
+from bezier_batch import batch_flatten
+from bezier_curve import DEFAULT_CURVE_COLOR, DEFAULT_CURVE_WIDTH
+from curve_flattening import DEFAULT_FLATTENING_TOLERANCE, flatten_curve
+from project_format import (
+    DEFAULT_ATTRIBUTES_FLAG,
+    ProjectData,
+    int_to_color,
+    read_any_project,
+)
+
+
+# Run with `python svg_export.py <project file> <svg file>`
+
+SVG_EXTENSION = ".svg"
+
+TEMPORARY_EXTENSION = ".tmp"
+
+# Curves taken out of the project at once, so that only their points are ever converted
+# to Python objects
+EXPORT_CHUNK_CURVES: int = 4096
+
+# Curves of higher degrees than cubic are approximated by lines this close to them
+SVG_FLATTENING_TOLERANCE: float = DEFAULT_FLATTENING_TOLERANCE
+
+COORDINATE_DECIMALS: int = 2
+
+# Path commands for curves that SVG can describe exactly, by amount of points
+PATH_COMMANDS = {2: "L", 3: "Q", 4: "C"}
+
+
+def format_number(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+
+    text = f"{value:.{COORDINATE_DECIMALS}f}".rstrip("0").rstrip(".")
+
+    return "0" if text == "-0" else text
+
+
+def format_points(points_coords: Sequence[Tuple[float, float]]) -> str:
+    return " ".join(f"{format_number(x)} {format_number(y)}" for x, y in points_coords)
+
+
+# Canvas coordinates have y pointing down like SVG, so the points are used as they are.
+# Curves of higher degrees are flattened here, unless their polyline is given.
+def get_path_data(
+    points_coords: Sequence[Tuple[float, float]],
+    polyline: Sequence[Tuple[float, float]] | None = None,
+) -> str:
+    start = f"M {format_points(points_coords[:1])}"
+
+    command = PATH_COMMANDS.get(len(points_coords))
+
+    if command is not None:
+        return f"{start} {command} {format_points(points_coords[1:])}"
+
+    if polyline is None:
+        polyline = flatten_curve(points_coords, SVG_FLATTENING_TOLERANCE)
+
+    return f"{start} L {format_points(polyline[1:])}"
+
+
+# Writes every path as soon as it's given, so the document is never held in memory
+class SvgPathWriter:
+    def __init__(self, f: TextIO, view_box: Tuple[float, float, float, float]) -> None:
+        self.f = f
+
+        min_x, min_y, max_x, max_y = view_box
+
+        width = max_x - min_x
+        height = max_y - min_y
+
+        self.f.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<svg xmlns="http://www.w3.org/2000/svg"'
+            f' width="{format_number(width)}" height="{format_number(height)}"'
+            f' viewBox="{format_points([(min_x, min_y), (width, height)])}"'
+            ' fill="none" stroke-linecap="round" stroke-linejoin="round">\n'
+        )
+
+    def write_path(
+        self,
+        points_coords: Sequence[Tuple[float, float]],
+        color: str,
+        width: float,
+        polyline: Sequence[Tuple[float, float]] | None = None,
+    ) -> None:
+        self.f.write(
+            f'<path d="{get_path_data(points_coords, polyline)}"'
+            f" stroke={quoteattr(color)} stroke-width={quoteattr(str(width))}/>\n"
+        )
+
+    def close(self) -> None:
+        self.f.write("</svg>\n")
+
+
+# Extent of all points, widened by half of the widest stroke, so that no stroke is cut
+def get_project_view_box(project: ProjectData) -> Tuple[int, int, int, int]:
+    if project.curve_count == 0:
+        return (0, 0, 0, 0)
+
+    margin = (max(int(project.records["width"].max()), DEFAULT_CURVE_WIDTH) + 1) // 2
+
+    min_x, min_y = project.coords.min(axis=0).tolist()
+    max_x, max_y = project.coords.max(axis=0).tolist()
+
+    return (min_x - margin, min_y - margin, max_x + margin, max_y + margin)
+
+
+# Polylines of the curves of a chunk that SVG can't describe exactly, by their index in
+# the chunk. Curves with the same amount of points are flattened in one batch.
+def get_chunk_polylines(
+    coords: np.ndarray, point_amounts: np.ndarray
+) -> Dict[int, List[List[float]]]:
+    starts = np.cumsum(point_amounts) - point_amounts
+
+    polylines: Dict[int, List[List[float]]] = {}
+
+    for amount in np.unique(point_amounts).tolist():
+        if amount in PATH_COMMANDS:
+            continue
+
+        indices = np.flatnonzero(point_amounts == amount)
+
+        control_points = coords[starts[indices][:, None] + np.arange(amount)]
+
+        for i, polyline in zip(
+            indices.tolist(), batch_flatten(control_points, SVG_FLATTENING_TOLERANCE)
+        ):
+            polylines[i] = polyline.tolist()
+
+    return polylines
+
+
+# The curves are read straight from the project's columns chunk by chunk, so even huge
+# projects are exported in bounded memory
+def write_project_svg(project: ProjectData, f: TextIO) -> None:
+    writer = SvgPathWriter(f, get_project_view_box(project))
+
+    point_offset = 0
+
+    for chunk_start in range(0, project.curve_count, EXPORT_CHUNK_CURVES):
+        records = project.records[chunk_start : chunk_start + EXPORT_CHUNK_CURVES]
+
+        point_amounts: List[int] = records["point_amount"].tolist()
+        widths: List[int] = records["width"].tolist()
+        flags: List[int] = records["flags"].tolist()
+        colors: List[int] = records["colors"][:, 0].tolist()
+
+        chunk_point_amount = sum(point_amounts)
+
+        coords = project.coords[point_offset : point_offset + chunk_point_amount]
+
+        point_offset += chunk_point_amount
+
+        polylines = get_chunk_polylines(
+            coords, records["point_amount"].astype(np.int64)
+        )
+
+        all_points = coords.tolist()
+
+        start = 0
+
+        for i, point_amount in enumerate(point_amounts):
+            if flags[i] & DEFAULT_ATTRIBUTES_FLAG:
+                color, width = DEFAULT_CURVE_COLOR, DEFAULT_CURVE_WIDTH
+            else:
+                color, width = int_to_color(colors[i]), widths[i]
+
+            writer.write_path(
+                all_points[start : start + point_amount],
+                color,
+                width,
+                polylines.get(i),
+            )
+
+            start += point_amount
+
+    writer.close()
+
+
+# Written under another name first, so that an SVG file is never left half written
+def export_project_svg(project_filename: str, svg_filename: str) -> None:
+    project = read_any_project(project_filename)
+
+    temporary_filename = svg_filename + TEMPORARY_EXTENSION
+
+    with open(temporary_filename, "w", encoding="utf-8") as f:
+        write_project_svg(project, f)
+
+    replace(temporary_filename, svg_filename)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python svg_export.py <project file> <svg file>", file=sys.stderr)
+
+        sys.exit(2)
+
+    export_project_svg(sys.argv[1], sys.argv[2])
@@ -0,0 +1,65 @@
+from pathlib import Path
+import pytest
+from project_format import (
+    HEADER,
+    STRING_LENGTH,
+    CurveData,
+    InvalidProjectFileError,
+    create_project_data,
+    read_project,
+    write_project,
+)
+
+
+# Run with `python -m pytest` from the repository's root
+
+
+def write_test_project(filename: Path) -> None:
+    write_project(
+        str(filename),
+        create_project_data("Test", None, [CurveData([(0, 0), (10, 20)], None)]),
+    )
+
+
+def test_read_project_round_trip(tmp_path: Path) -> None:
+    filename = tmp_path / "project.bzp"
+
+    write_test_project(filename)
+
+    project = read_project(str(filename))
+
+    assert project.name == "Test"
+    assert project.image_filename is None
+    assert project.coords.tolist() == [[0, 0], [10, 20]]
+
+
+def test_read_project_with_invalid_name(tmp_path: Path) -> None:
+    filename = tmp_path / "project.bzp"
+
+    write_test_project(filename)
+
+    # The first byte of the name isn't valid UTF-8
+    data = bytearray(filename.read_bytes())
+    data[HEADER.size + STRING_LENGTH.size] = 0xFF
+    filename.write_bytes(data)
+
+    with pytest.raises(ValueError) as error:
+        read_project(str(filename))
+
+    assert error.value is InvalidProjectFileError
+
+
+def test_read_project_with_truncated_strings(tmp_path: Path) -> None:
+    filename = tmp_path / "project.bzp"
+
+    write_test_project(filename)
+
+    # The length of the name points past the strings block
+    data = bytearray(filename.read_bytes())
+    STRING_LENGTH.pack_into(data, HEADER.size, 2**31)
+    filename.write_bytes(data)
+
+    with pytest.raises(ValueError) as error:
+        read_project(str(filename))
+
+    assert error.value is InvalidProjectFileError
@@ -0,0 +1,176 @@
+from collections import OrderedDict
+from math import ceil, floor, log2
+from typing import List, NamedTuple, Tuple
+from PIL import Image
+from image_cache import decoded_image_cache
+
+
+# Size of the tiles in screen pixels (at most, they are between half & full size)
+TILE_SIZE: int = 256
+
+# Memory for the rendered tiles, the least recently used ones are freed above it
+TILE_CACHE_BUDGET_BYTES: int = 64 * 1024 * 1024
+
+# (level, column, row, size on screen)
+TileKey = Tuple[int, int, int, Tuple[int, int]]
+
+
+class TilePlacement(NamedTuple):
+    key: TileKey
+    box: Tuple[int, int, int, int]  # Part of the level image covered by the tile
+    position: Tuple[int, int]  # NW corner on screen
+
+
+# Level 0 is the source image, every further level is half the size of the previous one.
+# Negative levels are used when zoomed in beyond the source resolution, they still use
+# the source image, but with tiles covering fewer of its pixels.
+# Levels are decoded only when needed & every tile is cut & scaled only when it's visible.
+class TilePyramid:
+    def __init__(
+        self,
+        filename: str,
+        image_size: Tuple[int, int],
+        tile_size: int = TILE_SIZE,
+        budget_bytes: int = TILE_CACHE_BUDGET_BYTES,
+    ) -> None:
+        self.filename = filename
+        self.image_size = image_size
+        self.tile_size = tile_size
+        self.budget_bytes = budget_bytes
+
+        self.max_level: int = max(ceil(log2(max(image_size) / tile_size)), 0)
+        self.min_level: int = -floor(log2(tile_size))
+
+        self.tiles: OrderedDict[TileKey, Image.Image] = OrderedDict()
+        self.total_bytes: int = 0
+
+    # Scale is the amount of screen pixels per source pixel
+    def get_level(self, scale: float) -> int:
+        level = floor(log2(1 / scale))
+
+        return min(max(level, self.min_level), self.max_level)
+
+    def get_level_size(self, level: int) -> Tuple[int, int]:
+        factor = 2 ** max(level, 0)
+
+        return (
+            max(ceil(self.image_size[0] / factor), 1),
+            max(ceil(self.image_size[1] / factor), 1),
+        )
+
+    # Shared through the decoded image cache, so the source isn't decoded repeatedly
+    def get_level_image(self, level: int) -> Image.Image:
+        return decoded_image_cache.get_image(self.filename, self.get_level_size(level))
+
+    def is_level_decoded(self, level: int) -> bool:
+        return decoded_image_cache.contains(self.filename, self.get_level_size(level))
+
+    # The decoded level closest to level, preferring the coarser ones, which are cheaper
+    # to scale up (None if nothing is decoded yet)
+    def find_decoded_level(self, level: int) -> int | None:
+        coarser_levels = range(max(level, 0), self.max_level + 1)
+        finer_levels = range(max(level, 0) - 1, -1, -1)
+
+        for decoded_level in [*coarser_levels, *finer_levels]:
+            if self.is_level_decoded(decoded_level):
+                return decoded_level
+
+        return None
+
+    # Tiles intersecting the screen, where the source image's NW corner is at origin
+    # & scale = (screen pixels per source pixel in x, in y). Tiles are cut from the
+    # level fitting the scale, unless another level is given.
+    def get_visible_tiles(
+        self,
+        origin: Tuple[float, float],
+        scale: Tuple[float, float],
+        screen_size: Tuple[int, int],
+        level: int | None = None,
+    ) -> List[TilePlacement]:
+        if level is None:
+            level = self.get_level(scale[0])
+
+        level_width, level_height = self.get_level_size(level)
+
+        # Screen pixels per level pixel
+        level_scale_x = scale[0] * self.image_size[0] / level_width
+        level_scale_y = scale[1] * self.image_size[1] / level_height
+
+        # Tile side in level pixels
+        span = self.tile_size // 2 ** max(-level, 0)
+
+        first_column = max(floor(-origin[0] / level_scale_x / span), 0)
+        last_column = min(
+            ceil((screen_size[0] - origin[0]) / level_scale_x / span),
+            ceil(level_width / span),
+        )
+        first_row = max(floor(-origin[1] / level_scale_y / span), 0)
+        last_row = min(
+            ceil((screen_size[1] - origin[1]) / level_scale_y / span),
+            ceil(level_height / span),
+        )
+
+        placements: List[TilePlacement] = []
+
+        for row in range(first_row, last_row):
+            for column in range(first_column, last_column):
+                box = (
+                    column * span,
+                    row * span,
+                    min((column + 1) * span, level_width),
+                    min((row + 1) * span, level_height),
+                )
+
+                # Both edges are rounded, so that neighbouring tiles don't leave gaps
+                left = round(origin[0] + box[0] * level_scale_x)
+                top = round(origin[1] + box[1] * level_scale_y)
+                right = round(origin[0] + box[2] * level_scale_x)
+                bottom = round(origin[1] + box[3] * level_scale_y)
+
+                if right <= left or bottom <= top:
+                    continue
+
+                placements.append(
+                    TilePlacement(
+                        key=(level, column, row, (right - left, bottom - top)),
+                        box=box,
+                        position=(left, top),
+                    )
+                )
+
+        return placements
+
+    def get_tile(self, placement: TilePlacement) -> Image.Image:
+        if placement.key in self.tiles:
+            self.tiles.move_to_end(placement.key)
+
+            return self.tiles[placement.key]
+
+        level, _, _, size = placement.key
+
+        tile = (
+            self.get_level_image(level)
+            .crop(placement.box)
+            .resize(size, Image.Resampling.BILINEAR)
+        )
+
+        self.tiles[placement.key] = tile
+        self.total_bytes += get_tile_bytes(tile)
+
+        self.evict()
+
+        return tile
+
+    def evict(self) -> None:
+        while len(self.tiles) > 1 and self.total_bytes > self.budget_bytes:
+            _, tile = self.tiles.popitem(last=False)
+
+            self.total_bytes -= get_tile_bytes(tile)
+
+    def clear(self) -> None:
+        self.tiles.clear()
+        self.total_bytes = 0
+
+
+def get_tile_bytes(tile: Image.Image) -> int:
+    return tile.width * tile.height * len(tile.getbands())
@@ -0,0 +1,102 @@
+from typing import List, Sequence, Tuple
+
+
+MIN_ZOOM: float = 1 / 16
+
+MAX_ZOOM: float = 64.0
+
+# Free space around everything when fitting it into the canvas, in screen pixels
+FIT_MARGIN: int = 20
+
+Coords = Tuple[float, float]
+
+
+# Maps world coordinates (in which curves & the image are stored, equal to the canvas
+# coordinates before anything was zoomed or panned) to screen (canvas) coordinates:
+# screen = (world - offset) * zoom
+class Viewport:
+    def __init__(self) -> None:
+        self.zoom: float = 1.0
+        self.offset: Coords = (0.0, 0.0)
+
+    def reset(self) -> None:
+        self.zoom = 1.0
+        self.offset = (0.0, 0.0)
+
+    def is_identity(self) -> bool:
+        return self.zoom == 1.0 and self.offset == (0.0, 0.0)
+
+    def world_to_screen(self, point: Coords) -> Coords:
+        return (
+            (point[0] - self.offset[0]) * self.zoom,
+            (point[1] - self.offset[1]) * self.zoom,
+        )
+
+    def screen_to_world(self, point: Coords) -> Coords:
+        return (
+            point[0] / self.zoom + self.offset[0],
+            point[1] / self.zoom + self.offset[1],
+        )
+
+    def points_to_screen(self, points: Sequence[Coords]) -> List[Coords]:
+        if self.is_identity():
+            return list(points)
+
+        return [self.world_to_screen(point) for point in points]
+
+    # World coordinates are whole numbers, same as the canvas coordinates used to be
+    def screen_to_world_point(self, point: Coords) -> Tuple[int, int]:
+        world_x, world_y = self.screen_to_world(point)
+
+        return (round(world_x), round(world_y))
+
+    # Zoom by factor while keeping the world point under screen_point in place
+    def zoom_at(self, screen_point: Coords, factor: float) -> None:
+        anchor = self.screen_to_world(screen_point)
+
+        self.zoom = min(max(self.zoom * factor, MIN_ZOOM), MAX_ZOOM)
+
+        self.offset = (
+            anchor[0] - screen_point[0] / self.zoom,
+            anchor[1] - screen_point[1] / self.zoom,
+        )
+
+    def pan(self, dx: float, dy: float) -> None:
+        self.offset = (
+            self.offset[0] - dx / self.zoom,
+            self.offset[1] - dy / self.zoom,
+        )
+
+    # Returns (min_x, min_y, max_x, max_y) of the visible part of the world
+    def get_visible_rect(
+        self, canvas_size: Tuple[int, int]
+    ) -> Tuple[float, float, float, float]:
+        min_x, min_y = self.screen_to_world((0, 0))
+        max_x, max_y = self.screen_to_world(canvas_size)
+
+        return (min_x, min_y, max_x, max_y)
+
+    # Zoom & pan so that extent = (min_x, min_y, max_x, max_y) is centered in the canvas
+    def fit(
+        self,
+        extent: Tuple[float, float, float, float],
+        canvas_size: Tuple[int, int],
+        margin: int = FIT_MARGIN,
+    ) -> None:
+        min_x, min_y, max_x, max_y = extent
+
+        available_width = max(canvas_size[0] - 2 * margin, 1)
+        available_height = max(canvas_size[1] - 2 * margin, 1)
+
+        width = max(max_x - min_x, 1)
+        height = max(max_y - min_y, 1)
+
+        self.zoom = min(
+            max(min(available_width / width, available_height / height), MIN_ZOOM),
+            MAX_ZOOM,
+        )
+
+        self.offset = (
+            (min_x + max_x) / 2 - canvas_size[0] / 2 / self.zoom,
+            (min_y + max_y) / 2 - canvas_size[1] / 2 / self.zoom,
+        )